@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recognize plates in folders of images and recorded videos offline.
+
+Files are spread over a pool of worker processes, each with its own copy
+of the models and a fixed number of inference threads. Every plate read
+is written to a CSV or JSONL report with its file, frame index, time in
+the video, bounding box and confidence, and detections are logged to
+detected_cars (one row per car in videos, per plate in images). A
+checkpoint file lists the finished files, so an interrupted run picks up
+where it stopped when started again with the same report:
+
+    python batch_process.py /footage/2024-05 "/snapshots/**/*.jpg" --report plates.csv
+    python batch_process.py /footage/2024-05 --report plates.jsonl --workers 4 --threads 2 --no-db
+"""
+
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from config import BATCH_SETTINGS
+from engine.capture import CaptureSource
+from engine.inference_pool import configure_worker
+from engine.recognizer import TrackedRecognizer
+from model.plate_detector import PlateDetector
+from model.roi import roi_for_source
+
+REPORT_FIELDS = ["file", "frame_index", "time_s", "text", "confidence", "x", "y", "w", "h", "track_id"]
+
+# The PlateDetector of a worker process, created by init_worker
+_detector = None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recognize plates in image folders and video archives.")
+    parser.add_argument("inputs", nargs="+",
+                        help="Image or video files, directories (searched recursively) or glob patterns.")
+    parser.add_argument("--report", required=True,
+                        help="Report file; .jsonl writes JSON lines, anything else CSV. Appended to on resume.")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Checkpoint file (default: the report path with .checkpoint.json).")
+    parser.add_argument("--workers", type=int, default=BATCH_SETTINGS["workers"],
+                        help="Worker processes (0: one per --threads cores).")
+    parser.add_argument("--threads", type=int, default=BATCH_SETTINGS["threads_per_worker"],
+                        help="Inference threads per worker.")
+    parser.add_argument("--video-stride", type=int, default=BATCH_SETTINGS["video_stride"],
+                        help="Detect every Nth video frame.")
+    parser.add_argument("--no-db", action="store_true", help="Do not log detections to the database.")
+    return parser.parse_args()
+
+
+def collect_inputs(patterns):
+    """Sorted image and video paths named by files, directories and glob patterns."""
+    extensions = BATCH_SETTINGS["image_extensions"] + BATCH_SETTINGS["video_extensions"]
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                paths.update(os.path.join(root, name) for name in names)
+        elif os.path.isfile(pattern):
+            paths.add(pattern)
+        else:
+            paths.update(glob.glob(pattern, recursive=True))
+    return sorted(os.path.abspath(path) for path in paths
+                  if os.path.isfile(path) and path.lower().endswith(extensions))
+
+
+def file_key(path):
+    """Size and modification time, so files changed since the checkpoint are processed again."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+class Checkpoint:
+    """Files that were fully processed, saved after every file."""
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.done = json.load(f)["done"]
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error: Could not read checkpoint {path}: {e}")
+                raise
+
+    def is_done(self, path):
+        return self.done.get(path) == file_key(path)
+
+    def mark_done(self, path):
+        self.done[path] = file_key(path)
+        # Written to a temporary file first so an interruption cannot corrupt it
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": self.done}, f)
+        os.replace(temp_path, self.path)
+
+
+class ReportWriter:
+    """Appends plate rows to a CSV or JSONL report."""
+    def __init__(self, path):
+        self.jsonl = path.lower().endswith(".jsonl")
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._csv = None
+        if not self.jsonl:
+            self._csv = csv.DictWriter(self._file, fieldnames=REPORT_FIELDS)
+            if new_file:
+                self._csv.writeheader()
+
+    def write(self, rows):
+        for row in rows:
+            if self.jsonl:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                self._csv.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def init_worker(threads, pin_cpus, worker_ids):
+    """Limit the worker to its threads (and cores) and load its own copy of the models."""
+    global _detector
+    configure_worker(worker_ids.get(), threads, pin_cpus)
+    _detector = PlateDetector()
+    _detector.warm_up(background=False)
+
+
+def plate_row(path, frame_index, time_s, plate):
+    x, y, w, h = plate["bbox"]
+    return {"file": path, "frame_index": frame_index,
+            "time_s": None if time_s is None else round(time_s, 3),
+            "text": plate["text"], "confidence": round(plate["confidence"], 4),
+            "x": x, "y": y, "w": w, "h": h, "track_id": plate.get("track_id")}
+
+
+def process_image(path):
+    frame = cv2.imread(path)
+    if frame is None:
+        raise IOError(f"Failed to read image {path}")
+    plates = [plate for plate in _detector.detect_and_recognize(frame, roi_for_source(path)) if plate["text"]]
+
+    timestamp = int(os.path.getmtime(path))
+    return {"frames": 1, "rows": [plate_row(path, 0, None, plate) for plate in plates],
+            "detections": [(plate["text"], timestamp) for plate in plates]}
+
+
+def process_video(path, stride):
+    recognizer = TrackedRecognizer(_detector, roi=roi_for_source(path))
+    rows, events = [], []
+
+    def want_frame():
+        # Frames in between are grabbed but never decoded
+        return (capture.frames_read - 1) % stride == 0
+
+    def on_frame(source_id, frame):
+        frame_index = capture.frames_read - 1
+        time_s = frame_index / capture.source_fps
+        detected_plates, plate_events = recognizer.process(frame, now=time_s)
+        rows.extend(plate_row(path, frame_index, time_s, plate)
+                    for plate in detected_plates or [] if plate["text"])
+        events.extend((event["text"], time_s) for event in plate_events)
+
+    capture = CaptureSource(path, on_frame, realtime=False, want_frame=want_frame)
+    capture.open()
+    # Read on this process's thread; no pacing, so this runs as fast as frames decode
+    capture.run()
+    duration = capture.frames_read / capture.source_fps
+    events.extend((event["text"], duration) for event in recognizer.flush())
+
+    # The file was written when the recording ended; detections are dated from its start
+    started = os.path.getmtime(path) - duration
+    return {"frames": capture.frames_read,
+            "rows": rows,
+            "detections": [(text, int(started + time_s)) for text, time_s in events if text]}
+
+
+def process_file(path, stride):
+    """Recognize plates in one image or video. Runs in a worker process."""
+    started = time.perf_counter()
+    if path.lower().endswith(BATCH_SETTINGS["video_extensions"]):
+        result = process_video(path, stride)
+    else:
+        result = process_image(path)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def main():
+    args = parse_args()
+    files = collect_inputs(args.inputs)
+    checkpoint = Checkpoint(args.checkpoint or os.path.splitext(args.report)[0] + ".checkpoint.json")
+    pending = [path for path in files if not checkpoint.is_done(path)]
+    print(f"{len(files)} files, {len(files) - len(pending)} already processed")
+    if not pending:
+        return
+
+    threads = max(1, args.threads)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // threads)
+    workers = min(workers, len(pending))
+
+    db_handler = None
+    if not args.no_db:
+        from database.init_db import DatabaseHandler
+
+        # Backfilled detections carry old dates; retention would archive them right away
+        db_handler = DatabaseHandler(retention=False)
+    report = ReportWriter(args.report)
+
+    # spawn: workers start clean instead of forking a process with threads
+    context = multiprocessing.get_context("spawn")
+    worker_ids = context.Queue()
+    for worker_id in range(workers):
+        worker_ids.put(worker_id)
+
+    print(f"Processing {len(pending)} files with {workers} workers x {threads} threads")
+    started = time.monotonic()
+    frames = plates = failed = 0
+    pool = ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                               initargs=(threads, BATCH_SETTINGS["pin_cpus"], worker_ids))
+    try:
+        futures = {pool.submit(process_file, path, max(1, args.video_stride)): path for path in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error processing {path}: {e}")
+                failed += 1
+                continue
+
+            # A file is marked done only after its results are written
+            report.write(result["rows"])
+            if db_handler is not None:
+                db_handler.write_detected_cars(result["detections"])
+            checkpoint.mark_done(path)
+
+            frames += result["frames"]
+            plates += len(result["rows"])
+            print(f"[{done}/{len(pending)}] {path}: {result['frames']} frames, "
+                  f"{len(result['rows'])} plate reads in {result['seconds']:.1f}s")
+        pool.shutdown()
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.")
+        pool.shutdown(wait=False, cancel_futures=True)
+    finally:
+        report.close()
+        if db_handler is not None:
+            db_handler.close()
+
+    elapsed = time.monotonic() - started
+    print(f"{frames} frames, {plates} plate reads in {elapsed:.1f}s "
+          f"({frames / elapsed if elapsed else 0:.1f} frames/s), {failed} files failed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
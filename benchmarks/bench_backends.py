@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Check that the inference backends agree and compare their latency.
+
+Every image is run through PlateDetector on each backend. Plate boxes must
+match the first backend's boxes (IoU at least --min-iou) and the OCR text
+of the reference crops must be identical; the script exits with status 1
+otherwise. Detection and OCR latency are reported per backend.
+
+    python model/export_models.py --format onnxruntime openvino
+    python benchmarks/bench_backends.py --images model/models/test_images/test_cases
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import the application modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.backends import INFERENCE_BACKENDS
+from model.plate_detector import PlateDetector
+from model.tracker import box_iou
+
+IMAGE_EXTENSIONS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+
+
+def load_images(image_dir):
+    paths = sorted(path for pattern in IMAGE_EXTENSIONS
+                   for path in glob.glob(os.path.join(image_dir, pattern)))
+    images = [(os.path.basename(path), cv2.imread(path)) for path in paths]
+    return [(name, img) for name, img in images if img is not None]
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000 if samples else 0.0
+
+
+def detect_plates(detector, images, repeats):
+    """Plates found by a backend in every image and the detection latencies."""
+    plates, detect_times = {}, []
+    for name, img in images:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            plates[name] = detector.clip_plates(img, detector.detect_plate(img))
+            detect_times.append(time.perf_counter() - started)
+    return plates, detect_times
+
+
+def read_texts(detector, images, reference_plates, repeats):
+    """OCR text of the reference plates of every image and the OCR latencies."""
+    texts, ocr_times = {}, []
+    for name, img in images:
+        crops = [img[y1:y2, x1:x2] for (x1, y1, x2, y2), _ in reference_plates[name]]
+        if not crops:
+            texts[name] = []
+            continue
+        for _ in range(repeats):
+            started = time.perf_counter()
+            texts[name] = detector.recognize_texts(crops)
+            ocr_times.append(time.perf_counter() - started)
+    return texts, ocr_times
+
+
+def compare(name, reference, candidate, min_iou):
+    """List of mismatch descriptions between two backends' results for one image."""
+    ref_plates, ref_texts = reference
+    plates, texts = candidate
+    problems = []
+    if len(plates) != len(ref_plates):
+        problems.append(f"{name}: {len(plates)} plates instead of {len(ref_plates)}")
+    elif plates:
+        iou = box_iou(np.array([box for box, _ in plates], dtype=np.float32),
+                      np.array([box for box, _ in ref_plates], dtype=np.float32))
+        for j, (ref_box, _) in enumerate(ref_plates):
+            if iou[:, j].max() < min_iou:
+                problems.append(f"{name}: no box matches {ref_box} (best IoU {iou[:, j].max():.2f})")
+    for text, ref_text in zip(texts, ref_texts):
+        if text != ref_text:
+            problems.append(f"{name}: text {text!r} instead of {ref_text!r}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", required=True, help="Directory of camera frames with plates")
+    parser.add_argument("--backends", nargs="+", default=list(INFERENCE_BACKENDS), choices=INFERENCE_BACKENDS,
+                        help="Backends to compare; the first one is the reference")
+    parser.add_argument("--min-iou", type=float, default=0.9, help="Minimum IoU of matching plate boxes")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per image")
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    if not images:
+        print(f"Error: No images found in {args.images}")
+        sys.exit(1)
+
+    results, reference_plates, problems = {}, None, []
+    print(f"{len(images)} images, {args.repeats} runs each")
+    print(f"{'backend':<13}{'detect p50':>12}{'detect p95':>12}{'ocr p50':>10}{'ocr p95':>10}  (ms)")
+    for backend in args.backends:
+        detector = PlateDetector(backend=backend)
+        # Warm-up so one-time graph optimization is not timed
+        detector.detect_plate(images[0][1])
+
+        plates, detect_times = detect_plates(detector, images, args.repeats)
+        if reference_plates is None:
+            reference_plates = plates
+        texts, ocr_times = read_texts(detector, images, reference_plates, args.repeats)
+        results[backend] = {name: (plates[name], texts[name]) for name, _ in images}
+
+        print(f"{backend:<13}{percentile_ms(detect_times, 50):>12.1f}{percentile_ms(detect_times, 95):>12.1f}"
+              f"{percentile_ms(ocr_times, 50):>10.1f}{percentile_ms(ocr_times, 95):>10.1f}")
+
+        if backend != args.backends[0]:
+            for name, _ in images:
+                problems.extend(f"{backend}: {problem}" for problem in
+                                compare(name, results[args.backends[0]][name], results[backend][name], args.min_iou))
+
+    if problems:
+        print("\nBackends disagree:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("\nAll backends agree.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare plate lookups per second with a fresh sqlite3 connection per call,
+a query on a persistent connection, and DatabaseHandler.get_info_by_plate,
+which is served from the in-memory allowed_cars cache.
+
+    python benchmarks/bench_db_lookup.py --plates 1000 --lookups 20000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import the application modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.init_db import DatabaseHandler
+
+SELECT_ALLOWED_CAR_SQL = '''
+    SELECT plate_number, owner_name, national_id, phone_number, car_model, car_color
+    FROM allowed_cars
+    WHERE plate_number = ?
+'''
+
+
+def connect_per_call_lookup(db_path, plate_number):
+    """Lookup as done before persistent connections: connect, query, close."""
+    conn = None
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute(SELECT_ALLOWED_CAR_SQL, (plate_number,))
+        return cursor.fetchone()
+    finally:
+        if conn:
+            conn.close()
+
+
+def persistent_connection_lookup(db_handler, plate_number):
+    """Lookup with SQL on the calling thread's persistent connection."""
+    conn = db_handler.connections.connection()
+    return conn.execute(SELECT_ALLOWED_CAR_SQL, (plate_number,)).fetchone()
+
+
+def fill_database(db_handler, count):
+    plates = [f"BENCH{i:06d}" for i in range(count)]
+    conn = db_handler.connections.connection()
+    with conn:
+        conn.executemany(
+            'INSERT INTO allowed_cars (plate_number, owner_name, national_id, phone_number) VALUES (?, ?, ?, ?)',
+            [(plate, "owner", "id", "phone") for plate in plates]
+        )
+    db_handler.allowed_cars.load()
+    return plates
+
+
+def measure(lookup, queries):
+    start = time.perf_counter()
+    for plate in queries:
+        lookup(plate)
+    elapsed = time.perf_counter() - start
+    return len(queries) / elapsed, elapsed / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--plates", type=int, default=1000, help="Rows in allowed_cars.")
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups per method.")
+    parser.add_argument("--miss-ratio", type=float, default=0.5,
+                        help="Share of lookups for plates that are not in the table.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        # Retention would attach the repo's cars_archive.db and could move benchmark rows there
+        db_handler = DatabaseHandler(db_path, retention=False)
+        plates = fill_database(db_handler, args.plates)
+
+        # Cameras read the same passing cars many times, allowed or not
+        unknown = [f"MISS{i:06d}" for i in range(args.plates)]
+        rng = random.Random(0)
+        queries = [rng.choice(plates) if rng.random() >= args.miss_ratio else rng.choice(unknown)
+                   for _ in range(args.lookups)]
+
+        results = {
+            "connect per call": measure(lambda plate: connect_per_call_lookup(db_path, plate), queries),
+            "persistent connection": measure(lambda plate: persistent_connection_lookup(db_handler, plate), queries),
+            "cached lookup": measure(db_handler.get_info_by_plate, queries),
+        }
+        db_handler.close()
+
+    print(f"{args.lookups} lookups against {args.plates} allowed cars")
+    for name, (per_second, micros) in results.items():
+        print(f"  {name:<22} {per_second:>12,.0f} lookups/s  {micros:>8.1f} us/lookup")
+    baseline = results["connect per call"][0]
+    for name in ("persistent connection", "cached lookup"):
+        print(f"  {name} speedup: {results[name][0] / baseline:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
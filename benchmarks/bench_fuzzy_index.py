@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark PlateFuzzyIndex build time, memory and query latency on synthetic
+Egyptian-style plates (three letters and four digits).
+
+    python benchmarks/bench_fuzzy_index.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Add parent directory to path to import the application modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.fuzzy_index import PlateFuzzyIndex
+from model.charset import ARABIC_MAPPING, confusable_groups
+
+LETTERS = sorted({char for name, char in ARABIC_MAPPING.items() if not name.isdigit() and len(char) == 1})
+DIGITS = [ARABIC_MAPPING[str(d)] for d in range(10)]
+
+
+def random_plate(rng):
+    return "".join(rng.choice(LETTERS) for _ in range(3)) + "".join(rng.choice(DIGITS) for _ in range(4))
+
+
+def confuse(plate, rng, groups):
+    """Replace one character by a confusable one, if the plate has any."""
+    positions = [i for i, char in enumerate(plate) if any(char in group for group in groups)]
+    if not positions:
+        return plate
+    i = rng.choice(positions)
+    group = next(group for group in groups if plate[i] in group)
+    return plate[:i] + rng.choice(sorted(group - {plate[i]})) + plate[i + 1:]
+
+
+def edit(plate, rng):
+    """Apply one random substitution, insertion or deletion."""
+    i = rng.randrange(len(plate))
+    operation = rng.choice(("substitute", "insert", "delete"))
+    if operation == "substitute":
+        return plate[:i] + rng.choice(LETTERS + DIGITS) + plate[i + 1:]
+    if operation == "insert":
+        return plate[:i] + rng.choice(LETTERS + DIGITS) + plate[i:]
+    return plate[:i] + plate[i + 1:]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def benchmark(size, queries_per_kind, rng):
+    groups = confusable_groups()
+    plates = set()
+    while len(plates) < size:
+        plates.add(random_plate(rng))
+    plates = sorted(plates)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = PlateFuzzyIndex(plates)
+    build_seconds = time.perf_counter() - started
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    sample = [rng.choice(plates) for _ in range(queries_per_kind)]
+    kinds = {
+        "exact": sample,
+        "confusion": [confuse(plate, rng, groups) for plate in sample],
+        "one edit": [edit(plate, rng) for plate in sample],
+        "miss": [random_plate(rng) for _ in range(queries_per_kind)],
+    }
+
+    print(f"{size:>7} plates: build {build_seconds:.2f}s, index memory {memory_mb:.1f} MB")
+    for kind, queries in kinds.items():
+        timings = []
+        found = 0
+        for query, original in zip(queries, sample):
+            started = time.perf_counter()
+            matches = index.search(query)
+            timings.append((time.perf_counter() - started) * 1e6)
+            found += any(plate == original for plate, _ in matches)
+        recall = f"{found / len(queries):6.1%}" if kind != "miss" else "     -"
+        print(f"    {kind:<10} p50 {statistics.median(timings):7.1f} us  "
+              f"p99 {percentile(timings, 0.99):7.1f} us  recall {recall}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Allow-list sizes to benchmark.")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries per query kind.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        benchmark(size, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measure the cost of the hot-path instrumentation (telemetry/metrics.py):
+a timed block and a counter increment, with metrics enabled and disabled,
+against an empty block. A frame goes through about eight timed blocks.
+
+    python benchmarks/bench_metrics.py --iterations 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path to import the application modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from telemetry.metrics import MetricsRegistry
+from config import METRICS_SETTINGS
+
+TIMED_BLOCKS_PER_FRAME = 8
+
+
+def per_call_ns(func, iterations):
+    started = time.perf_counter()
+    func(iterations)
+    return (time.perf_counter() - started) / iterations * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the metrics instrumentation overhead.")
+    parser.add_argument("--iterations", type=int, default=1000000)
+    args = parser.parse_args()
+
+    enabled = MetricsRegistry(dict(METRICS_SETTINGS, enabled=True))
+    disabled = MetricsRegistry(dict(METRICS_SETTINGS, enabled=False))
+    timer_on = enabled.histogram("bench_seconds")
+    timer_off = disabled.histogram("bench_seconds")
+    counter = enabled.counter("bench_total")
+
+    def empty(n):
+        for _ in range(n):
+            pass
+
+    def timed(histogram):
+        def run(n):
+            for _ in range(n):
+                with histogram.time():
+                    pass
+        return run
+
+    def counted(n):
+        for _ in range(n):
+            counter.inc()
+
+    baseline = per_call_ns(empty, args.iterations)
+    results = {
+        "timed block (enabled)": per_call_ns(timed(timer_on), args.iterations) - baseline,
+        "timed block (disabled)": per_call_ns(timed(timer_off), args.iterations) - baseline,
+        "counter increment": per_call_ns(counted, args.iterations) - baseline,
+    }
+    for name, ns in results.items():
+        print(f"{name:24s} {ns:8.0f} ns")
+
+    per_frame_us = results["timed block (enabled)"] * TIMED_BLOCKS_PER_FRAME / 1000
+    print(f"\nAbout {per_frame_us:.1f} us per frame ({TIMED_BLOCKS_PER_FRAME} timed blocks), "
+          f"{per_frame_us / 33333 * 100:.3f}% of a 30 FPS frame budget")
+
+
+if __name__ == "__main__":
+    main()
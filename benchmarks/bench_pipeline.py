@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline benchmark of the PlateDetector pipeline, to compare throughput
+between commits.
+
+Three modes are measured:
+  single   every image on its own: detection, then one OCR batch of its plates
+  batched  --batch-size images per detector call and one OCR batch of all their plates
+  video    frames decoded from a video file, one at a time, including decoding
+
+Per mode it reports p50/p95/p99 latency of each stage (capture, detect,
+preprocess, ocr, decode, total), frames/sec, plates/sec and the peak RSS of
+the process so far. Without the trained weights (or with --stub) both models
+are replaced by stubs that prepare their input like a real backend and
+return fixed detections, so the rest of the pipeline is still exercised.
+Without --images or --video synthetic frames are used.
+
+    python benchmarks/bench_pipeline.py --images runs/detect/yolo_car_plate2 --video lane.mp4 --json pipeline.json
+    python benchmarks/bench_pipeline.py --stub --modes single batched
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import the application modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from config import (OCR_INPUT_SIZE, DETECTOR_INPUT_SIZE, PLATE_DETECTOR_PATH, OCR_MODEL_PATH,
+                    INFERENCE_BACKEND, PREPROCESS_ENGINE)
+from model.backends import Detections, images_to_blob
+from model.charset import ARABIC_MAPPING
+from model.plate_detector import PlateDetector
+from model.preprocessing import preprocess_batch
+
+IMAGE_EXTENSIONS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+MODES = ("single", "batched", "video")
+STAGES = ("capture", "detect", "preprocess", "ocr", "decode", "total")
+
+# Stub plates as (x1, y1, x2, y2) fractions of the frame
+STUB_PLATES = np.array([[0.20, 0.60, 0.40, 0.70], [0.60, 0.55, 0.80, 0.65]], dtype=np.float32)
+STUB_PLATE_CHARS = 7
+
+
+class StubModel:
+    """
+    Stands in for a YOLO model: letterboxes its input like an exported
+    backend, then returns fixed relative boxes for every image.
+    """
+    def __init__(self, input_size, boxes, names):
+        self.input_size = input_size
+        self.boxes = boxes
+        self.names = names
+        self.classes = np.arange(len(boxes)) % len(names)
+
+    def warm_up(self):
+        pass
+
+    def predict(self, images):
+        images_to_blob(images, self.input_size)
+        results = []
+        for img in images:
+            h, w = img.shape[:2]
+            results.append(Detections(self.boxes * (w, h, w, h), np.full(len(self.boxes), 0.9),
+                                      self.classes, self.names))
+        return results
+
+
+def stub_detector(preprocess_engine):
+    """PlateDetector whose models are stubs; nothing is loaded."""
+    detector = PlateDetector(preprocess_engine)
+    detector.plate_model = StubModel(DETECTOR_INPUT_SIZE, STUB_PLATES, {0: "plate"})
+    # One character box per position, left to right across the crop
+    step = 1.0 / STUB_PLATE_CHARS
+    char_boxes = np.array([[i * step, 0.1, (i + 1) * step, 0.9] for i in range(STUB_PLATE_CHARS)],
+                          dtype=np.float32)
+    names = dict(enumerate(sorted(ARABIC_MAPPING)))
+    detector.ocr_model = StubModel(OCR_INPUT_SIZE, char_boxes, names)
+    return detector
+
+
+def load_images(image_dir):
+    paths = sorted(path for pattern in IMAGE_EXTENSIONS
+                   for path in glob.glob(os.path.join(image_dir, pattern)))
+    images = [cv2.imread(path) for path in paths]
+    return [img for img in images if img is not None]
+
+
+def synthetic_frames(count, width=1280, height=720, seed=0):
+    """Noisy frames with bright plate-like rectangles at varying positions."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        frame = rng.integers(0, 80, (height, width, 3), dtype=np.uint8)
+        x = 100 + (i * 37) % (width - 400)
+        cv2.rectangle(frame, (x, 450), (x + 220, 510), (230, 230, 230), -1)
+        cv2.putText(frame, f"{1000 + i}", (x + 20, 495), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (20, 20, 20), 3)
+        frames.append(frame)
+    return frames
+
+
+def write_video(frames, path, fps=30):
+    h, w = frames[0].shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+class StageTimer:
+    """Per-stage latency samples in seconds."""
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+
+    def run(self, stage, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.samples[stage].append(time.perf_counter() - started)
+        return result
+
+    def summary(self):
+        summary = {}
+        for stage, samples in self.samples.items():
+            if samples:
+                values = np.array(samples) * 1000
+                summary[stage] = {
+                    "count": len(samples),
+                    "mean_ms": round(float(values.mean()), 3),
+                    "p50_ms": round(float(np.percentile(values, 50)), 3),
+                    "p95_ms": round(float(np.percentile(values, 95)), 3),
+                    "p99_ms": round(float(np.percentile(values, 99)), 3),
+                }
+        return summary
+
+
+def recognize(detector, frames, timer):
+    """
+    Detect plates in frames with one detector call and read all of them
+    with one OCR batch. Returns the number of plates read.
+    """
+    started = time.perf_counter()
+    results = timer.run("detect", detector.plate_model.predict, frames)
+
+    crops = []
+    for frame, result in zip(frames, results):
+        plates = [(box, score) for box, score, cls in zip(result.xyxy, result.conf, result.cls) if int(cls) == 0]
+        crops.extend(frame[y1:y2, x1:x2] for (x1, y1, x2, y2), _ in detector.clip_plates(frame, plates))
+
+    texts = []
+    if crops:
+        batch = timer.run("preprocess", preprocess_batch, crops, OCR_INPUT_SIZE, detector.preprocess_engine)
+        ocr_results = timer.run("ocr", detector.ocr_model.predict, batch)
+        texts = timer.run("decode", detector.decode_batch_output, ocr_results)
+    timer.samples["total"].append(time.perf_counter() - started)
+    return len(texts)
+
+
+def run_images(detector, images, batch_size, repeats):
+    timer = StageTimer()
+    frames = plates = 0
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for i in range(0, len(images), batch_size):
+            batch = images[i:i + batch_size]
+            plates += recognize(detector, batch, timer)
+            frames += len(batch)
+    return timer, frames, plates, time.perf_counter() - started
+
+
+def run_video(detector, video_path):
+    timer = StageTimer()
+    frames = plates = 0
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Failed to open video {video_path}")
+    started = time.perf_counter()
+    try:
+        while True:
+            ret, frame = timer.run("capture", cap.read)
+            if not ret or frame is None:
+                # The failed read at the end is not a frame
+                timer.samples["capture"].pop()
+                break
+            plates += recognize(detector, [frame], timer)
+            frames += 1
+    finally:
+        cap.release()
+    return timer, frames, plates, time.perf_counter() - started
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the plate detection pipeline offline.")
+    parser.add_argument("--images", help="Directory of camera frames (default: synthetic frames)")
+    parser.add_argument("--video", help="Video file for the video mode (default: a synthetic clip)")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--batch-size", type=int, default=8, help="Images per detector call in batched mode")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the images")
+    parser.add_argument("--frames", type=int, default=60, help="Number of synthetic frames")
+    parser.add_argument("--engine", default=PREPROCESS_ENGINE, help="OCR preprocessing engine")
+    parser.add_argument("--stub", action="store_true", help="Use stub models even if the weights exist")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    stub = args.stub or not (os.path.exists(PLATE_DETECTOR_PATH) and os.path.exists(OCR_MODEL_PATH))
+    if stub:
+        print("Using stub models" + ("" if args.stub else " (weights not found)"))
+        detector = stub_detector(args.engine)
+    else:
+        detector = PlateDetector(args.engine)
+        detector.warm_up(background=False)
+
+    images = load_images(args.images) if args.images else synthetic_frames(args.frames)
+    if not images:
+        print(f"Error: No images found in {args.images}")
+        sys.exit(1)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "backend": "stub" if stub else INFERENCE_BACKEND["name"],
+        "precision": INFERENCE_BACKEND["precision"],
+        "preprocess_engine": args.engine,
+        "images": args.images or f"{len(images)} synthetic frames",
+        "modes": {},
+    }
+
+    # Warm-up so lazy initialisation is not timed
+    recognize(detector, images[:1], StageTimer())
+
+    temp_dir = None
+    print(f"{'mode':<9}{'frames':>8}{'fps':>9}{'plates/s':>10}{'total p50':>11}{'p95':>8}{'p99':>8}{'RSS MB':>9}")
+    for mode in args.modes:
+        if mode == "video":
+            video = args.video
+            if video is None:
+                temp_dir = tempfile.TemporaryDirectory()
+                video = os.path.join(temp_dir.name, "synthetic.avi")
+                write_video(synthetic_frames(args.frames), video)
+            timer, frames, plates, elapsed = run_video(detector, video)
+        else:
+            batch_size = args.batch_size if mode == "batched" else 1
+            timer, frames, plates, elapsed = run_images(detector, images, batch_size, args.repeats)
+
+        stages = timer.summary()
+        result = {
+            "frames": frames,
+            "plates": plates,
+            "seconds": round(elapsed, 3),
+            "fps": round(frames / elapsed, 2) if elapsed else None,
+            "plates_per_sec": round(plates / elapsed, 2) if elapsed else None,
+            "peak_rss_mb": peak_rss_mb(),
+            # Stage latencies are per detector call, i.e. per batch in batched mode
+            "batch_size": args.batch_size if mode == "batched" else 1,
+            "stages": stages,
+        }
+        report["modes"][mode] = result
+        total = stages.get("total", {})
+        print(f"{mode:<9}{frames:>8}{result['fps']:>9.1f}{result['plates_per_sec']:>10.1f}"
+              f"{total.get('p50_ms', 0):>11.1f}{total.get('p95_ms', 0):>8.1f}{total.get('p99_ms', 0):>8.1f}"
+              f"{result['peak_rss_mb']:>9.1f}")
+
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+    print("\nStage latency p50 / p95 / p99 (ms)")
+    for mode, result in report["modes"].items():
+        for stage, summary in result["stages"].items():
+            print(f"  {mode:<9}{stage:<12}{summary['p50_ms']:>8.2f}{summary['p95_ms']:>8.2f}{summary['p99_ms']:>8.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measure how plate recognition of several sources scales over the worker
+processes of engine/inference_pool.py. Every source submits the same
+synthetic frames as fast as the pool takes them; for each worker count
+the throughput, the speedup over one worker and the utilization of every
+worker are reported. "0" runs the same frames through one in-process
+TrackedRecognizer per source for comparison. The motion gate is switched
+off so every frame reaches the models. Without the trained weights (or
+with --stub) the stub models of bench_pipeline.py are used.
+
+    python benchmarks/bench_pool.py --sources 4 --workers 0 1 2 4 --json pool.json
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to import the application modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import MOTION_GATE, PLATE_DETECTOR_PATH, OCR_MODEL_PATH, PREPROCESS_ENGINE
+from engine.inference_pool import InferencePool
+from engine.recognizer import TrackedRecognizer
+from model.plate_detector import PlateDetector
+
+from bench_pipeline import stub_detector, synthetic_frames
+
+
+def make_detector(stub):
+    """Runs in every worker, which re-reads config.py when it is spawned."""
+    MOTION_GATE["enabled"] = False
+    return stub_detector(PREPROCESS_ENGINE) if stub else PlateDetector()
+
+
+def run_in_process(detector_factory, sources, frames):
+    detector = detector_factory()
+    detector.warm_up(background=False)
+    started = time.perf_counter()
+    for source in range(sources):
+        recognizer = TrackedRecognizer(detector)
+        for frame in frames:
+            recognizer.process(frame.copy())
+    return time.perf_counter() - started, {}
+
+
+def run_pool(detector_factory, workers, sources, frames):
+    total = sources * len(frames)
+    done = threading.Event()
+    received = []
+
+    def on_result(result):
+        if result.captured_at is not None:
+            received.append(result)
+            if len(received) == total:
+                done.set()
+
+    pool = InferencePool(on_result, workers, detector_factory=detector_factory)
+    for source in range(sources):
+        pool.add_source(f"source{source}")
+    pool.start()
+
+    def feed(source_id):
+        for frame in frames:
+            pool.submit(source_id, frame, time.monotonic(), block=True)
+
+    started = time.perf_counter()
+    feeders = [threading.Thread(target=feed, args=(f"source{source}",)) for source in range(sources)]
+    for feeder in feeders:
+        feeder.start()
+    done.wait()
+    elapsed = time.perf_counter() - started
+    stats = pool.stats()
+    pool.close()
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process inference pool.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4],
+                        help="Worker counts to measure; 0 detects in this process")
+    parser.add_argument("--sources", type=int, default=4, help="Simulated cameras")
+    parser.add_argument("--frames", type=int, default=120, help="Frames per source")
+    parser.add_argument("--stub", action="store_true", help="Use stub models even if the weights exist")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    stub = args.stub or not (os.path.exists(PLATE_DETECTOR_PATH) and os.path.exists(OCR_MODEL_PATH))
+    if stub:
+        print("Using stub models" + ("" if args.stub else " (weights not found)"))
+    detector_factory = functools.partial(make_detector, stub)
+    frames = synthetic_frames(args.frames)
+
+    results = {"cpus": os.cpu_count(), "sources": args.sources, "frames_per_source": args.frames,
+               "backend": "stub" if stub else "models", "runs": {}}
+    print(f"{args.sources} sources x {args.frames} frames, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'fps':>10}{'speedup':>9}  utilization per worker")
+    runs = results["runs"]
+    for workers in args.workers:
+        if workers:
+            elapsed, stats = run_pool(detector_factory, workers, args.sources, frames)
+        else:
+            elapsed, stats = run_in_process(detector_factory, args.sources, frames)
+        runs[workers] = {"seconds": round(elapsed, 3),
+                         "fps": round(args.sources * args.frames / elapsed, 1),
+                         "utilization": [worker_stats["utilization"] for worker_stats in stats.values()]}
+
+    # Speedup over one worker, or over the first run without one
+    baseline = runs[1]["fps"] if 1 in runs else runs[args.workers[0]]["fps"]
+    for workers, run in runs.items():
+        run["speedup"] = round(run["fps"] / baseline, 2)
+        print(f"{workers:>8}{run['fps']:>10.1f}{run['speedup']:>9.2f}  " +
+              " ".join(f"{value:.2f}" for value in run["utilization"]))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
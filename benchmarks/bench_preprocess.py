@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare OCR preprocessing engines on cropped plate images.
+
+Latency is measured per engine and batch size. Accuracy is reported as the
+pixel agreement of each engine's output with the "nlmeans" reference and,
+with --ocr, as the plate exact-match rate of the OCR model when the image
+directory contains a labels.csv (file name, plate text).
+
+    python benchmarks/bench_preprocess.py --images model/models/test_images/sample_plates
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import the application modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import OCR_INPUT_SIZE, SAMPLE_PLATES_DIR
+from model.preprocessing import PREPROCESSING_ENGINES, preprocess_batch
+
+IMAGE_EXTENSIONS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+
+
+def load_crops(image_dir):
+    paths = sorted(path for pattern in IMAGE_EXTENSIONS
+                   for path in glob.glob(os.path.join(image_dir, pattern)))
+    crops = [(os.path.basename(path), cv2.imread(path)) for path in paths]
+    return [(name, crop) for name, crop in crops if crop is not None]
+
+
+def synthetic_crops(count, rng):
+    """Plate-like crops (dark text on a light, noisy background) for latency runs."""
+    crops = []
+    for i in range(count):
+        w, h = int(rng.integers(90, 220)), int(rng.integers(30, 70))
+        crop = np.full((h, w, 3), int(rng.integers(150, 230)), dtype=np.uint8)
+        cv2.putText(crop, f"{i % 10}{(i * 7) % 10}{(i * 3) % 10}4", (5, h - 8),
+                    cv2.FONT_HERSHEY_SIMPLEX, h / 40.0, (30, 30, 30), 2)
+        noise = rng.normal(0, 12, crop.shape)
+        crops.append(np.clip(crop + noise, 0, 255).astype(np.uint8))
+    return [(f"synthetic_{i}", crop) for i, crop in enumerate(crops)]
+
+
+def load_labels(image_dir):
+    labels_path = os.path.join(image_dir, "labels.csv")
+    if not os.path.exists(labels_path):
+        return {}
+    with open(labels_path, newline="", encoding="utf-8") as f:
+        return {row[0]: "".join(row[1].split()) for row in csv.reader(f) if len(row) >= 2}
+
+
+def measure_latency(crops, engine, batch_size, repeats):
+    images = [crop for _, crop in crops]
+    batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for batch in batches:
+            preprocess_batch(batch, OCR_INPUT_SIZE, engine)
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeats * len(images)) * 1000
+
+
+def pixel_agreement(outputs, reference):
+    agreement = [np.mean(out[..., 0] == ref[..., 0]) for out, ref in zip(outputs, reference)]
+    return float(np.mean(agreement))
+
+
+def ocr_accuracy(detector, crops, labels, engine, batch_size):
+    correct = total = 0
+    for i in range(0, len(crops), batch_size):
+        names = [name for name, _ in crops[i:i + batch_size]]
+        batch = preprocess_batch([crop for _, crop in crops[i:i + batch_size]], OCR_INPUT_SIZE, engine)
+        texts = detector.decode_batch_output(detector.ocr_model.predict(batch))
+        for name, text in zip(names, texts):
+            if name in labels:
+                total += 1
+                correct += text == labels[name]
+    return correct / total if total else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", default=SAMPLE_PLATES_DIR,
+                        help="Directory of cropped plate images (synthetic crops are used if empty).")
+    parser.add_argument("--engines", nargs="+", default=list(PREPROCESSING_ENGINES),
+                        choices=PREPROCESSING_ENGINES)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--ocr", action="store_true",
+                        help="Also measure OCR exact-match accuracy (needs the models and labels.csv).")
+    args = parser.parse_args()
+
+    crops = load_crops(args.images) if os.path.isdir(args.images) else []
+    if not crops:
+        print(f"No images in {args.images}; using synthetic crops (latency only is meaningful).")
+        crops = synthetic_crops(32, np.random.default_rng(0))
+
+    detector, labels = None, {}
+    if args.ocr:
+        from model.plate_detector import PlateDetector
+        detector = PlateDetector()
+        labels = load_labels(args.images)
+
+    reference = preprocess_batch([crop for _, crop in crops], OCR_INPUT_SIZE, "nlmeans")
+
+    header = "".join(f"  batch {size:>2} ms/crop" for size in args.batch_sizes)
+    print(f"{len(crops)} crops, OCR input {OCR_INPUT_SIZE}x{OCR_INPUT_SIZE}")
+    print(f"{'engine':<10}{header}  agreement  exact match")
+    for engine in args.engines:
+        latencies = [measure_latency(crops, engine, size, args.repeats) for size in args.batch_sizes]
+        outputs = preprocess_batch([crop for _, crop in crops], OCR_INPUT_SIZE, engine)
+        agreement = pixel_agreement(outputs, reference)
+        accuracy = ocr_accuracy(detector, crops, labels, engine, max(args.batch_sizes)) if detector else None
+        accuracy_text = f"{accuracy:10.1%}" if accuracy is not None else "         -"
+        print(f"{engine:<10}" + "".join(f"{latency:>19.2f}" for latency in latencies)
+              + f"  {agreement:8.1%}  {accuracy_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare the old frame display path (BGR to RGB conversion, QImage, QPixmap,
+smooth QPixmap.scaled) with ui/frame_renderer.py: render time and bytes of
+NumPy/OpenCV buffers allocated per frame (tracked with tracemalloc; Qt's own
+allocations are not visible to it).
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_render.py --frame 1280x720 --label 640x480
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import the application modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QApplication
+
+from ui.frame_renderer import FrameRenderer
+
+
+def render_old(frame, label_size):
+    """The display path before FrameRenderer."""
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb_frame.shape
+    qt_image = QImage(rgb_frame.data, w, h, ch * w, QImage.Format_RGB888)
+    return QPixmap.fromImage(qt_image).scaled(label_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def measure(render, frames, label_size):
+    """Per-frame render times in ms and mean bytes allocated per frame."""
+    render(frames[0], label_size)
+    times = []
+    for frame in frames:
+        started = time.perf_counter()
+        render(frame, label_size)
+        times.append((time.perf_counter() - started) * 1000)
+
+    allocated = []
+    tracemalloc.start()
+    for frame in frames[:50]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        render(frame, label_size)
+        allocated.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    return times, float(np.mean(allocated))
+
+
+def parse_size(value):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the frame display path.")
+    parser.add_argument("--frame", type=parse_size, default=(1280, 720), help="Frame size WxH")
+    parser.add_argument("--label", type=parse_size, default=(640, 480), help="Display label size WxH")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = np.random.default_rng(0)
+    width, height = args.frame
+    # A few distinct frames so caches do not flatter either path
+    frames = [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(args.frames)]
+    label_size = QSize(*args.label)
+    renderer = FrameRenderer()
+
+    paths = {
+        "old (cvtColor + smooth scaled)": render_old,
+        "FrameRenderer (live)": lambda frame, size: renderer.render(frame, size, live=True),
+        "FrameRenderer (still)": lambda frame, size: renderer.render(frame, size, live=False),
+    }
+    print(f"frame {width}x{height} shown in {args.label[0]}x{args.label[1]}, {args.frames} frames")
+    print(f"{'path':<32}{'p50 ms':>8}{'p95 ms':>8}{'alloc KiB/frame':>17}")
+    for name, render in paths.items():
+        times, allocated = measure(render, frames, label_size)
+        print(f"{name:<32}{np.percentile(times, 50):>8.2f}{np.percentile(times, 95):>8.2f}"
+              f"{allocated / 1024:>17.1f}")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Check that the ONNX Runtime and OpenVINO decode path of model/backends.py
+matches ultralytics for the same input.
+
+No trained weights or exports are needed. Synthetic images of several
+shapes are letterboxed by images_to_blob and by ultralytics' LetterBox,
+and the blobs must be identical. Fixed raw YOLO outputs (overlapping boxes
+of several classes, seeded) are decoded by decode_predictions and by
+ultralytics' non_max_suppression + scale_boxes; the boxes, confidences
+and classes must match. The script exits with status 1 on a mismatch.
+Requires ultralytics (and so PyTorch).
+
+    python benchmarks/check_backend_parity.py
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path to import the application modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model.backends import (DEFAULT_CONF_THRESHOLD, DEFAULT_IOU_THRESHOLD, MAX_DETECTIONS,
+                            decode_predictions, images_to_blob, rect_input_shape)
+
+# (height, width) of the synthetic images: camera frames, wide ROI crops, odd sizes
+IMAGE_SHAPES = [(480, 640), (1080, 1920), (100, 400), (333, 517), (640, 640), (250, 90)]
+CLASS_NAMES = {0: "plate", 1: "car", 2: "other"}
+# ultralytics maps boxes back with the unrounded padding, decode_predictions
+# with the padding actually added, so they may differ by one input pixel
+BOX_TOLERANCE_PIXELS = 1.0
+
+
+def synthetic_images(rng):
+    return [rng.integers(0, 256, (h, w, 3), dtype=np.uint8) for h, w in IMAGE_SHAPES]
+
+
+def ultralytics_blob(images, size, rect):
+    """Preprocessing of ultralytics' predictor: LetterBox, BGR to RGB, CHW, [0, 1]."""
+    from ultralytics.data.augment import LetterBox
+
+    if rect:
+        # The predictor letterboxes a batch with auto=True only when all shapes match
+        letterbox = LetterBox((size, size), auto=True, stride=32)
+    else:
+        letterbox = LetterBox((size, size), auto=False)
+    padded = np.stack([letterbox(image=img) for img in images])
+    blob = padded[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+
+
+def synthetic_output(rng, input_shape, classes, anchors):
+    """
+    Raw (4 + classes, anchors) output of one image: clusters of overlapping
+    boxes around a few objects plus low-scoring background anchors.
+    """
+    height, width = input_shape
+    boxes = np.empty((anchors, 4), dtype=np.float32)
+    scores = rng.uniform(0.0, 0.2, (anchors, classes)).astype(np.float32)
+    objects = rng.integers(3, 8)
+    centers = rng.uniform((0.1 * width, 0.1 * height), (0.9 * width, 0.9 * height), (objects, 2))
+    sizes = rng.uniform((20, 10), (0.4 * width, 0.3 * height), (objects, 2))
+    owner = rng.integers(0, objects, anchors)
+    boxes[:, :2] = centers[owner] + rng.normal(0, 4, (anchors, 2))
+    boxes[:, 2:] = sizes[owner] * rng.uniform(0.8, 1.2, (anchors, 2))
+    # Most anchors of an object score high for its class, some for another class
+    object_class = rng.integers(0, classes, objects)
+    hits = rng.random(anchors) < 0.6
+    cls = np.where(rng.random(anchors) < 0.9, object_class[owner], rng.integers(0, classes, anchors))
+    scores[hits, cls[hits]] = rng.uniform(0.2, 0.99, hits.sum())
+    return np.concatenate([boxes, scores], axis=1).T
+
+
+def ultralytics_decode(output, input_shape, image_shapes):
+    """Postprocessing of ultralytics' detection predictor. Returns (xyxy, conf, cls) per image."""
+    import torch
+    from ultralytics.utils import ops
+
+    try:
+        from ultralytics.utils.nms import non_max_suppression
+    except ImportError:
+        # Older ultralytics releases keep NMS in ops
+        non_max_suppression = ops.non_max_suppression
+
+    predictions = non_max_suppression(torch.from_numpy(output), DEFAULT_CONF_THRESHOLD,
+                                      DEFAULT_IOU_THRESHOLD, max_det=MAX_DETECTIONS)
+    decoded = []
+    for prediction, shape in zip(predictions, image_shapes):
+        xyxy = ops.scale_boxes(input_shape, prediction[:, :4].clone(), shape)
+        decoded.append((xyxy.numpy(), prediction[:, 4].numpy(), prediction[:, 5].numpy()))
+    return decoded
+
+
+def sort_detections(xyxy, conf, cls):
+    order = np.lexsort((-conf, cls))
+    return xyxy[order], conf[order], cls[order]
+
+
+def check_preprocessing(images, size):
+    """Compare the square and rect blobs per image. Returns the mismatch messages."""
+    errors = []
+    for img in images:
+        for rect in (False, True):
+            blob, _ = images_to_blob([img], size, rect=rect)
+            expected = ultralytics_blob([img], size, rect)
+            mode = "rect" if rect else "square"
+            if blob.shape != expected.shape:
+                errors.append(f"{img.shape[:2]} {mode}: blob shape {blob.shape} != {expected.shape}")
+            elif not np.array_equal(blob, expected):
+                differing = np.count_nonzero(blob != expected) / blob.size
+                errors.append(f"{img.shape[:2]} {mode}: {differing:.2%} of the blob differs")
+    return errors
+
+
+def check_decoding(images, size, rng, batches, anchors):
+    """Decode random outputs both ways. Returns the mismatch messages and the boxes compared."""
+    errors, compared = [], 0
+    image_shapes = [img.shape[:2] for img in images]
+    for rect in (False, True):
+        input_shape = rect_input_shape(images, size) if rect else (size, size)
+        _, transforms = images_to_blob(images, size, rect=rect)
+        for batch in range(batches):
+            output = np.stack([synthetic_output(rng, input_shape, len(CLASS_NAMES), anchors)
+                               for _ in images])
+            detections = decode_predictions(output.copy(), transforms, image_shapes, CLASS_NAMES)
+            expected = ultralytics_decode(output.copy(), input_shape, image_shapes)
+            for shape, (scale, _), result, reference in zip(image_shapes, transforms, detections, expected):
+                where = f"{'rect' if rect else 'square'} batch {batch}, image {shape}"
+                xyxy, conf, cls = sort_detections(result.xyxy, result.conf, result.cls)
+                ref_xyxy, ref_conf, ref_cls = sort_detections(*reference)
+                if len(conf) != len(ref_conf):
+                    errors.append(f"{where}: {len(conf)} boxes, ultralytics {len(ref_conf)}")
+                    continue
+                compared += len(conf)
+                if not np.array_equal(cls, ref_cls) or not np.allclose(conf, ref_conf, atol=1e-6):
+                    errors.append(f"{where}: classes or confidences differ")
+                elif not np.allclose(xyxy, ref_xyxy, atol=BOX_TOLERANCE_PIXELS / scale + 1e-3):
+                    worst = np.abs(xyxy - ref_xyxy).max()
+                    errors.append(f"{where}: boxes differ by up to {worst:.2f} pixels")
+    return errors, compared
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the backend decode path against ultralytics.")
+    parser.add_argument("--size", type=int, default=640, help="Model input size")
+    parser.add_argument("--batches", type=int, default=20, help="Random outputs decoded per input shape")
+    parser.add_argument("--anchors", type=int, default=2000, help="Anchors per raw output")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        import ultralytics  # noqa: F401
+    except ImportError:
+        print("Error: ultralytics is required for the parity check (pip install ultralytics)")
+        sys.exit(2)
+
+    rng = np.random.default_rng(args.seed)
+    images = synthetic_images(rng)
+    errors = check_preprocessing(images, args.size)
+    print(f"Preprocessing: {len(images)} image shapes, square and rect, "
+          f"{'OK' if not errors else f'{len(errors)} mismatches'}")
+    decode_errors, compared = check_decoding(images, args.size, rng, args.batches, args.anchors)
+    print(f"Decoding: {compared} boxes in {2 * args.batches * len(images)} images, "
+          f"{'OK' if not decode_errors else f'{len(decode_errors)} mismatches'}")
+
+    errors += decode_errors
+    for error in errors[:20]:
+        print(f"  {error}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Check the cold-start import time of the application entry points.
+
+Each module in STARTUP_IMPORT_BUDGET["modules"] is imported in a fresh
+interpreter with -X importtime. The check fails when its cumulative import
+time exceeds the budget or when it imports one of the deferred inference
+libraries, which must only load on first inference.
+
+    python benchmarks/check_import_time.py
+    python benchmarks/check_import_time.py --json import_times.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Add parent directory to path to import config
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from config import STARTUP_IMPORT_BUDGET
+
+
+def profile_import(module):
+    """
+    Import module in a new interpreter with -X importtime.
+    Returns {imported module: (self us, cumulative us)}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+        # Keep the offscreen platform so the check also runs without a display
+        env=dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def check_module(module, runs, budget):
+    """Best of runs cold imports of module, checked against the budget."""
+    profiles = [profile_import(module) for _ in range(runs)]
+    best = min(profiles, key=lambda timings: timings[module][1])
+    total_ms = best[module][1] / 1000
+    deferred = sorted(name for name in best
+                      if name.split(".")[0] in budget["deferred"])
+    slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    return {
+        "module": module,
+        "total_ms": total_ms,
+        "budget_ms": budget["max_ms"],
+        "deferred_imported": deferred,
+        "slowest": [{"module": name, "self_ms": self_us / 1000} for name, (self_us, _) in slowest],
+        "passed": total_ms <= budget["max_ms"] and not deferred
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="Cold imports per module; the fastest counts")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for module in STARTUP_IMPORT_BUDGET["modules"]:
+        report = check_module(module, args.runs, STARTUP_IMPORT_BUDGET)
+        results.append(report)
+
+        status = "ok" if report["passed"] else "FAILED"
+        print(f"{module}: {report['total_ms']:.0f} ms (budget {report['budget_ms']} ms) {status}")
+        for entry in report["slowest"][:5]:
+            print(f"    {entry['self_ms']:7.1f} ms  {entry['module']}")
+        if report["deferred_imported"]:
+            print(f"    imports deferred modules: {', '.join(report['deferred_imported'][:5])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if not all(report["passed"] for report in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
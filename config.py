@@ -6,7 +6,9 @@ import os
 # Application paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "model", "models")
+RUNS_DIR = os.path.join(BASE_DIR, "runs", "detect")  # Trained YOLO weights: runs/detect/*/weights/best.pt
 DB_PATH = os.path.join(BASE_DIR, "cars.db")
+DB_ARCHIVE_PATH = os.path.join(BASE_DIR, "cars_archive.db")
 
 # Camera settings
 CAMERA_INDEX = 0  # Default camera index
@@ -14,9 +16,180 @@ CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 CAMERA_FPS = 30
 
-# Model paths
-PLATE_DETECTOR_PATH = os.path.join(MODEL_DIR, "plate_detector.xml")
-OCR_MODEL_PATH = os.path.join(MODEL_DIR, "ocr_model.pb")
+# Capture threads (engine/capture.py)
+CAPTURE_SETTINGS = {
+    "hw_acceleration": True,  # Ask OpenCV for hardware video decoding where available
+    "decode_ahead": 4,  # Decoded frames buffered ahead of the GUI
+    "realtime": True,  # Play video files at their native FPS; False reads them as fast as they decode
+    "max_lag": 1.0  # Seconds a paced file may fall behind before playback continues from now
+}
+
+# Model paths (.pt weights; exports are looked up next to them).
+# The PLATE_DETECTOR_PATH and OCR_MODEL_PATH environment variables override them.
+PLATE_DETECTOR_PATH = os.environ.get(
+    "PLATE_DETECTOR_PATH", os.path.join(RUNS_DIR, "yolo_car_plate", "weights", "best.pt"))
+OCR_MODEL_PATH = os.environ.get(
+    "OCR_MODEL_PATH", os.path.join(RUNS_DIR, "yolo11m_car_plate", "weights", "best.pt"))
+MODEL_WARM_UP = True  # Load and run both models in the background at startup instead of on the first frame
+
+# Cold-start import budget checked by benchmarks/check_import_time.py
+STARTUP_IMPORT_BUDGET = {
+    "modules": ("ui.main_window", "headless"),  # Entry point imports that are measured
+    "max_ms": 500,  # Cumulative import time allowed for each of them
+    "deferred": ("torch", "ultralytics", "onnxruntime", "openvino")  # Must only load on first inference
+}
+
+# Inference backend for both YOLO models (see model/backends.py):
+# "ultralytics" (PyTorch), "onnxruntime" or "openvino". The last two need
+# the exports created by model/export_models.py.
+INFERENCE_BACKEND = {
+    "name": "ultralytics",
+    "intra_op_threads": 0,  # Threads used inside one operator, 0 = one per physical core
+    "inter_op_threads": 1,  # Operators run in parallel; 1 is fastest for sequential YOLO graphs
+    # "fp32" or "int8" (onnxruntime only). INT8 models are created by model/quantize.py
+    # and load only after passing its accuracy regression gate.
+    "precision": "fp32"
+}
+
+# Accuracy regression gate for INT8 models (model/quantize.py evaluate):
+# largest allowed drop against the FP32 detector
+QUANTIZATION_GATE = {
+    "max_exact_match_drop": 0.01,  # Share of plates read exactly right
+    "max_char_accuracy_drop": 0.005  # 1 - character edit distance / plate length, averaged
+}
+DETECTOR_INPUT_SIZE = 640  # Longest side of the detector input; smaller values trade small plates for speed
+
+# Regions of interest per capture source (model/roi.py). Keys are camera
+# indexes, video files or stream URLs as given to the application, or
+# "default". Values are lists of polygons whose (x, y) points are fractions
+# of the frame width and height. Only the bounding box of the polygons is
+# sent to the detector; sources without an entry use the whole frame.
+CAMERA_ROIS = {
+    # "0": [[(0.0, 0.4), (1.0, 0.4), (1.0, 0.95), (0.0, 0.95)]],
+}
+
+# OCR settings
+OCR_INPUT_SIZE = 320  # Plate crops are letterboxed to this square size and batched
+# Crop preprocessing before OCR: "nlmeans", "bilateral", "median", "open" or "none".
+# Compare their OCR accuracy on labelled crops with benchmarks/bench_preprocess.py --ocr
+# before changing the default.
+PREPROCESS_ENGINE = "nlmeans"
+SAMPLE_PLATES_DIR = os.path.join(MODEL_DIR, "test_images", "sample_plates")
+OCR_CONF_THRESHOLD = 0.5  # Minimum character confidence kept by decode_output
+
+# OCR voting settings: repeated reads of a tracked plate are combined per
+# character; once settled the plate is not read again
+OCR_VOTING = {
+    "min_reads": 3,  # Reads needed before a plate can settle
+    "min_agreement": 0.7,  # Share of weighted votes the winning length and every character need
+    "max_reads": 10,  # Stop reading an unsettled plate after this many reads unless its crop improves
+    "min_char_conf": 0.25  # Characters below this confidence do not vote
+}
+
+# Inference settings
+INFERENCE_QUEUE_SIZE = 2  # Frames waiting for detection; the oldest is dropped when full
+FRAME_BUFFER_SIZE = 8  # Recent raw frames kept for display and detection (engine/frame_buffer.py)
+HEADLESS_STATS_INTERVAL = 10  # Seconds between statistics reports of headless.py
+
+# Motion gate: plate detection only runs on frames with motion in the
+# region of interest, plus a periodic check (model/motion.py)
+MOTION_GATE = {
+    "enabled": True,
+    "width": 160,  # Frames are compared as thumbnails of this width
+    "pixel_threshold": 25,  # Gray level change for a thumbnail pixel to count as changed
+    "min_motion": 0.01,  # Share of changed pixels that counts as motion
+    "hold_frames": 5,  # Frames still processed after motion stops
+    "force_interval": 1.0  # Seconds after which a frame is processed even without motion
+}
+
+# Inference in worker processes for several cameras (engine/inference_pool.py)
+INFERENCE_POOL = {
+    "workers": 0,  # Worker processes, each with its own models; 0 = detect in the main process
+    "threads_per_worker": 1,  # Inference threads of every worker (INFERENCE_BACKEND["intra_op_threads"])
+    "pin_cpus": True,  # Bind every worker to its own cores where the OS allows it
+    "slots_per_worker": 4,  # Shared-memory frame slots per worker; frames are dropped when all are in use
+    "max_frame_size": (1920, 1080)  # Largest frame (width, height) a slot holds
+}
+
+# Offline batch processing of image folders and video archives (batch_process.py)
+BATCH_SETTINGS = {
+    "workers": 0,  # Worker processes, each with its own models; 0 = one per threads_per_worker cores
+    "threads_per_worker": 1,  # Inference threads of every worker (INFERENCE_BACKEND["intra_op_threads"])
+    "pin_cpus": True,  # Bind every worker to its own cores where the OS allows it
+    "video_stride": 5,  # Detect every Nth video frame; the others are grabbed but not decoded
+    "image_extensions": (".jpg", ".jpeg", ".png", ".bmp"),
+    "video_extensions": (".mp4", ".avi", ".mov", ".mkv")
+}
+
+# Adaptive frame scheduling: every Nth frame of a source is detected, with N
+# chosen from the measured detection latency (engine/scheduler.py)
+SCHEDULER_SETTINGS = {
+    "enabled": True,
+    "cpu_budget": 0.8,  # Share of one core detection may use per source
+    "latency_slo": 0.5,  # Seconds from capture to result (p95) before backing off further
+    "max_stride": 15,  # Detect at least every this many frames
+    "unsettled_boost": 2,  # Stride divisor while a tracked plate is still unsettled
+    "window": 50,  # Latency samples kept for the percentiles
+    "adjust_interval": 1.0  # Seconds between stride updates
+}
+
+# Hot-path timings and counters (telemetry/metrics.py). With http_port set they are
+# served as Prometheus text on http://http_host:http_port/metrics; with json_log set a
+# JSON snapshot is appended to that file every json_log_interval seconds.
+METRICS_SETTINGS = {
+    "enabled": True,
+    "http_host": "127.0.0.1",
+    "http_port": None,  # e.g. 9108
+    "json_log": None,  # e.g. "metrics.jsonl"
+    "json_log_interval": 60,
+    # Upper bounds of the timing histogram buckets in milliseconds
+    "buckets_ms": (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+}
+
+# Plate tracking settings
+TRACKER_SETTINGS = {
+    "iou_threshold": 0.3,  # Minimum overlap to continue a track
+    "max_centroid_distance": 0.5,  # Fallback match distance, as a fraction of the plate diagonal
+    "max_missed": 10,  # Processed frames a plate may be missing before its track ends
+    "min_hits": 3,  # Frames a track needs before it produces a plate event
+    "ocr_improvement": 1.2  # After OCR_VOTING["max_reads"], re-read only when the crop quality grows by this factor
+}
+
+# Database connection settings
+DB_CONNECTION_SETTINGS = {
+    "journal_mode": "WAL",  # Readers never block the writer and vice versa
+    "synchronous": "NORMAL",  # Safe with WAL; skips an fsync on every commit
+    "cache_size": -8000,  # Page cache per connection, negative values are KiB
+    "cached_statements": 128,  # Prepared statements kept per connection
+    "timeout": 5.0  # Seconds to wait for a lock held by another connection
+}
+
+# Seconds between checks for allowed_cars changes made by other processes
+ALLOWED_CARS_CHECK_INTERVAL = 1.0
+
+# Fuzzy plate matching for OCR errors (see model/charset.py for confusable characters)
+FUZZY_MATCH = {
+    "enabled": True,  # Fall back to the closest allowed plate when there is no exact match
+    "max_cost": 1.0,  # Largest edit cost of find_similar_plates suggestions; one unrelated character error
+    "max_lookup_cost": 0.5,  # Largest cost a lookup accepts on its own; keep below 2 x confusion_cost (one swap)
+    "confusion_cost": 0.3,  # Cost of substituting two easily confused characters
+    "resolved_cache_size": 10000  # Fuzzy lookup outcomes (matches and misses) kept per plate
+}
+
+# Background writer for detected_cars rows
+DETECTION_WRITER_SETTINGS = {
+    "batch_size": 100,  # Rows written per transaction
+    "flush_interval": 1.0,  # Seconds before a partial batch is written
+    "max_pending": 10000,  # Rows buffered in memory before callers are throttled
+    "block_timeout": 0.5  # Seconds a caller waits for room before its row is dropped
+}
+
+# detected_cars retention: older rows move to per-month tables in DB_ARCHIVE_PATH
+RETENTION_SETTINGS = {
+    "enabled": True,
+    "hot_days": 30,  # Days of detections kept in detected_cars
+    "interval_hours": 6  # How often the archive job runs
+}
 
 # Database settings
 DB_SETTINGS = {
@@ -36,7 +209,7 @@ DB_SETTINGS = {
         "columns": {
             "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
             "plate_number": "TEXT NOT NULL",
-            "timestamp": "TEXT NOT NULL"
+            "timestamp": "INTEGER NOT NULL"  # Unix epoch seconds
         }
     }
 }
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+import unicodedata
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import ALLOWED_CARS_CHECK_INTERVAL, FUZZY_MATCH
+
+from database.fuzzy_index import PlateFuzzyIndex
+
+# Bumped by triggers on every allowed_cars change (database/migrations.py)
+SELECT_ALLOWED_CARS_VERSION_SQL = 'SELECT version FROM allowed_cars_version WHERE id = 0'
+
+
+def normalize_plate(plate_number):
+    """Canonical form of a plate number for lookups: NFKC normalized, whitespace removed."""
+    return "".join(unicodedata.normalize("NFKC", plate_number).split())
+
+
+def row_to_info(row):
+    """Convert an allowed_cars row to (car_info, driver_info) dictionaries."""
+    car_info = {
+        "Plate Number": row[0],
+        "Model": row[4] or "N/A",
+        "Color": row[5] or "N/A"
+    }
+
+    driver_info = {
+        "Owner Name": row[1],
+        "National ID": row[2],
+        "Phone Number": row[3]
+    }
+
+    return car_info, driver_info
+
+
+class AllowedCarsCache:
+    """
+    In-memory copy of the allowed_cars table keyed by normalized plate.
+    Lookups, including misses, are dictionary hits. Changes made through
+    DatabaseHandler are applied directly; changes made by other processes
+    are picked up on a dedicated connection at most every check_interval
+    seconds. PRAGMA data_version tells cheaply whether anything was
+    committed; it also changes with every detected_cars insert, so the
+    table is only reloaded when the allowed_cars version row changed too.
+    Plates without an exact match can be resolved through a fuzzy index
+    that tolerates OCR errors, but only when the single difference is a
+    swap of two easily confused characters (max_lookup_cost below twice
+    the confusion cost). Several swaps or any other edit could turn a
+    stranger's plate into an allowed one; those are only offered by
+    similar() as suggestions. The outcome of every fuzzy search, a match
+    or "not allowed", is kept per normalized plate until the table
+    changes, so repeated reads stay dictionary hits.
+    """
+    def __init__(self, load_rows, connection, check_interval=ALLOWED_CARS_CHECK_INTERVAL,
+                 fuzzy_match=FUZZY_MATCH["enabled"], max_lookup_cost=FUZZY_MATCH["max_lookup_cost"],
+                 resolved_size=FUZZY_MATCH["resolved_cache_size"]):
+        self.load_rows = load_rows
+        self.check_interval = check_interval
+        self.fuzzy_match = fuzzy_match
+        self.max_lookup_cost = max_lookup_cost
+        self.resolved_size = resolved_size
+        self.reloads = 0
+        self._connection = connection
+        self._entries = {}
+        self._index = PlateFuzzyIndex()
+        self._resolved = {}  # normalized plate without exact match -> fuzzy entry or None
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._allowed_version = None
+        self._next_check = 0.0
+
+    def load(self):
+        """(Re)load the whole table."""
+        with self._lock:
+            # Read the version first so writes during the load trigger another reload
+            self._data_version = self._read_data_version()
+            self._allowed_version = self._read_allowed_version()
+            self._entries = {normalize_plate(row[0]): row_to_info(row) for row in self.load_rows()}
+            self._index = PlateFuzzyIndex(self._entries)
+            self._resolved = {}
+            self._next_check = time.monotonic() + self.check_interval
+            self.reloads += 1
+
+    def get(self, plate_number):
+        """
+        Return (car_info, driver_info) for a plate, or (None, None) if it is
+        not allowed. car_info["Matched Plate"] is the allowed plate that was
+        found and car_info["Fuzzy Match"] is True when it differs from
+        plate_number by OCR confusions.
+        """
+        if time.monotonic() >= self._next_check:
+            self._check_for_changes()
+
+        key = normalize_plate(plate_number)
+        entry = self._entries.get(key)
+        fuzzy = False
+        if entry is None and self.fuzzy_match:
+            entry = self._fuzzy_get(key)
+            fuzzy = entry is not None
+        if entry is None:
+            return None, None
+        car_info, driver_info = entry
+        car_info = dict(car_info, **{"Matched Plate": car_info["Plate Number"], "Fuzzy Match": fuzzy})
+        return car_info, dict(driver_info)
+
+    def similar(self, plate_number, max_cost=None, limit=5):
+        """Return up to limit (plate_number, cost) pairs of allowed plates close to plate_number."""
+        with self._lock:
+            matches = self._index.search(normalize_plate(plate_number), max_cost, limit)
+            return [(self._entries[key][0]["Plate Number"], cost) for key, cost in matches]
+
+    def _fuzzy_get(self, key):
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        with self._lock:
+            matches = self._index.search(key, self.max_lookup_cost, limit=2)
+            # Only accept a single clear winner
+            if not matches or (len(matches) > 1 and matches[1][1] == matches[0][1]):
+                entry = None
+            else:
+                entry = self._entries.get(matches[0][0])
+            if len(self._resolved) >= self.resolved_size:
+                # OCR noise produces endless distinct misses; start over instead of growing
+                self._resolved = {}
+            self._resolved[key] = entry
+            return entry
+
+    def put(self, row):
+        """Add or replace one allowed car."""
+        car_info, driver_info = row_to_info(row)
+        key = normalize_plate(row[0])
+        with self._lock:
+            self._entries[key] = (car_info, driver_info)
+            self._index.add(key)
+            self._resolved = {}
+
+    def remove(self, plate_number):
+        """Forget one allowed car."""
+        key = normalize_plate(plate_number)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._index.remove(key)
+            self._resolved = {}
+
+    def close(self):
+        """Close the change-check connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _read_data_version(self):
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_allowed_version(self):
+        return self._connection.execute(SELECT_ALLOWED_CARS_VERSION_SQL).fetchone()[0]
+
+    def _check_for_changes(self):
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            data_version = self._read_data_version()
+            if data_version == self._data_version:
+                return
+            # Something was committed, usually detections
+            self._data_version = data_version
+            changed = self._read_allowed_version() != self._allowed_version
+        if changed:
+            # Also triggered by this process' own writes, which are already
+            # applied; reloading keeps the cache exact either way
+            self.load()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sqlite3
+import threading
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DB_PATH, DB_CONNECTION_SETTINGS
+
+
+class ConnectionManager:
+    """
+    Long-lived SQLite connections, one per thread.
+    Each thread opens its connection on first use and keeps it, so the
+    database file is opened and the schema parsed once per thread instead
+    of on every query. Connections use WAL journaling and keep a cache of
+    prepared statements for the SQL they run.
+    """
+    def __init__(self, db_path=DB_PATH, settings=DB_CONNECTION_SETTINGS):
+        self.db_path = db_path
+        self.settings = settings
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        """Return the calling thread's connection, opening it if needed."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self.open_connection()
+            self._local.connection = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def open_connection(self):
+        """Open a new, unmanaged connection with the configured settings."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.settings["timeout"],
+            cached_statements=self.settings["cached_statements"],
+            # Only close_all touches a connection from another thread
+            check_same_thread=False
+        )
+        conn.execute(f"PRAGMA journal_mode={self.settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous={self.settings['synchronous']}")
+        conn.execute(f"PRAGMA cache_size={self.settings['cache_size']}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def close_all(self):
+        """Close every connection opened by any thread."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Database error: {str(e)}")
+        self._local = threading.local()
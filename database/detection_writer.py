@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sqlite3
+import threading
+import time
+from collections import deque
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DETECTION_WRITER_SETTINGS
+
+from telemetry.metrics import metrics
+
+
+class DetectionWriter(threading.Thread):
+    """
+    Write-behind queue for detected_cars rows.
+    Rows are buffered in memory and written by write_batch(rows) on this
+    thread, one transaction per batch, whenever batch_size rows are pending
+    or flush_interval seconds have passed. When max_pending rows are already
+    waiting, callers block for up to block_timeout seconds and the row is
+    dropped if there is still no room. The counters are exported as
+    metrics while the writer runs.
+    """
+    def __init__(self, write_batch, settings=DETECTION_WRITER_SETTINGS):
+        super().__init__(daemon=True)
+        self.write_batch = write_batch
+        self.batch_size = settings["batch_size"]
+        self.flush_interval = settings["flush_interval"]
+        self.max_pending = settings["max_pending"]
+        self.block_timeout = settings["block_timeout"]
+
+        self._pending = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._flush_requested = False
+        self._closed = False
+
+        # Backpressure and throughput counters
+        self.enqueued = 0
+        self.written = 0
+        self.throttled = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.blocked_time = 0.0
+        self.max_depth = 0
+
+    def add(self, row):
+        """Queue one row. Returns False if it had to be dropped."""
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self._pending) >= self.max_pending:
+                # Backpressure: wait for the writer to make room
+                self.throttled += 1
+                started = time.monotonic()
+                self._condition.wait_for(lambda: len(self._pending) < self.max_pending or self._closed,
+                                         self.block_timeout)
+                self.blocked_time += time.monotonic() - started
+                if len(self._pending) >= self.max_pending or self._closed:
+                    self.dropped += 1
+                    return False
+
+            self._pending.append(row)
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self._pending))
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+            return True
+
+    def flush(self, timeout=None):
+        """Write all queued rows now and wait until they are committed."""
+        with self._condition:
+            if not self.is_alive():
+                return
+            self._flush_requested = True
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def close(self):
+        """Write the remaining rows and stop the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self.is_alive():
+            self.join()
+
+    def stats(self):
+        """Return the writer counters as a dictionary."""
+        with self._condition:
+            return {
+                "pending": len(self._pending),
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "throttled": self.throttled,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "blocked_seconds": round(self.blocked_time, 3),
+            }
+
+    def collect_metrics(self):
+        """stats() as (name, type, labels, value) metrics, see telemetry/metrics.py."""
+        stats = self.stats()
+        return [
+            ("lpr_db_writer_pending_rows", "gauge", {}, stats["pending"]),
+            ("lpr_db_writer_max_depth_rows", "gauge", {}, stats["max_depth"]),
+            ("lpr_db_writer_rows_enqueued_total", "counter", {}, stats["enqueued"]),
+            ("lpr_db_writer_rows_written_total", "counter", {}, stats["written"]),
+            ("lpr_db_writer_rows_throttled_total", "counter", {}, stats["throttled"]),
+            ("lpr_db_writer_rows_dropped_total", "counter", {}, stats["dropped"]),
+            ("lpr_db_writer_rows_failed_total", "counter", {}, stats["failed"]),
+            ("lpr_db_writer_flushes_total", "counter", {}, stats["flushes"]),
+            ("lpr_db_writer_blocked_seconds_total", "counter", {}, stats["blocked_seconds"]),
+        ]
+
+    def run(self):
+        # Stays registered after close() so final snapshots include the writer
+        if self.collect_metrics not in metrics.collectors():
+            metrics.add_collector(self.collect_metrics)
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or self._flush_requested or len(self._pending) >= self.batch_size,
+                    self.flush_interval
+                )
+                self._flush_requested = False
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                self._in_flight = len(batch)
+                closing = self._closed and not self._pending
+                # Writers blocked on a full queue can continue
+                self._condition.notify_all()
+
+            if batch:
+                try:
+                    self.write_batch(batch)
+                    self.written += len(batch)
+                    self.flushes += 1
+                except sqlite3.Error as e:
+                    self.failed += len(batch)
+                    print(f"Database error: {str(e)}")
+
+            with self._condition:
+                self._in_flight = 0
+                if self._pending:
+                    # More than one batch was waiting; keep writing
+                    self._flush_requested = True
+                self._condition.notify_all()
+
+            if closing:
+                break
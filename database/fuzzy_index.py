@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from itertools import combinations
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FUZZY_MATCH
+
+from model.charset import confusable_groups
+
+
+class PlateFuzzyIndex:
+    """
+    Index of plate numbers for matching OCR output with recognition errors.
+
+    Distance is an edit distance where substituting two easily confused
+    characters (see model/charset.py) costs confusion_cost and any other
+    insertion, deletion or substitution costs 1.
+
+    Every plate is stored under its canonical form (each character replaced
+    by the representative of its confusable group) and under every variant
+    of that form with up to floor(max_cost) characters deleted. A query only
+    has to look up its own deletion variants to find every plate within
+    max_cost, so search time does not grow with the size of the allow-list.
+    """
+    def __init__(self, plates=(), max_cost=FUZZY_MATCH["max_cost"],
+                 confusion_cost=FUZZY_MATCH["confusion_cost"]):
+        self.max_cost = max_cost
+        self.confusion_cost = confusion_cost
+        self.max_deletes = int(max_cost)
+        self._canonical_chars = {}
+        for group in confusable_groups():
+            representative = min(group)
+            for char in group:
+                self._canonical_chars[char] = representative
+        self._variants = {}  # deletion variant -> plate or set of plates
+        self._plates = set()
+        for plate in plates:
+            self.add(plate)
+
+    def __len__(self):
+        return len(self._plates)
+
+    def __contains__(self, plate):
+        return plate in self._plates
+
+    def canonical(self, plate):
+        """Replace every character by the representative of its confusable group."""
+        return "".join(self._canonical_chars.get(char, char) for char in plate)
+
+    def add(self, plate):
+        """Add a plate to the index."""
+        if plate in self._plates:
+            return
+        self._plates.add(plate)
+        for variant in self._deletion_variants(self.canonical(plate)):
+            entry = self._variants.get(variant)
+            if entry is None:
+                # Most variants belong to a single plate; avoid a set per entry
+                self._variants[variant] = plate
+            elif isinstance(entry, set):
+                entry.add(plate)
+            else:
+                self._variants[variant] = {entry, plate}
+
+    def remove(self, plate):
+        """Remove a plate from the index."""
+        if plate not in self._plates:
+            return
+        self._plates.discard(plate)
+        for variant in self._deletion_variants(self.canonical(plate)):
+            entry = self._variants.get(variant)
+            if isinstance(entry, set):
+                entry.discard(plate)
+                if len(entry) == 1:
+                    self._variants[variant] = entry.pop()
+            elif entry == plate:
+                del self._variants[variant]
+
+    def search(self, query, max_cost=None, limit=5):
+        """
+        Return up to limit (plate, cost) pairs within max_cost of query,
+        cheapest first. max_cost cannot exceed the bound the index was built for.
+        """
+        max_cost = self.max_cost if max_cost is None else min(max_cost, self.max_cost)
+
+        candidates = set()
+        for variant in self._deletion_variants(self.canonical(query)):
+            entry = self._variants.get(variant)
+            if entry is None:
+                continue
+            if isinstance(entry, set):
+                candidates.update(entry)
+            else:
+                candidates.add(entry)
+
+        matches = []
+        for plate in candidates:
+            cost = self.distance(query, plate, max_cost)
+            if cost <= max_cost:
+                matches.append((plate, cost))
+
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches[:limit]
+
+    def distance(self, a, b, max_cost=float("inf")):
+        """
+        Confusion-weighted edit distance between two plates.
+        Stops early and returns a value above max_cost once it is exceeded.
+        """
+        if abs(len(a) - len(b)) > max_cost:
+            return float("inf")
+
+        previous = [float(j) for j in range(len(b) + 1)]
+        for i, char_a in enumerate(a, 1):
+            current = [float(i)]
+            canonical_a = self._canonical_chars.get(char_a, char_a)
+            for j, char_b in enumerate(b, 1):
+                if char_a == char_b:
+                    substitution = 0.0
+                elif canonical_a == self._canonical_chars.get(char_b, char_b):
+                    substitution = self.confusion_cost
+                else:
+                    substitution = 1.0
+                current.append(min(previous[j] + 1.0,
+                                   current[j - 1] + 1.0,
+                                   previous[j - 1] + substitution))
+            if min(current) > max_cost:
+                return float("inf")
+            previous = current
+
+        return previous[-1]
+
+    def _deletion_variants(self, text):
+        variants = {text}
+        for deletes in range(1, min(self.max_deletes, len(text)) + 1):
+            for positions in combinations(range(len(text)), deletes):
+                variants.add("".join(char for i, char in enumerate(text) if i not in positions))
+        return variants
@@ -2,100 +2,123 @@
 # -*- coding: utf-8 -*-
 
 import sqlite3
-from datetime import datetime
+import time
 import os
 import sys
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DB_PATH, DB_SETTINGS
+from config import DB_PATH, DB_ARCHIVE_PATH, DB_SETTINGS, RETENTION_SETTINGS
+
+from database.connection import ConnectionManager
+from database.allowed_cache import AllowedCarsCache
+from database.detection_writer import DetectionWriter
+from database.migrations import migrate
+from database.retention import archive_detections, RetentionJob
+from telemetry.metrics import metrics
+
+LOOKUP_TIME = metrics.histogram("lpr_db_lookup_seconds", "Allowed car lookup per plate")
+
+# SQL is kept constant so each connection reuses its prepared statements
+INSERT_ALLOWED_CAR_SQL = '''
+    INSERT INTO allowed_cars (plate_number, owner_name, national_id, phone_number, car_model, car_color)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+DELETE_ALLOWED_CAR_SQL = 'DELETE FROM allowed_cars WHERE plate_number = ?'
+SELECT_ALL_ALLOWED_CARS_SQL = 'SELECT * FROM allowed_cars'
+INSERT_DETECTED_CAR_SQL = 'INSERT INTO detected_cars (plate_number, timestamp) VALUES (?, ?)'
+# Timestamps are stored as epoch seconds and returned as local time text
+SELECT_DETECTED_CARS_SQL = '''
+    SELECT plate_number, datetime(timestamp, 'unixepoch', 'localtime')
+    FROM detected_cars ORDER BY timestamp DESC
+'''
+SELECT_LAST_10_DETECTED_CARS_SQL = '''
+    SELECT plate_number, datetime(timestamp, 'unixepoch', 'localtime')
+    FROM detected_cars ORDER BY timestamp DESC LIMIT 10
+'''
 
 class DatabaseHandler:
-    def __init__(self):
+    def __init__(self, db_path=DB_PATH, archive_path=DB_ARCHIVE_PATH,
+                 retention=RETENTION_SETTINGS["enabled"]):
+        self.archive_path = archive_path
+        self.connections = ConnectionManager(db_path)
         self.setup_database()
-    
+
+        # Plate lookups are served from memory
+        self.allowed_cars = AllowedCarsCache(self.get_all_allowed_cars,
+                                             self.connections.open_connection())
+        self.allowed_cars.load()
+
+        # Detections are written in batches on a background thread
+        self.detection_writer = DetectionWriter(self.write_detected_cars)
+        self.detection_writer.start()
+
+        # Old detections are moved out of the hot table periodically
+        self.retention_job = None
+        if retention:
+            self.retention_job = RetentionJob(self.archive_old_detections)
+            self.retention_job.start()
+
     def setup_database(self):
-        conn = None
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-
-            # Create tables based on config
-            for table_name, table_info in DB_SETTINGS.items():
-                columns = [f"{col_name} {col_type}" 
-                          for col_name, col_type in table_info["columns"].items()]
-                create_table_sql = f'''
-                    CREATE TABLE IF NOT EXISTS {table_info["table_name"]} (
-                        {", ".join(columns)}
-                    )
-                '''
-                cursor.execute(create_table_sql)
-
-            conn.commit()
+            conn = self.connections.connection()
+            with conn:
+                # Create tables based on config
+                for table_name, table_info in DB_SETTINGS.items():
+                    columns = [f"{col_name} {col_type}"
+                              for col_name, col_type in table_info["columns"].items()]
+                    create_table_sql = f'''
+                        CREATE TABLE IF NOT EXISTS {table_info["table_name"]} (
+                            {", ".join(columns)}
+                        )
+                    '''
+                    conn.execute(create_table_sql)
+
+            migrate(conn)
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    def close(self):
+        """Write pending detections and close all database connections."""
+        if self.retention_job is not None:
+            self.retention_job.stop()
+        self.detection_writer.close()
+        self.allowed_cars.close()
+        self.connections.close_all()
 
     def get_info_by_plate(self, plate_number):
         """Get car and driver information for a given plate number."""
         if not plate_number or plate_number == "None":
             return None, None
-            
-        conn = None
+
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            
-            # Get car and driver info
-            cursor.execute('''
-                SELECT plate_number, owner_name, national_id, phone_number, car_model, car_color
-                FROM allowed_cars
-                WHERE plate_number = ?
-            ''', (plate_number,))
-            
-            result = cursor.fetchone()
-            
-            if result:
-                # Convert to dictionaries
-                car_info = {
-                    "Plate Number": result[0],
-                    "Model": result[4] or "N/A",
-                    "Color": result[5] or "N/A"
-                }
-                
-                driver_info = {
-                    "Owner Name": result[1],
-                    "National ID": result[2],
-                    "Phone Number": result[3]
-                }
-                
-                return car_info, driver_info
-            
-            return None, None
+            with LOOKUP_TIME.time():
+                return self.allowed_cars.get(plate_number)
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    def find_similar_plates(self, plate_number, max_cost=None, limit=5):
+        """
+        Find allowed plates that differ from plate_number by likely OCR errors.
+        Returns a list of (plate_number, cost) pairs, closest first.
+        """
+        if not plate_number or plate_number == "None":
+            return []
+        return self.allowed_cars.similar(plate_number, max_cost, limit)
 
     def add_allowed_car(self, plate_number, owner_name, national_id, phone_number, car_model=None, car_color=None):
         # Validate required fields
         if not all([plate_number, owner_name, national_id, phone_number]):
             raise ValueError("Required fields cannot be empty")
-            
-        conn = None
+
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO allowed_cars (plate_number, owner_name, national_id, phone_number, car_model, car_color)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (plate_number, owner_name, national_id, phone_number, car_model, car_color))
-            conn.commit()
+            conn = self.connections.connection()
+            with conn:
+                conn.execute(INSERT_ALLOWED_CAR_SQL,
+                             (plate_number, owner_name, national_id, phone_number, car_model, car_color))
+            self.allowed_cars.put((plate_number, owner_name, national_id, phone_number, car_model, car_color))
             print(f"✅ Car {plate_number} added successfully.")
         except sqlite3.IntegrityError:
             print(f"⚠️ Car with plate {plate_number} already exists.")
@@ -103,20 +126,16 @@ class DatabaseHandler:
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
     def remove_allowed_car(self, plate_number):
         if not plate_number:
             raise ValueError("Plate number cannot be empty")
-            
-        conn = None
+
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM allowed_cars WHERE plate_number = ?', (plate_number,))
-            conn.commit()
+            conn = self.connections.connection()
+            with conn:
+                cursor = conn.execute(DELETE_ALLOWED_CAR_SQL, (plate_number,))
+            self.allowed_cars.remove(plate_number)
             if cursor.rowcount == 0:
                 print(f"⚠️ No car with plate {plate_number} found.")
             else:
@@ -124,67 +143,59 @@ class DatabaseHandler:
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
     def get_all_allowed_cars(self):
-        conn = None
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM allowed_cars')
-            return cursor.fetchall()
+            return self.connections.connection().execute(SELECT_ALL_ALLOWED_CARS_SQL).fetchall()
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
     def add_detected_car(self, plate_number):
+        """Queue a detection for the background writer."""
         if not plate_number or plate_number == "None":
             return
-            
-        conn = None
+
+        self.detection_writer.add((plate_number, int(time.time())))
+
+    def write_detected_cars(self, rows):
+        """Insert (plate_number, epoch timestamp) rows in a single transaction."""
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute('INSERT INTO detected_cars (plate_number, timestamp) VALUES (?, ?)', 
-                         (plate_number, timestamp))
-            conn.commit()
+            conn = self.connections.connection()
+            with conn:
+                conn.executemany(INSERT_DETECTED_CAR_SQL, rows)
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
     def get_all_detected_cars(self):
-        conn = None
+        # Make queued detections visible first
+        self.detection_writer.flush()
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('SELECT plate_number, timestamp FROM detected_cars ORDER BY timestamp DESC')
-            return cursor.fetchall()
+            return self.connections.connection().execute(SELECT_DETECTED_CARS_SQL).fetchall()
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
     def get_last_10_detected_cars(self):
-        conn = None
+        # Make queued detections visible first
+        self.detection_writer.flush()
+        try:
+            return self.connections.connection().execute(SELECT_LAST_10_DETECTED_CARS_SQL).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error: {str(e)}")
+            raise
+
+    def archive_old_detections(self, hot_days=RETENTION_SETTINGS["hot_days"]):
+        """
+        Move detections older than hot_days to the monthly archive tables.
+        Returns the number of rows archived.
+        """
+        # Queued detections are recent, but write them first so the
+        # archive never races the writer on the same rows
+        self.detection_writer.flush()
         try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('SELECT plate_number, timestamp FROM detected_cars ORDER BY timestamp DESC LIMIT 10')
-            return cursor.fetchall()
+            return archive_detections(self.connections.connection(), self.archive_path, hot_days)
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
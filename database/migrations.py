@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Schema migrations for the application database.
+The schema version is stored in PRAGMA user_version. Migrations run
+automatically when DatabaseHandler opens the database; run this file to
+migrate a database by hand:
+
+    python database/migrations.py [path/to/cars.db]
+"""
+
+import sqlite3
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DB_PATH
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def column_type(conn, table_name, column_name):
+    for _, name, col_type, *_ in conn.execute(f"PRAGMA table_info({table_name})"):
+        if name == column_name:
+            return col_type.upper()
+    return None
+
+
+def migrate_1_epoch_timestamps(conn):
+    """
+    Store detected_cars.timestamp as integer Unix epoch seconds instead of
+    local-time text and index it for the history queries.
+    """
+    if column_type(conn, "detected_cars", "timestamp") != "INTEGER":
+        conn.execute('''
+            CREATE TABLE detected_cars_migrated (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                plate_number TEXT NOT NULL,
+                timestamp INTEGER NOT NULL
+            )
+        ''')
+        # Old timestamps were written with datetime.now(), i.e. local time
+        conn.execute('''
+            INSERT INTO detected_cars_migrated (id, plate_number, timestamp)
+            SELECT id, plate_number, CAST(strftime('%s', timestamp, 'utc') AS INTEGER)
+            FROM detected_cars
+        ''')
+        conn.execute("DROP TABLE detected_cars")
+        conn.execute("ALTER TABLE detected_cars_migrated RENAME TO detected_cars")
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_detected_cars_timestamp ON detected_cars (timestamp)")
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_detected_cars_plate_timestamp
+        ON detected_cars (plate_number, timestamp)
+    ''')
+
+
+def migrate_2_daily_rollup(conn):
+    """Add the per-day, per-plate rollup of archived detections."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS detected_cars_daily (
+            day TEXT NOT NULL,
+            plate_number TEXT NOT NULL,
+            detections INTEGER NOT NULL,
+            first_seen INTEGER NOT NULL,
+            last_seen INTEGER NOT NULL,
+            PRIMARY KEY (day, plate_number)
+        )
+    ''')
+
+
+def migrate_3_allowed_cars_version(conn):
+    """
+    Count changes to allowed_cars in a single-row table kept up to date by
+    triggers, so the lookup cache can tell them apart from the
+    detected_cars inserts that also change PRAGMA data_version.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS allowed_cars_version (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO allowed_cars_version (id, version) VALUES (0, 0)")
+    for operation in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS allowed_cars_version_{operation.lower()}
+            AFTER {operation} ON allowed_cars
+            BEGIN
+                UPDATE allowed_cars_version SET version = version + 1 WHERE id = 0;
+            END
+        ''')
+
+
+# Migration N upgrades the schema from version N - 1 to N
+MIGRATIONS = [
+    migrate_1_epoch_timestamps,
+    migrate_2_daily_rollup,
+    migrate_3_allowed_cars_version,
+]
+
+
+def migrate(conn):
+    """Apply all pending migrations, each in its own transaction."""
+    version = get_schema_version(conn)
+    for target_version, migration in enumerate(MIGRATIONS, 1):
+        if version >= target_version:
+            continue
+        with conn:
+            # Explicit BEGIN so the DDL is part of the transaction too
+            conn.execute("BEGIN")
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {target_version}")
+        print(f"Database migrated to schema version {target_version}.")
+        version = target_version
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    connection = sqlite3.connect(db_path)
+    try:
+        migrate(connection)
+        print(f"{db_path} is at schema version {get_schema_version(connection)}.")
+    finally:
+        connection.close()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sqlite3
+import threading
+import time
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DB_ARCHIVE_PATH, RETENTION_SETTINGS
+
+
+def archive_detections(conn, archive_path=DB_ARCHIVE_PATH, hot_days=RETENTION_SETTINGS["hot_days"], now=None):
+    """
+    Move detected_cars rows older than hot_days to per-month tables
+    (detected_cars_YYYYMM) in the archive database and add them to the
+    detected_cars_daily rollup, keeping the hot table bounded.
+    Returns the number of rows archived.
+    """
+    cutoff = int(now if now is not None else time.time()) - hot_days * 86400
+
+    # ATTACH cannot run inside a transaction
+    conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    try:
+        with conn:
+            conn.execute("BEGIN")
+            months = [row[0] for row in conn.execute('''
+                SELECT DISTINCT strftime('%Y%m', timestamp, 'unixepoch', 'localtime')
+                FROM detected_cars WHERE timestamp < ?
+            ''', (cutoff,))]
+
+            for month in months:
+                conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS archive.detected_cars_{month} (
+                        id INTEGER PRIMARY KEY,
+                        plate_number TEXT NOT NULL,
+                        timestamp INTEGER NOT NULL
+                    )
+                ''')
+                conn.execute(f'''
+                    INSERT OR IGNORE INTO archive.detected_cars_{month} (id, plate_number, timestamp)
+                    SELECT id, plate_number, timestamp FROM detected_cars
+                    WHERE timestamp < ? AND strftime('%Y%m', timestamp, 'unixepoch', 'localtime') = ?
+                ''', (cutoff, month))
+
+            # Daily counts per plate stay queryable after the rows are moved
+            conn.execute('''
+                INSERT INTO detected_cars_daily (day, plate_number, detections, first_seen, last_seen)
+                SELECT date(timestamp, 'unixepoch', 'localtime') AS day, plate_number,
+                       COUNT(*), MIN(timestamp), MAX(timestamp)
+                FROM detected_cars WHERE timestamp < ?
+                GROUP BY day, plate_number
+                ON CONFLICT (day, plate_number) DO UPDATE SET
+                    detections = detections + excluded.detections,
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen)
+            ''', (cutoff,))
+
+            archived = conn.execute("DELETE FROM detected_cars WHERE timestamp < ?", (cutoff,)).rowcount
+    finally:
+        conn.execute("DETACH DATABASE archive")
+
+    return archived
+
+
+class RetentionJob(threading.Thread):
+    """Runs archive() every interval seconds until stopped."""
+    def __init__(self, archive, interval=RETENTION_SETTINGS["interval_hours"] * 3600):
+        super().__init__(daemon=True)
+        self.archive = archive
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Stop the job and wait for a running archive pass to finish."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                archived = self.archive()
+                if archived:
+                    print(f"Archived {archived} detections.")
+            except sqlite3.Error as e:
+                print(f"Database error: {str(e)}")
+            self._stop_event.wait(self.interval)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, CAPTURE_SETTINGS
+
+from engine.frame_queue import DropOldestQueue
+from telemetry.metrics import metrics
+
+
+def parse_source(source):
+    """
+    Convert a source string to what cv2.VideoCapture expects.
+    Device indices ("0", "1") become integers; files and stream URLs
+    (rtsp://, http://) are passed through unchanged.
+    """
+    if isinstance(source, int):
+        return source
+    source = str(source).strip()
+    if source.isdigit():
+        return int(source)
+    return source
+
+
+def is_live_source(source):
+    """Return True for camera devices and network streams, False for files."""
+    source = parse_source(source)
+    if isinstance(source, int):
+        return True
+    return "://" in source
+
+
+class CaptureSource(threading.Thread):
+    """
+    Reads frames from one capture source on its own thread and hands every
+    frame to on_frame(source_id, frame).
+
+    Video files are played back at their native FPS, or as fast as they
+    decode with realtime=False, and can be looped. Every frame is first
+    grabbed and only decoded to pixels (retrieved) when it is used: frames
+    for which want_frame() returns False, and frames of a file that are
+    already late, are skipped after the grab.
+    """
+    def __init__(self, source, on_frame, source_id=None, loop=False,
+                 realtime=CAPTURE_SETTINGS["realtime"], want_frame=None):
+        super().__init__(daemon=True)
+        self.source = parse_source(source)
+        self.source_id = source_id if source_id is not None else str(source)
+        self.on_frame = on_frame
+        self.loop = loop
+        self.realtime = realtime
+        self.want_frame = want_frame
+        self.live = is_live_source(self.source)
+        self.frames_read = 0
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        self.decode_time = 0.0
+        self.read_time = metrics.histogram("lpr_capture_seconds", "Reading and decoding one frame",
+                                           source=self.source_id)
+        self.source_fps = None
+        self.error = None
+        self._cap = None
+        self._start_time = None
+        self._stop_event = threading.Event()
+
+    def open(self):
+        """
+        Open the underlying cv2.VideoCapture, if not already open. Call it
+        before start() to report a source that cannot be opened right away.
+        """
+        if self._cap is not None:
+            return self._cap
+
+        cap = None
+        if (CAPTURE_SETTINGS["hw_acceleration"] and not isinstance(self.source, int)
+                and hasattr(cv2, "CAP_PROP_HW_ACCELERATION")):
+            # Hardware decoding where the backend supports it (OpenCV 4.5.2+)
+            cap = cv2.VideoCapture(self.source, cv2.CAP_ANY,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap is None or not cap.isOpened():
+            cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise IOError(f"Failed to open capture source {self.source_id}")
+
+        if isinstance(self.source, int):
+            # Set camera properties
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+            cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
+
+        # Native frame rate of the source
+        self.source_fps = cap.get(cv2.CAP_PROP_FPS) or CAMERA_FPS
+        self._cap = cap
+        return cap
+
+    def stop(self):
+        """Ask the capture thread to finish."""
+        self._stop_event.set()
+
+    @property
+    def decode_fps(self):
+        """Frames the source can be read at: frames read per second spent grabbing and decoding."""
+        return self.frames_read / self.decode_time if self.decode_time else 0.0
+
+    @property
+    def fps(self):
+        """Frames actually read per second since the capture started."""
+        if self._start_time is None:
+            return 0.0
+        elapsed = time.monotonic() - self._start_time
+        return self.frames_read / elapsed if elapsed else 0.0
+
+    def stats(self):
+        return {
+            "read": self.frames_read,
+            "decoded": self.frames_decoded,
+            "skipped": self.frames_skipped,
+            "fps": round(self.fps, 1),
+            "decode_fps": round(self.decode_fps, 1),
+        }
+
+    def run(self):
+        try:
+            cap = self.open()
+        except IOError as e:
+            self.error = str(e)
+            print(f"Capture error: {self.error}")
+            return
+
+        # Files are paced to their own frame rate unless realtime is off;
+        # live sources pace themselves
+        frame_interval = 1.0 / self.source_fps if self.realtime and not self.live else 0.0
+        self._start_time = next_frame_time = time.monotonic()
+
+        try:
+            while not self._stop_event.is_set():
+                started = time.perf_counter()
+                if not cap.grab():
+                    if self.loop and not self.live:
+                        # Video ended, restart from beginning
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+                self.frames_read += 1
+
+                late = frame_interval and time.monotonic() - next_frame_time > frame_interval
+                if late or (self.want_frame is not None and not self.want_frame()):
+                    # Not needed: skip the conversion to pixels
+                    self.frames_skipped += 1
+                    self.decode_time += time.perf_counter() - started
+                else:
+                    ret, frame = cap.retrieve()
+                    elapsed = time.perf_counter() - started
+                    self.decode_time += elapsed
+                    self.read_time.observe(elapsed)
+                    if ret and frame is not None:
+                        self.frames_decoded += 1
+                        self.on_frame(self.source_id, frame)
+
+                if frame_interval:
+                    next_frame_time += frame_interval
+                    delay = next_frame_time - time.monotonic()
+                    if delay > 0:
+                        self._stop_event.wait(delay)
+                    elif delay < -CAPTURE_SETTINGS["max_lag"]:
+                        # Too far behind to catch up by skipping; continue from now
+                        next_frame_time = time.monotonic()
+        finally:
+            cap.release()
+            self._cap = None
+
+
+class BufferedCapture(CaptureSource):
+    """
+    CaptureSource that decodes ahead into a bounded queue, for consumers
+    that pull frames such as the GUI timer. In realtime mode the oldest
+    frame is dropped when the consumer falls behind; otherwise the reader
+    waits for room so no frame is lost.
+    """
+    def __init__(self, source, loop=False, realtime=CAPTURE_SETTINGS["realtime"],
+                 queue_size=CAPTURE_SETTINGS["decode_ahead"], want_frame=None):
+        super().__init__(source, self._enqueue, loop=loop, realtime=realtime, want_frame=want_frame)
+        self.frames = DropOldestQueue(queue_size)
+        # Frames read_latest() passed over
+        self.frames_discarded = 0
+
+    def _enqueue(self, source_id, frame):
+        if self.realtime:
+            self.frames.put(frame)
+            return
+        while not self._stop_event.is_set():
+            if self.frames.put(frame, block=True, timeout=0.1):
+                return
+
+    @property
+    def dropped(self):
+        """Decoded frames discarded because the consumer fell behind."""
+        return self.frames.dropped + self.frames_discarded
+
+    @property
+    def finished(self):
+        """True once the source has ended or failed and every frame was read."""
+        return not self.is_alive() and len(self.frames) == 0
+
+    def read(self, timeout=None):
+        """The oldest decoded frame, or None if none arrived within timeout."""
+        return self.frames.get(timeout)
+
+    def read_latest(self):
+        """The newest decoded frame without waiting, discarding older ones; None if there is none."""
+        latest = None
+        while True:
+            frame = self.frames.get(timeout=0)
+            if frame is None:
+                return latest
+            if latest is not None:
+                self.frames_discarded += 1
+            latest = frame
+
+    def stop(self):
+        super().stop()
+        self.frames.close()
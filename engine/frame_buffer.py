@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import deque, namedtuple
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FRAME_BUFFER_SIZE
+
+# A captured frame: its ID, capture time (time.monotonic()) and raw BGR pixels
+BufferedFrame = namedtuple("BufferedFrame", ["frame_id", "timestamp", "image"])
+
+
+class FrameRingBuffer:
+    """
+    Thread-safe ring of the most recent raw frames of a source.
+
+    Every frame gets an increasing ID that is never reused, also across
+    clear(), so results computed on a frame can be tagged with its ID and
+    results belonging to an earlier source can be told apart. Consumers
+    read frames by ID or take the latest one. Buffered images are shared
+    and must not be modified; copy them before drawing on them.
+    """
+    def __init__(self, capacity=FRAME_BUFFER_SIZE):
+        self.capacity = max(1, capacity)
+        self._frames = deque(maxlen=self.capacity)
+        self._next_id = 1
+        self._first_id = 1
+        self._lock = threading.Lock()
+
+    def put(self, image, timestamp=None):
+        """Add a frame, evicting the oldest one when full. Returns its BufferedFrame."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self._lock:
+            frame = BufferedFrame(self._next_id, timestamp, image)
+            self._next_id += 1
+            self._frames.append(frame)
+            return frame
+
+    def get(self, frame_id):
+        """The frame with this ID, or None once it has been evicted."""
+        with self._lock:
+            if not self._frames:
+                return None
+            index = frame_id - self._frames[0].frame_id
+            if 0 <= index < len(self._frames):
+                return self._frames[index]
+            return None
+
+    def latest(self):
+        """The most recent frame, or None if the buffer is empty."""
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def is_current(self, frame_id):
+        """True if frame_id was added since the last clear()."""
+        with self._lock:
+            return frame_id >= self._first_id
+
+    def clear(self):
+        """Drop all frames, e.g. when the source changes. IDs keep increasing."""
+        with self._lock:
+            self._frames.clear()
+            self._first_id = self._next_id
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frames)
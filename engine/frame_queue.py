@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+from collections import deque
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INFERENCE_QUEUE_SIZE
+
+
+class DropOldestQueue:
+    """
+    Bounded, thread-safe queue of frames.
+    When the queue is full the oldest frame is discarded so the consumer
+    always works on the most recent frames, unless the producer asks to
+    block until there is room.
+    """
+    def __init__(self, maxsize=INFERENCE_QUEUE_SIZE):
+        self.maxsize = max(1, maxsize)
+        self.dropped = 0
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, item, block=False, timeout=None):
+        """
+        Add an item, dropping the oldest one if the queue is full. With
+        block=True wait up to timeout seconds for room instead; returns
+        False if the item was not added.
+        """
+        with self._condition:
+            if block:
+                self._condition.wait_for(lambda: len(self._items) < self.maxsize or self._closed, timeout)
+                if len(self._items) >= self.maxsize:
+                    return False
+            elif len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """
+        Remove and return the oldest item.
+        Returns None if nothing arrived within timeout or the queue is closed.
+        """
+        with self._condition:
+            if not self._items and not self._closed:
+                self._condition.wait(timeout)
+            if self._items:
+                item = self._items.popleft()
+                # Wake producers waiting for room
+                self._condition.notify_all()
+                return item
+            return None
+
+    def clear(self):
+        """Discard all pending items without counting them as dropped."""
+        with self._condition:
+            self._items.clear()
+
+    def close(self):
+        """Wake up any waiting consumer; subsequent gets return immediately."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._items)
+
+
+class RoundRobinFrameQueue:
+    """
+    Drop-oldest frame queue with one lane per capture source.
+    Consumers take frames from the lanes in turn so a fast source cannot
+    starve the others.
+    """
+    def __init__(self, maxsize=INFERENCE_QUEUE_SIZE):
+        self.maxsize = max(1, maxsize)
+        self.dropped = {}
+        self._lanes = {}
+        self._order = []
+        self._next = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, source_id, item, block=False, timeout=None):
+        """
+        Add an item to the lane of source_id, dropping its oldest item if
+        full. With block=True wait up to timeout seconds for room in the
+        lane instead; returns False if the item was not added.
+        """
+        with self._condition:
+            lane = self._lanes.get(source_id)
+            if lane is None:
+                lane = self._lanes[source_id] = deque()
+                self._order.append(source_id)
+                self.dropped[source_id] = 0
+            if block:
+                self._condition.wait_for(lambda: len(lane) < self.maxsize or self._closed, timeout)
+                if len(lane) >= self.maxsize:
+                    return False
+            elif len(lane) >= self.maxsize:
+                lane.popleft()
+                self.dropped[source_id] += 1
+            lane.append(item)
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """
+        Remove and return (source_id, item) from the next non-empty lane.
+        Returns None if nothing arrived within timeout or the queue is closed.
+        """
+        with self._condition:
+            if not self._has_items() and not self._closed:
+                self._condition.wait(timeout)
+            for _ in range(len(self._order)):
+                source_id = self._order[self._next % len(self._order)]
+                self._next = (self._next + 1) % len(self._order)
+                lane = self._lanes[source_id]
+                if lane:
+                    item = lane.popleft()
+                    # Wake producers waiting for room
+                    self._condition.notify_all()
+                    return source_id, item
+            return None
+
+    def close(self):
+        """Wake up any waiting consumer; subsequent gets return immediately."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _has_items(self):
+        return any(self._lanes.values())
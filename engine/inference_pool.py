@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INFERENCE_POOL, INFERENCE_BACKEND
+
+from engine.recognizer import TrackedRecognizer
+from model.plate_detector import PlateDetector
+from model.roi import roi_for_source
+from telemetry.metrics import metrics
+
+# The outcome of one frame. plates is None when the motion gate skipped the
+# frame; captured_at is None for the events of tracks that were still
+# active when the pool closed. active_tracks lists the IDs the worker's
+# tracker still follows afterwards.
+PoolResult = namedtuple("PoolResult", ["source_id", "captured_at", "plates", "events",
+                                       "active_tracks", "latency", "unsettled", "error"])
+
+
+def configure_worker(worker_id, threads, pin_cpus):
+    """
+    Limit a worker process to threads inference threads and, with pin_cpus,
+    to its own cores. Call before the models are loaded.
+    """
+    INFERENCE_BACKEND["intra_op_threads"] = threads
+    cv2.setNumThreads(threads)
+    if pin_cpus and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        first = (worker_id * threads) % len(cpus)
+        os.sched_setaffinity(0, cpus[first:first + threads] or cpus)
+
+
+def _worker_main(worker_id, shm_name, slot_bytes, tasks, results, threads, pin_cpus, detector_factory):
+    # Ctrl+C reaches the whole process group; the pool stops workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_worker(worker_id, threads, pin_cpus)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        detector = detector_factory()
+        detector.warm_up(background=False)
+    except Exception as e:
+        results.put(("failed", worker_id, None, str(e)))
+        shm.close()
+        return
+    results.put(("ready", worker_id, None, None))
+
+    recognizers = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        if task[0] == "source":
+            _, source_id, source = task
+            recognizers[source_id] = TrackedRecognizer(detector, roi=roi_for_source(source))
+            continue
+
+        _, slot, source_id, shape, captured_at = task
+        started = time.perf_counter()
+        recognizer = recognizers[source_id]
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+        error = None
+        try:
+            detected_plates, plate_events = recognizer.process(frame)
+        except Exception as e:
+            detected_plates, plate_events, error = None, [], str(e)
+        # The view must be gone before the shared memory can be closed
+        del frame
+        results.put(("result", worker_id, slot, PoolResult(
+            source_id, captured_at, detected_plates, plate_events, recognizer.active_tracks(),
+            time.perf_counter() - started, recognizer.has_unsettled_tracks, error)))
+
+    # Cars still in view when the pool closes are reported as well
+    for source_id, recognizer in recognizers.items():
+        results.put(("flush", worker_id, None, PoolResult(
+            source_id, None, None, recognizer.flush(), [], None, False, None)))
+    shm.close()
+    results.put(("stopped", worker_id, None, None))
+
+
+class InferencePool:
+    """
+    Plate recognition in worker processes, each with its own PlateDetector.
+
+    Every capture source is assigned to one worker, which tracks its plates
+    with a TrackedRecognizer (motion gate and region of interest included),
+    so the frames of a source stay in order and several sources spread over
+    the workers. Frames are copied into ring slots of a shared memory block
+    per worker and only the slot index travels over the task queue; results
+    come back over one queue and are passed to on_result(PoolResult) on a
+    thread of this process. Database lookups and logging stay with the
+    caller.
+    """
+    def __init__(self, on_result, workers=INFERENCE_POOL["workers"],
+                 threads=INFERENCE_POOL["threads_per_worker"], pin_cpus=INFERENCE_POOL["pin_cpus"],
+                 slots=INFERENCE_POOL["slots_per_worker"], max_frame_size=INFERENCE_POOL["max_frame_size"],
+                 detector_factory=PlateDetector):
+        self.on_result = on_result
+        self.workers = max(1, workers)
+        self.threads = max(1, threads)
+        self.pin_cpus = pin_cpus
+        self.slots = max(1, slots)
+        width, height = max_frame_size
+        self.slot_bytes = width * height * 3
+        self.detector_factory = detector_factory
+
+        # spawn: workers start clean instead of forking a process with threads
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks = [self._context.Queue() for _ in range(self.workers)]
+        self._results = self._context.Queue()
+        self._shm = []
+        self._processes = []
+        self._free = [deque(range(self.slots)) for _ in range(self.workers)]
+        self._alive = [False] * self.workers
+        self._slot_condition = threading.Condition()
+        self._collector = None
+        self._closed = False
+
+        self.sources = [[] for _ in range(self.workers)]
+        self._assignment = {}
+        self.frames = [0] * self.workers
+        self.busy = [0.0] * self.workers
+        self.dropped = {}
+        self._oversized = set()
+        self._ready_at = None
+
+    def add_source(self, source_id, source=None):
+        """Assign a source to the worker with the fewest sources. source selects its region of interest."""
+        worker = min(range(self.workers), key=lambda w: len(self.sources[w]))
+        self.sources[worker].append(source_id)
+        self._assignment[source_id] = worker
+        self.dropped[source_id] = 0
+        self._tasks[worker].put(("source", source_id, str(source if source is not None else source_id)))
+
+    def start(self):
+        """Start the workers and wait until all of them have loaded their models."""
+        for worker in range(self.workers):
+            shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+            self._shm.append(shm)
+            process = self._context.Process(
+                target=_worker_main, daemon=True, name=f"inference-worker-{worker}",
+                args=(worker, shm.name, self.slot_bytes, self._tasks[worker], self._results,
+                      self.threads, self.pin_cpus, self.detector_factory))
+            process.start()
+            self._processes.append(process)
+
+        waiting = set(range(self.workers))
+        while waiting:
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                if any(not self._processes[w].is_alive() for w in waiting):
+                    self.close()
+                    raise RuntimeError("An inference worker exited while loading the models")
+                continue
+            if message[0] == "failed":
+                self.close()
+                raise RuntimeError(f"Inference worker {message[1]} failed to load the models: {message[3]}")
+            self._alive[message[1]] = True
+            waiting.discard(message[1])
+
+        self._ready_at = time.monotonic()
+        self._collector = threading.Thread(target=self._collect_results, daemon=True)
+        self._collector.start()
+        # Stays registered after close() so final snapshots include the workers
+        metrics.add_collector(self.collect_metrics)
+
+    def submit(self, source_id, frame, captured_at=None, block=False, timeout=None):
+        """
+        Copy a BGR frame into a free slot of the source's worker and queue it.
+        Without a free slot the frame is dropped, or with block=True this
+        waits up to timeout seconds for one. Returns False if it was not queued.
+        """
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            if source_id not in self._oversized:
+                self._oversized.add(source_id)
+                print(f"Error: Frames of {source_id} ({frame.shape[1]}x{frame.shape[0]}) "
+                      f"do not fit a {INFERENCE_POOL['max_frame_size']} slot; they are dropped")
+            self.dropped[source_id] += 1
+            return False
+
+        worker = self._assignment[source_id]
+        free = self._free[worker]
+        with self._slot_condition:
+            if block:
+                self._slot_condition.wait_for(
+                    lambda: free or self._closed or not self._alive[worker], timeout)
+            if not free or self._closed or not self._alive[worker]:
+                if not block:
+                    self.dropped[source_id] += 1
+                return False
+            slot = free.popleft()
+
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm[worker].buf,
+                          offset=slot * self.slot_bytes)
+        np.copyto(view, frame)
+        del view
+        self._tasks[worker].put(("frame", slot, source_id, frame.shape, captured_at))
+        return True
+
+    def _collect_results(self):
+        running = {w for w in range(self.workers) if self._alive[w]}
+        while running:
+            try:
+                kind, worker, slot, result = self._results.get(timeout=0.5)
+            except queue.Empty:
+                for worker in list(running):
+                    if not self._processes[worker].is_alive():
+                        print(f"Error: Inference worker {worker} exited unexpectedly")
+                        running.discard(worker)
+                        self._mark_dead(worker)
+                continue
+
+            if kind == "stopped":
+                running.discard(worker)
+                continue
+            if kind == "result":
+                with self._slot_condition:
+                    self._free[worker].append(slot)
+                    self._slot_condition.notify_all()
+                self.frames[worker] += 1
+                self.busy[worker] += result.latency
+            try:
+                self.on_result(result)
+            except Exception as e:
+                print(f"Error handling result of {result.source_id}: {str(e)}")
+
+    def _mark_dead(self, worker):
+        with self._slot_condition:
+            self._alive[worker] = False
+            self._slot_condition.notify_all()
+
+    def close(self, timeout=10.0):
+        """Process the queued frames, report the remaining tracks and stop the workers."""
+        with self._slot_condition:
+            self._closed = True
+            self._slot_condition.notify_all()
+        for tasks in self._tasks:
+            tasks.put(None)
+        if self._collector is not None:
+            self._collector.join()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        self._shm = []
+
+    def stats(self):
+        """Per-worker sources, frames processed, busy seconds and utilization since start()."""
+        elapsed = time.monotonic() - self._ready_at if self._ready_at is not None else 0.0
+        stats = {}
+        for worker in range(self.workers):
+            stats[worker] = {
+                "sources": list(self.sources[worker]),
+                "frames": self.frames[worker],
+                "busy_s": round(self.busy[worker], 3),
+                "utilization": round(self.busy[worker] / elapsed, 3) if elapsed else 0.0,
+                "free_slots": len(self._free[worker]),
+            }
+        return stats
+
+    def collect_metrics(self):
+        """stats() as (name, type, labels, value) metrics, see telemetry/metrics.py."""
+        collected = []
+        for worker, worker_stats in self.stats().items():
+            labels = {"worker": str(worker)}
+            collected.append(("lpr_pool_worker_frames_total", "counter", labels, worker_stats["frames"]))
+            collected.append(("lpr_pool_worker_busy_seconds_total", "counter", labels, worker_stats["busy_s"]))
+            collected.append(("lpr_pool_worker_utilization", "gauge", labels, worker_stats["utilization"]))
+        return collected
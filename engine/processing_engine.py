@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import sqlite3
+import threading
+import time
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INFERENCE_QUEUE_SIZE, SCHEDULER_SETTINGS, CAPTURE_SETTINGS, INFERENCE_POOL
+
+from engine.capture import CaptureSource
+from engine.frame_queue import RoundRobinFrameQueue
+from engine.inference_pool import InferencePool
+from engine.recognizer import TrackedRecognizer
+from engine.scheduler import AdaptiveScheduler
+from model.roi import roi_for_source
+from telemetry.metrics import metrics
+
+# Per-source counters of stats() exported as metrics
+COUNTER_METRICS = {
+    "captured": "lpr_frames_captured_total",
+    "decoded": "lpr_frames_decoded_total",
+    "processed": "lpr_frames_processed_total",
+    "skipped": "lpr_frames_skipped_total",
+    "dropped": "lpr_frames_dropped_total",
+    "plates": "lpr_plates_read_total",
+    "events": "lpr_plate_events_total",
+}
+
+
+class ProcessingEngine:
+    """
+    Headless plate recognition pipeline for one or more capture sources.
+    Every source is read on its own capture thread; frames are funneled
+    through a round-robin drop-oldest queue into a single inference
+    scheduler that shares one PlateDetector between all sources. Plates are
+    tracked per source and logged once per car. With adaptive scheduling
+    only every Nth frame of a source is decoded and queued, N following the
+    measured detection latency (engine/scheduler.py).
+    With realtime=False video files are read as fast as detection keeps up
+    instead of at their native FPS, and no frames are dropped.
+    With workers > 0 detection and tracking run in an InferencePool of that
+    many processes instead (engine/inference_pool.py) and plate_detector
+    may be None; lookups and logging stay in this process.
+    """
+    def __init__(self, sources, plate_detector, db_handler=None, loop=False,
+                 queue_size=INFERENCE_QUEUE_SIZE, on_result=None, on_event=None,
+                 realtime=CAPTURE_SETTINGS["realtime"], workers=INFERENCE_POOL["workers"]):
+        self.plate_detector = plate_detector
+        self.db_handler = db_handler
+        self.on_result = on_result
+        self.on_event = on_event
+        self.realtime = realtime
+        self.queue = RoundRobinFrameQueue(queue_size)
+        self.pool = InferencePool(self._on_pool_result, workers) if workers else None
+        self.processed = {}
+        self.skipped = {}
+        self.plates_detected = {}
+        self.recognizers = {}
+        self.schedulers = {}
+
+        self.captures = []
+        for index, source in enumerate(sources):
+            source_id = str(source)
+            if source_id in self.processed:
+                # The same source given twice still gets its own lane
+                source_id = f"{source_id}#{index}"
+            scheduler = AdaptiveScheduler() if SCHEDULER_SETTINGS["enabled"] else None
+            # Frames the scheduler passes over are never decoded
+            capture = CaptureSource(source, self._on_frame, source_id=source_id, loop=loop, realtime=realtime,
+                                    want_frame=scheduler.should_process if scheduler is not None else None)
+            self.captures.append(capture)
+            self.processed[capture.source_id] = 0
+            self.skipped[capture.source_id] = 0
+            self.plates_detected[capture.source_id] = 0
+            self.recognizers[capture.source_id] = TrackedRecognizer(plate_detector, db_handler,
+                                                                    roi=roi_for_source(source))
+            if self.pool is not None:
+                self.pool.add_source(capture.source_id, source)
+            if scheduler is not None:
+                self.schedulers[capture.source_id] = scheduler
+
+        self._scheduler = threading.Thread(target=self._inference_loop, daemon=True)
+        self._running = False
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Start the capture threads and the inference scheduler or pool."""
+        self._running = True
+        # Stays registered after stop() so final snapshots include this engine
+        metrics.add_collector(self.collect_metrics)
+        if self.pool is not None:
+            # Waits for the workers' models so no frames queue up behind loading
+            self.pool.start()
+        else:
+            self._scheduler.start()
+        for capture in self.captures:
+            capture.start()
+
+    def stop(self):
+        """Stop capturing and wait for queued frames to be processed."""
+        self._stopping.set()
+        for capture in self.captures:
+            capture.stop()
+        for capture in self.captures:
+            capture.join()
+        self._running = False
+        if self.pool is not None:
+            self.pool.close()
+        else:
+            self.queue.close()
+            self._scheduler.join()
+
+    def is_active(self):
+        """Return True while at least one capture source is still producing frames."""
+        return any(capture.is_alive() for capture in self.captures)
+
+    def stats(self):
+        """
+        Return per-source counters of captured, decoded, dropped, processed
+        (detector ran) and skipped (no motion) frames, and the decode rate.
+        """
+        stats = {}
+        for capture in self.captures:
+            source_id = capture.source_id
+            stats[source_id] = {
+                "captured": capture.frames_read,
+                "decoded": capture.frames_decoded,
+                "decode_fps": round(capture.decode_fps, 1),
+                "dropped": (self.pool.dropped if self.pool is not None else self.queue.dropped).get(source_id, 0),
+                "processed": self.processed[source_id],
+                "skipped": self.skipped[source_id],
+                "plates": self.plates_detected[source_id],
+                "events": self.recognizers[source_id].events_logged,
+                "error": capture.error,
+            }
+            if source_id in self.schedulers:
+                stats[source_id]["scheduler"] = self.schedulers[source_id].stats()
+        return stats
+
+    def collect_metrics(self):
+        """stats() as (name, type, labels, value) metrics, see telemetry/metrics.py."""
+        collected = []
+        for source_id, source_stats in self.stats().items():
+            labels = {"source": source_id}
+            for key, name in COUNTER_METRICS.items():
+                collected.append((name, "counter", labels, source_stats[key]))
+            collected.append(("lpr_capture_decode_fps", "gauge", labels, source_stats["decode_fps"]))
+            for key, value in source_stats.get("scheduler", {}).items():
+                collected.append((f"lpr_scheduler_{key}", "gauge", labels, value))
+        return collected
+
+    def _on_frame(self, source_id, frame):
+        # The capture time is kept to measure end-to-end latency
+        captured_at = time.monotonic()
+        if self.pool is not None:
+            def put(block=False, timeout=None):
+                return self.pool.submit(source_id, frame, captured_at, block, timeout)
+        else:
+            def put(block=False, timeout=None):
+                return self.queue.put(source_id, (captured_at, frame), block, timeout)
+
+        if self.realtime:
+            put()
+            return
+        # Not paced: wait for detection instead of dropping frames
+        while not self._stopping.is_set():
+            if put(block=True, timeout=0.1):
+                return
+
+    def _inference_loop(self):
+        while True:
+            item = self.queue.get(timeout=0.1)
+            if item is None:
+                if not self._running:
+                    # Queue is closed and drained
+                    break
+                continue
+
+            source_id, (captured_at, frame) = item
+            recognizer = self.recognizers[source_id]
+            started = time.monotonic()
+            try:
+                detected_plates, plate_events = recognizer.process(frame)
+            except sqlite3.Error as e:
+                print(f"Database error on {source_id}: {str(e)}")
+                continue
+            except Exception as e:
+                print(f"Error detecting plate on {source_id}: {str(e)}")
+                continue
+            self._handle_result(source_id, captured_at, time.monotonic() - started,
+                                detected_plates, plate_events, recognizer.has_unsettled_tracks)
+
+        # Cars still in view when the engine stops are logged as well
+        for source_id, recognizer in self.recognizers.items():
+            try:
+                self._report(source_id, [], recognizer.flush())
+            except sqlite3.Error as e:
+                print(f"Database error on {source_id}: {str(e)}")
+
+    def _on_pool_result(self, result):
+        # Called on the pool's result thread, one result at a time
+        source_id = result.source_id
+        if result.error is not None:
+            print(f"Error detecting plate on {source_id}: {result.error}")
+            return
+        try:
+            self.recognizers[source_id].record(result.plates or [], result.events, result.active_tracks)
+        except sqlite3.Error as e:
+            print(f"Database error on {source_id}: {str(e)}")
+            return
+        if result.captured_at is None:
+            # Tracks ended by closing the pool
+            self._report(source_id, [], result.events)
+            return
+        self._handle_result(source_id, result.captured_at, result.latency,
+                            result.plates, result.events, result.unsettled)
+
+    def _handle_result(self, source_id, captured_at, latency, detected_plates, plate_events, unsettled):
+        if detected_plates is None:
+            # No motion, the detector did not run
+            self.skipped[source_id] += 1
+            return
+
+        scheduler = self.schedulers.get(source_id)
+        if scheduler is not None:
+            scheduler.record(latency, time.monotonic() - captured_at, unsettled)
+
+        self.processed[source_id] += 1
+        detected_plates = [plate for plate in detected_plates if plate["text"]]
+        self.plates_detected[source_id] += len(detected_plates)
+
+        self._report(source_id, detected_plates, plate_events)
+
+    def _report(self, source_id, detected_plates, plate_events):
+        if detected_plates and self.on_result is not None:
+            self.on_result(source_id, detected_plates)
+        if self.on_event is not None:
+            for event in plate_events:
+                self.on_event(source_id, event)
+
+    def run(self, duration=None, stats_interval=None, on_stats=None):
+        """
+        Run until every source is exhausted, duration seconds have passed or
+        the process is interrupted. on_stats(stats) is called every
+        stats_interval seconds.
+        """
+        self.start()
+        started = time.monotonic()
+        last_stats = started
+        try:
+            while self.is_active():
+                time.sleep(0.2)
+                now = time.monotonic()
+                if duration is not None and now - started >= duration:
+                    break
+                if stats_interval and on_stats and now - last_stats >= stats_interval:
+                    on_stats(self.stats())
+                    last_stats = now
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
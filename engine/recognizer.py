@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import MOTION_GATE
+
+from model.motion import MotionGate
+from model.tracker import PlateTracker
+
+
+class TrackedRecognizer:
+    """
+    Runs PlateDetector.detect_and_track for one capture source.
+    Car and driver info is looked up once per track and text, and every
+    track is logged to detected_cars a single time when it ends.
+    Only the source's region of interest (model/roi.py) is searched when
+    one is given, and frames without motion in it are skipped by the motion
+    gate (model/motion.py). Database errors (sqlite3.Error) are left to the
+    caller.
+    """
+    def __init__(self, plate_detector, db_handler=None, tracker=None, roi=None, motion_gate=None):
+        self.plate_detector = plate_detector
+        self.db_handler = db_handler
+        self.tracker = tracker if tracker is not None else PlateTracker()
+        self.roi = roi
+        if motion_gate is None and MOTION_GATE["enabled"]:
+            motion_gate = MotionGate()
+        self.motion_gate = motion_gate
+        self.events_logged = 0
+        self._plate_info = {}  # track_id -> (text, car_info, driver_info)
+
+    def process(self, frame, now=None):
+        """
+        Detect and track plates in a frame.
+        Returns (detected_plates, plate_events). Every plate dictionary gets
+        car_info and driver_info entries (None when unknown). detected_plates
+        is None when the motion gate skipped the frame. now is the frame time
+        in seconds for the motion gate, e.g. the position in a video file
+        that is read faster than real time; by default the current time.
+        """
+        if self.motion_gate is not None and not self.motion_gate.check(frame, self.roi, now):
+            return None, []
+
+        detected_plates, plate_events = self.plate_detector.detect_and_track(frame, self.tracker, self.roi)
+        self.record(detected_plates, plate_events, self.active_tracks())
+        return detected_plates, plate_events
+
+    def active_tracks(self):
+        """IDs of the tracks the tracker still follows."""
+        return [track.track_id for track in self.tracker.tracks]
+
+    def record(self, detected_plates, plate_events, active_tracks):
+        """
+        Log plate events and add car_info and driver_info to the plates.
+        Lookups of tracks missing from active_tracks are forgotten. Also
+        used for plates tracked in an inference pool worker
+        (engine/inference_pool.py).
+        """
+        active = set(active_tracks)
+        self._plate_info = {track_id: info for track_id, info in self._plate_info.items()
+                            if track_id in active}
+        self.log_events(plate_events)
+
+        for plate in detected_plates:
+            plate["car_info"], plate["driver_info"] = self.lookup(plate)
+
+    def lookup(self, plate):
+        """Return (car_info, driver_info) for a tracked plate, querying only when its text changes."""
+        if not plate["text"] or self.db_handler is None:
+            return None, None
+
+        cached = self._plate_info.get(plate["track_id"])
+        if cached is None or cached[0] != plate["text"]:
+            car_info, driver_info = self.db_handler.get_info_by_plate(plate["text"])
+            cached = self._plate_info[plate["track_id"]] = (plate["text"], car_info, driver_info)
+
+        return cached[1], cached[2]
+
+    def log_events(self, plate_events):
+        """Add one detected_cars row per finished track."""
+        for event in plate_events:
+            if self.db_handler is not None:
+                self.db_handler.add_detected_car(event["text"])
+            self.events_logged += 1
+
+    @property
+    def has_unsettled_tracks(self):
+        """True while a tracked plate still needs OCR reads to settle."""
+        return any(not track.settled for track in self.tracker.tracks)
+
+    @property
+    def frames_skipped(self):
+        """Frames the motion gate kept away from the detector."""
+        return self.motion_gate.skipped if self.motion_gate is not None else 0
+
+    def flush(self):
+        """End all active tracks and log their events. Returns the events."""
+        self._plate_info = {}
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        plate_events = self.tracker.flush()
+        self.log_events(plate_events)
+        return plate_events
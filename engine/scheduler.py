@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import threading
+import time
+from collections import deque
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SCHEDULER_SETTINGS
+
+
+class AdaptiveScheduler:
+    """
+    Picks which frames of a source are sent to detection.
+
+    Every Nth frame is selected, where N (the stride) is recomputed every
+    adjust_interval seconds from the measured input frame rate and the
+    rolling detection latency so that detection uses at most cpu_budget of
+    a core. When the end-to-end latency (capture to result) exceeds
+    latency_slo the stride is raised further until it recovers. While a
+    tracked plate is unsettled the stride is divided by unsettled_boost so
+    the plate gets more reads.
+
+    should_process() is called from the capture side and record() from the
+    detection side, so both are thread safe.
+    """
+    def __init__(self, settings=SCHEDULER_SETTINGS):
+        self.cpu_budget = settings["cpu_budget"]
+        self.latency_slo = settings["latency_slo"]
+        self.max_stride = settings["max_stride"]
+        self.unsettled_boost = settings["unsettled_boost"]
+        self.adjust_interval = settings["adjust_interval"]
+        self.stride = 1
+        self.unsettled = False
+        self.frames_seen = 0
+        self.frames_selected = 0
+        self._latencies = deque(maxlen=settings["window"])
+        self._e2e_latencies = deque(maxlen=settings["window"])
+        self._counter = 0
+        self._input_fps = 0.0
+        self._window_start = None
+        self._window_frames = 0
+        self._lock = threading.Lock()
+
+    @property
+    def effective_stride(self):
+        if self.unsettled:
+            return max(1, int(math.ceil(self.stride / float(self.unsettled_boost))))
+        return self.stride
+
+    def should_process(self, now=None):
+        """Count an incoming frame and return True if it should be detected."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.frames_seen += 1
+            self._window_frames += 1
+            if self._window_start is None:
+                self._window_start = now
+            elif now - self._window_start >= self.adjust_interval:
+                self._input_fps = self._window_frames / (now - self._window_start)
+                self._window_start, self._window_frames = now, 0
+                self._adjust()
+
+            self._counter += 1
+            if self._counter < self.effective_stride:
+                return False
+            self._counter = 0
+            self.frames_selected += 1
+            return True
+
+    def record(self, latency, e2e_latency=None, unsettled=None):
+        """
+        Report the detection latency of a selected frame in seconds, its
+        capture-to-result latency and whether any tracked plate is unsettled.
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            if e2e_latency is not None:
+                self._e2e_latencies.append(e2e_latency)
+            if unsettled is not None:
+                self.unsettled = unsettled
+
+    def _adjust(self):
+        if not self._latencies or not self._input_fps:
+            return
+        # Detection may use cpu_budget of a core at the measured input rate
+        latency = float(np.percentile(self._latencies, 95))
+        stride = int(math.ceil(latency * self._input_fps / self.cpu_budget))
+
+        # Frames are queueing up: back off further until the SLO is met again
+        if self._e2e_latencies and float(np.percentile(self._e2e_latencies, 95)) > self.latency_slo:
+            stride = max(stride, self.stride + 1)
+
+        self.stride = min(max(1, stride), self.max_stride)
+
+    def stats(self):
+        """Chosen stride and detection rate, and latency percentiles in milliseconds."""
+        with self._lock:
+            latencies = list(self._latencies)
+            e2e_latencies = list(self._e2e_latencies)
+            stride = self.effective_stride
+            input_fps = self._input_fps
+
+        def percentile_ms(samples, q):
+            return round(float(np.percentile(samples, q)) * 1000, 1) if samples else None
+
+        return {
+            "stride": stride,
+            "input_fps": round(input_fps, 1),
+            "detect_fps": round(input_fps / stride, 1),
+            "latency_p50_ms": percentile_ms(latencies, 50),
+            "latency_p95_ms": percentile_ms(latencies, 95),
+            "latency_p99_ms": percentile_ms(latencies, 99),
+            "e2e_p95_ms": percentile_ms(e2e_latencies, 95),
+        }
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+from datetime import datetime
+
+from config import CAMERA_INDEX, HEADLESS_STATS_INTERVAL, MODEL_WARM_UP, METRICS_SETTINGS, INFERENCE_POOL
+from model.plate_detector import PlateDetector
+from database.init_db import DatabaseHandler
+from engine.processing_engine import ProcessingEngine
+from telemetry.exporters import start_exporters
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run license plate recognition without the GUI on one or more sources."
+    )
+    parser.add_argument(
+        "-s", "--source", action="append", dest="sources",
+        help="Camera index, video file or stream URL. Repeat for several lanes "
+             f"(default: camera {CAMERA_INDEX})."
+    )
+    parser.add_argument("--loop", action="store_true",
+                        help="Restart video files when they end.")
+    parser.add_argument("--fast", action="store_true",
+                        help="Read video files as fast as detection keeps up instead of at their native FPS.")
+    parser.add_argument("--workers", type=int, default=INFERENCE_POOL["workers"],
+                        help="Detect in this many worker processes, each with its own models (0: in this process).")
+    parser.add_argument("--no-db", action="store_true",
+                        help="Do not log detections or look up plates in the database.")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Stop after this many seconds.")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Print every frame's detections, not only plate events.")
+    parser.add_argument("--stats-interval", type=float, default=HEADLESS_STATS_INTERVAL,
+                        help="Seconds between statistics reports (0 disables them).")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_SETTINGS["http_port"],
+                        help="Serve Prometheus metrics on this port (0 picks a free port).")
+    parser.add_argument("--metrics-log", default=METRICS_SETTINGS["json_log"],
+                        help="Append a JSON metrics snapshot to this file periodically.")
+    return parser.parse_args()
+
+
+def print_result(source_id, detected_plates):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for plate in detected_plates:
+        status = "allowed" if plate["car_info"] else "unknown"
+        if plate["car_info"] and plate["car_info"]["Fuzzy Match"]:
+            status += f" as {plate['car_info']['Matched Plate']}, not exact"
+        print(f"{timestamp} [{source_id}] {plate['text']} "
+              f"(confidence {plate['confidence']:.2f}, {status})")
+
+
+def print_event(source_id, event):
+    timestamp = datetime.fromtimestamp(event["last_seen"]).strftime("%Y-%m-%d %H:%M:%S")
+    duration = event["last_seen"] - event["first_seen"]
+    print(f"{timestamp} [{source_id}] plate event #{event['track_id']}: {event['text']} "
+          f"(seen {event['frames']} frames over {duration:.1f}s, {event['ocr_runs']} OCR runs, "
+          f"{'settled' if event['settled'] else 'unsettled'})")
+
+
+def print_stats(stats, db_handler=None, pool=None):
+    for source_id, source_stats in stats.items():
+        print(f"[{source_id}] captured={source_stats['captured']} decoded={source_stats['decoded']} "
+              f"decode_fps={source_stats['decode_fps']} processed={source_stats['processed']} skipped={source_stats['skipped']} "
+              f"dropped={source_stats['dropped']} "
+              f"plates={source_stats['plates']} events={source_stats['events']}")
+        if "scheduler" in source_stats:
+            print(f"[{source_id}] scheduler " +
+                  " ".join(f"{key}={value}" for key, value in source_stats["scheduler"].items()))
+    if pool is not None:
+        for worker, worker_stats in pool.stats().items():
+            print(f"[worker {worker}] " + " ".join(f"{key}={value}" for key, value in worker_stats.items()))
+    if db_handler is not None:
+        writer_stats = db_handler.detection_writer.stats()
+        print("[db writer] " + " ".join(f"{key}={value}" for key, value in writer_stats.items()))
+
+
+def main():
+    args = parse_args()
+    sources = args.sources or [str(CAMERA_INDEX)]
+    exporters = start_exporters(port=args.metrics_port, json_log=args.metrics_log)
+
+    # One detector is shared by every source, unless worker processes load their own
+    plate_detector = None
+    if not args.workers:
+        plate_detector = PlateDetector()
+        if MODEL_WARM_UP:
+            # Load the models before the sources start so no frames queue up behind loading
+            plate_detector.warm_up(background=False)
+    db_handler = None if args.no_db else DatabaseHandler()
+
+    engine = ProcessingEngine(sources, plate_detector, db_handler,
+                              loop=args.loop, realtime=not args.fast, on_event=print_event,
+                              on_result=print_result if args.verbose else None, workers=args.workers)
+    engine.run(duration=args.duration, stats_interval=args.stats_interval,
+               on_stats=lambda stats: print_stats(stats, db_handler, engine.pool))
+
+    if db_handler is not None:
+        # Write the remaining detections before reporting
+        db_handler.close()
+    print_stats(engine.stats(), db_handler, engine.pool)
+    for exporter in exporters:
+        exporter.stop()
+
+
+if __name__ == "__main__":
+    main()
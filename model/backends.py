@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Inference backends for the YOLO plate and OCR models.
+
+Every backend takes a list of BGR images and returns one Detections per
+image with boxes in that image's pixel coordinates, so PlateDetector
+decodes the output the same way whichever backend runs the model:
+
+- "ultralytics": the .pt weights on PyTorch through ultralytics.YOLO
+- "onnxruntime": an ONNX export run with ONNX Runtime on CPU
+- "openvino": an OpenVINO IR export run with OpenVINO on CPU
+
+Exports are created with model/export_models.py next to the .pt weights
+(best.onnx and best_openvino_model/), INT8 models with model/quantize.py
+(best_int8.onnx). ONNX Runtime and OpenVINO are imported only when their
+backend is used.
+"""
+
+import ast
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INFERENCE_BACKEND
+
+INFERENCE_BACKENDS = ("ultralytics", "onnxruntime", "openvino")
+
+# Defaults of ultralytics predict(), kept so every backend returns the same boxes
+DEFAULT_CONF_THRESHOLD = 0.25
+DEFAULT_IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+PAD_VALUE = 114
+STRIDE = 32  # Input height and width must be multiples of the largest YOLO stride
+
+
+class Detections:
+    """Boxes (x1, y1, x2, y2), confidences and class ids found in one image."""
+    def __init__(self, xyxy, conf, cls, names):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.asarray(cls, dtype=np.float32).reshape(-1)
+        self.names = names
+
+    def __len__(self):
+        return len(self.conf)
+
+
+def exported_model_path(weights_path, backend, precision="fp32"):
+    """Path of the export of weights_path (a .pt file) used by a backend."""
+    stem = os.path.splitext(weights_path)[0]
+    if precision == "int8":
+        if backend != "onnxruntime":
+            raise ValueError(f"INT8 models are only available for onnxruntime, not {backend}")
+        return stem + "_int8.onnx"
+    if backend == "onnxruntime":
+        return stem + ".onnx"
+    if backend == "openvino":
+        return stem + "_openvino_model"
+    return weights_path
+
+
+def letterbox_input(img, size, shape=None):
+    """
+    Letterbox an image like ultralytics does: scale its longest side to size
+    and pad it, centered, to shape (height, width), by default size x size.
+    Returns the padded image, the scale and the (left, top) padding.
+    """
+    h, w = img.shape[:2]
+    out_h, out_w = shape or (size, size)
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_w, pad_h = (out_w - new_w) / 2, (out_h - new_h) / 2
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT,
+                             value=(PAD_VALUE, PAD_VALUE, PAD_VALUE))
+    return img, scale, (left, top)
+
+
+def rect_input_shape(images, size, stride=STRIDE):
+    """
+    Smallest (height, width) that fits every image scaled to size, rounded
+    up to the model stride. Wide ROI crops then cost a fraction of a
+    square input.
+    """
+    out_h = out_w = 0
+    for img in images:
+        h, w = img.shape[:2]
+        scale = min(size / h, size / w)
+        out_h = max(out_h, int(round(h * scale)))
+        out_w = max(out_w, int(round(w * scale)))
+    return (int(np.ceil(out_h / stride)) * stride, int(np.ceil(out_w / stride)) * stride)
+
+
+def images_to_blob(images, size, rect=False):
+    """
+    Letterbox BGR images and stack them into an (N, 3, H, W) float32 RGB blob
+    scaled to [0, 1]. H and W are size, or with rect=True the smallest
+    stride-aligned shape that fits the images (for exports with dynamic
+    height and width). Returns the blob and each image's (scale, pad).
+    """
+    shape = rect_input_shape(images, size) if rect else (size, size)
+    padded, transforms = [], []
+    for img in images:
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        img, scale, pad = letterbox_input(img, size, shape)
+        padded.append(img)
+        transforms.append((scale, pad))
+    blob = np.stack(padded)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(blob, dtype=np.float32) / 255.0, transforms
+
+
+def decode_predictions(output, transforms, image_shapes, names,
+                       conf_threshold=DEFAULT_CONF_THRESHOLD, iou_threshold=DEFAULT_IOU_THRESHOLD):
+    """
+    Decode raw YOLOv8/YOLO11 detection output of shape (N, 4 + classes, anchors)
+    into Detections: confidence filter, per-class NMS and mapping of the
+    boxes back from the letterboxed input to each original image.
+    """
+    detections = []
+    for prediction, (scale, (pad_x, pad_y)), (h, w) in zip(output, transforms, image_shapes):
+        prediction = prediction.T
+        class_scores = prediction[:, 4:]
+        cls = class_scores.argmax(axis=1)
+        conf = class_scores[np.arange(len(cls)), cls]
+        keep = conf > conf_threshold
+        boxes, conf, cls = prediction[keep, :4], conf[keep], cls[keep]
+
+        # Center x, y, width, height to corners
+        xyxy = np.empty_like(boxes)
+        xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+        xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+
+        if len(conf):
+            # Offset boxes by class so NMS never suppresses across classes
+            offset = cls[:, None].astype(np.float32) * 7680
+            nms_boxes = xyxy + offset
+            nms_boxes[:, 2:] -= nms_boxes[:, :2]  # NMSBoxes expects x, y, w, h
+            kept = cv2.dnn.NMSBoxes(nms_boxes.tolist(), conf.tolist(), conf_threshold, iou_threshold)
+            kept = np.asarray(kept, dtype=np.int64).reshape(-1)[:MAX_DETECTIONS]
+            xyxy, conf, cls = xyxy[kept], conf[kept], cls[kept]
+
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad_x) / scale).clip(0, w)
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad_y) / scale).clip(0, h)
+        detections.append(Detections(xyxy, conf, cls, names))
+
+    return detections
+
+
+def parse_names(value):
+    """Class names stored as the string form of a dict in export metadata."""
+    names = ast.literal_eval(value) if isinstance(value, str) else value
+    return {int(k): v for k, v in names.items()}
+
+
+class UltralyticsBackend:
+    """Runs the .pt weights with ultralytics on PyTorch."""
+    name = "ultralytics"
+
+    def __init__(self, weights_path, input_size):
+        from ultralytics import YOLO
+
+        if INFERENCE_BACKEND["intra_op_threads"]:
+            import torch
+
+            torch.set_num_threads(INFERENCE_BACKEND["intra_op_threads"])
+        self.model = YOLO(weights_path)
+        self.input_size = input_size
+        self.names = self.model.names
+
+    def predict(self, images):
+        results = self.model(images, imgsz=self.input_size, verbose=False)
+        return [Detections(result.boxes.xyxy.cpu().numpy(),
+                           result.boxes.conf.cpu().numpy(),
+                           result.boxes.cls.cpu().numpy(),
+                           result.names) for result in results]
+
+
+class OnnxRuntimeBackend:
+    """Runs an ONNX export with ONNX Runtime on CPU."""
+    name = "onnxruntime"
+
+    def __init__(self, model_path, input_size, intra_op_threads=None, inter_op_threads=None):
+        import onnxruntime as ort
+
+        # Thread counts default to INFERENCE_BACKEND as it is when the model loads
+        if intra_op_threads is None:
+            intra_op_threads = INFERENCE_BACKEND["intra_op_threads"]
+        if inter_op_threads is None:
+            inter_op_threads = INFERENCE_BACKEND["inter_op_threads"]
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # 0 lets ONNX Runtime use one thread per physical core
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_size = input_size
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = parse_names(metadata["names"])
+        # Exports without dynamic axes only accept their own input shape
+        batch, _, height, width = self.session.get_inputs()[0].shape
+        self.batch_size = batch if isinstance(batch, int) else None
+        self.rect = not isinstance(height, int) and not isinstance(width, int)
+
+    def predict(self, images):
+        if not images:
+            return []
+        blob, transforms = images_to_blob(images, self.input_size, self.rect)
+        step = self.batch_size or len(images)
+        outputs = [self.session.run(None, {self.input_name: blob[i:i + step]})[0]
+                   for i in range(0, len(images), step)]
+        return decode_predictions(np.concatenate(outputs), transforms,
+                                  [img.shape[:2] for img in images], self.names)
+
+
+class OpenVINOBackend:
+    """Runs an OpenVINO IR export on CPU."""
+    name = "openvino"
+
+    def __init__(self, model_dir, input_size, num_threads=None):
+        import openvino as ov
+        import yaml
+
+        if num_threads is None:
+            num_threads = INFERENCE_BACKEND["intra_op_threads"]
+
+        xml_path = glob.glob(os.path.join(model_dir, "*.xml"))[0]
+        core = ov.Core()
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if num_threads:
+            config["INFERENCE_NUM_THREADS"] = num_threads
+        model = core.read_model(xml_path)
+        shape = model.input(0).partial_shape
+        self.batch_size = None if shape[0].is_dynamic else shape[0].get_length()
+        self.rect = shape[2].is_dynamic and shape[3].is_dynamic
+        self.compiled = core.compile_model(model, "CPU", config)
+        self.input_size = input_size
+        with open(os.path.join(model_dir, "metadata.yaml"), encoding="utf-8") as f:
+            self.names = parse_names(yaml.safe_load(f)["names"])
+
+    def predict(self, images):
+        if not images:
+            return []
+        blob, transforms = images_to_blob(images, self.input_size, self.rect)
+        step = self.batch_size or len(images)
+        outputs = [self.compiled(blob[i:i + step])[0] for i in range(0, len(images), step)]
+        return decode_predictions(np.concatenate(outputs), transforms,
+                                  [img.shape[:2] for img in images], self.names)
+
+
+def load_backend(weights_path, input_size, backend=INFERENCE_BACKEND["name"],
+                 precision=INFERENCE_BACKEND["precision"]):
+    """Load the model at weights_path (or its export) with the named backend."""
+    if precision == "int8":
+        from model.quantize import check_approval
+
+        # Quantized models load only after passing the accuracy regression gate
+        model_path = exported_model_path(weights_path, backend, precision)
+        check_approval(model_path)
+        return OnnxRuntimeBackend(model_path, input_size)
+    if precision != "fp32":
+        raise ValueError(f"Unknown model precision: {precision}")
+    if backend == "ultralytics":
+        return UltralyticsBackend(weights_path, input_size)
+    if backend == "onnxruntime":
+        return OnnxRuntimeBackend(exported_model_path(weights_path, backend), input_size)
+    if backend == "openvino":
+        return OpenVINOBackend(exported_model_path(weights_path, backend), input_size)
+    raise ValueError(f"Unknown inference backend: {backend}")
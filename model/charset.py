@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Character set of the OCR model: model class name -> Arabic character
+ARABIC_MAPPING = {
+    # Arabic Letters (used in Egyptian license plates)
+    "alif": "أ",     # أ
+    "baa": "ب",      # ب
+    "taa": "ت",      # ت
+    "tha": "ث",      # ث
+    "jeem": "ج",     # ج
+    "geem": "ج",     # ج (added as alias)
+    "haa": "ح",      # ح
+    "khaa": "خ",     # خ
+    "daal": "د",     # د
+    "dal": "ذ",      # ذ
+    "thal": "ذ",     # ذ (optional alias)
+    "raa": "ر",      # ر
+    "zay": "ز",      # ز
+    "seen": "س",     # س
+    "sheen": "ش",    # ش
+    "sad": "ص",      # ص
+    "dad": "ض",      # ض
+    "taa": "ط",       # ط
+    "zaa": "ظ",      # ظ
+    "ain": "ع",      # ع
+    "aain": "ع",     # ع (added as alias)
+    "ghain": "غ",    # غ
+    "faa": "ف",      # ف
+    "qaf": "ق",      # ق
+    "kaf": "ك",      # ك
+    "kaaf": "ك",     # ك (added as alias)
+    "laam": "ل",     # ل
+    "meem": "م",     # م
+    "noon": "ن",     # ن
+    "ha": "ه",       # ه
+    "waw": "و",      # و
+    "waaw": "و",     # و (added as alias)
+    "yaa": "ي",      # ي
+    "lamalef": "لا", # لا
+    "hamza": "ء",    # ء
+
+    # Arabic Numbers
+    "0": "٠",  # ٠ - Zero
+    "1": "١",  # ١ - One
+    "2": "٢",  # ٢ - Two
+    "3": "٣",  # ٣ - Three
+    "4": "٤",  # ٤ - Four
+    "5": "٥",  # ٥ - Five
+    "6": "٦",  # ٦ - Six
+    "7": "٧",  # ٧ - Seven
+    "8": "٨",  # ٨ - Eight
+    "9": "٩",  # ٩ - Nine
+}
+
+# Groups of OCR classes whose glyphs are easily confused on worn or low
+# resolution plates (dot placement, similar digit strokes)
+CONFUSABLE_CLASS_GROUPS = [
+    ("baa", "tha"),
+    ("taa", "zaa"),  # "taa" decodes to ط
+    ("jeem", "haa", "khaa"),
+    ("daal", "dal"),
+    ("raa", "zay"),
+    ("seen", "sheen"),
+    ("sad", "dad"),
+    ("ain", "ghain"),
+    ("faa", "qaf"),
+    ("alif", "1"),
+    ("2", "3"),
+    ("6", "7"),
+]
+
+
+def confusable_groups():
+    """Return the confusable groups as sets of Arabic characters."""
+    groups = []
+    for class_names in CONFUSABLE_CLASS_GROUPS:
+        chars = {ARABIC_MAPPING[name] for name in class_names}
+        if len(chars) > 1:
+            groups.append(chars)
+    return groups
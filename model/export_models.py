@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Export the plate detector and OCR weights for the ONNX Runtime and
+OpenVINO backends (see model/backends.py). Exports are written next to
+the .pt files, where load_backend looks for them:
+
+    python model/export_models.py
+    python model/export_models.py --plate path/to/plate/best.pt --ocr path/to/ocr/best.pt --format onnxruntime openvino
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DETECTOR_INPUT_SIZE, OCR_INPUT_SIZE, PLATE_DETECTOR_PATH, OCR_MODEL_PATH
+
+# ultralytics format names of the exportable backends
+EXPORT_FORMATS = {"onnxruntime": "onnx", "openvino": "openvino"}
+
+
+def export_model(weights_path, input_size, backend):
+    """Export weights_path for a backend. Returns the path of the export."""
+    from ultralytics import YOLO
+
+    # Dynamic axes let one export run single frames and batches of plate crops
+    return YOLO(weights_path).export(format=EXPORT_FORMATS[backend], imgsz=input_size,
+                                     dynamic=True, simplify=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the YOLO models for CPU inference backends.")
+    parser.add_argument("--plate", default=PLATE_DETECTOR_PATH, help="Plate detector weights (.pt)")
+    parser.add_argument("--ocr", default=OCR_MODEL_PATH, help="OCR weights (.pt)")
+    parser.add_argument("--format", nargs="+", default=["onnxruntime"], choices=list(EXPORT_FORMATS),
+                        help="Backends to export for (default: onnxruntime)")
+    args = parser.parse_args()
+
+    for backend in args.format:
+        for weights_path, input_size in ((args.plate, DETECTOR_INPUT_SIZE), (args.ocr, OCR_INPUT_SIZE)):
+            try:
+                path = export_model(weights_path, input_size, backend)
+                print(f"Exported {weights_path} for {backend}: {path}")
+            except Exception as e:
+                print(f"Error: Could not export {weights_path} for {backend}: {e}")
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
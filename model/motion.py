@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import os
+import sys
+
+import cv2
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import MOTION_GATE
+
+
+class MotionGate:
+    """
+    Decides per frame whether plate detection is worth running.
+
+    Each frame (or its region of interest) is shrunk to a small blurred
+    grayscale image and compared with the previous one. Detection runs when
+    the share of changed pixels reaches min_motion, for hold_frames frames
+    after that, and at least every force_interval seconds so a car that
+    stopped in view is still checked. Everything else is skipped, which
+    costs a resize and a difference of a thumbnail.
+    """
+    def __init__(self, settings=MOTION_GATE):
+        self.width = settings["width"]
+        self.pixel_threshold = settings["pixel_threshold"]
+        self.min_motion = settings["min_motion"]
+        self.hold_frames = settings["hold_frames"]
+        self.force_interval = settings["force_interval"]
+        self.processed = 0
+        self.skipped = 0
+        self.forced = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frame; the next frame is always processed."""
+        self._previous = None
+        self._hold = 0
+        self._last_processed = None
+
+    def _thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, int(round(h * self.width / float(w)))))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def motion(self, frame):
+        """Share of thumbnail pixels that changed since the previous frame (1.0 for the first)."""
+        small = self._thumbnail(frame)
+        previous, self._previous = self._previous, small
+        if previous is None or previous.shape != small.shape:
+            return 1.0
+        changed = cv2.absdiff(small, previous) > self.pixel_threshold
+        return cv2.countNonZero(changed.view("uint8")) / float(changed.size)
+
+    def check(self, frame, roi=None, now=None):
+        """
+        Return True when detection should run on this frame.
+        With a RegionOfInterest only motion inside it counts.
+        """
+        now = time.monotonic() if now is None else now
+        if roi is not None:
+            frame, _ = roi.crop(frame)
+
+        if self.motion(frame) >= self.min_motion:
+            self._hold = self.hold_frames
+        elif self._hold > 0:
+            self._hold -= 1
+        elif self._last_processed is not None and now - self._last_processed < self.force_interval:
+            self.skipped += 1
+            return False
+        else:
+            self.forced += 1
+
+        self.processed += 1
+        self._last_processed = now
+        return True
+
+    def stats(self):
+        return {"processed": self.processed, "skipped": self.skipped, "forced": self.forced}
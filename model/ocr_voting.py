@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from collections import defaultdict
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import OCR_VOTING
+
+
+class PlateVote:
+    """
+    Character-level voting over repeated OCR reads of the same plate.
+    Each read is the left-to-right list of (char, confidence) pairs from
+    PlateDetector.decode_result_chars. Reads are grouped by length and every
+    position keeps a confidence-weighted histogram of the characters seen.
+    """
+    def __init__(self, min_reads=OCR_VOTING["min_reads"],
+                 min_agreement=OCR_VOTING["min_agreement"],
+                 max_reads=OCR_VOTING["max_reads"]):
+        self.min_reads = min_reads
+        self.min_agreement = min_agreement
+        self.max_reads = max_reads
+        self.reads = 0
+        self.text = ""
+        self.agreement = 0.0
+        self.settled = False
+        self._length_counts = defaultdict(int)
+        self._histograms = {}  # length -> [{char: summed confidence}, ...]
+
+    @property
+    def exhausted(self):
+        """True when max_reads were spent without reaching consensus."""
+        return not self.settled and self.reads >= self.max_reads
+
+    def add(self, chars):
+        """Add one OCR read and update the consensus text."""
+        if self.settled:
+            return
+        self.reads += 1
+        if not chars:
+            return
+
+        length = len(chars)
+        self._length_counts[length] += 1
+        histograms = self._histograms.setdefault(length, [defaultdict(float) for _ in range(length)])
+        for histogram, (char, conf) in zip(histograms, chars):
+            histogram[char] += float(conf)
+
+        self._update_consensus()
+
+    def _update_consensus(self):
+        # The most frequent plate length wins; ties go to the longer read
+        total = sum(self._length_counts.values())
+        length = max(self._length_counts, key=lambda n: (self._length_counts[n], n))
+        histograms = self._histograms[length]
+
+        text = ""
+        agreement = self._length_counts[length] / total
+        for histogram in histograms:
+            char = max(histogram, key=histogram.get)
+            text += char
+            agreement = min(agreement, histogram[char] / sum(histogram.values()))
+
+        self.text = text
+        self.agreement = agreement
+        # Empty reads count towards max_reads but never towards settling
+        if self._length_counts[length] >= self.min_reads and agreement >= self.min_agreement:
+            self.settled = True
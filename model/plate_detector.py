@@ -4,127 +4,109 @@
 # plate_detector.py
 
 from pathlib import Path
-from ultralytics import YOLO
 import cv2
 import numpy as np
 import os
-import torch
+import sys
+import threading
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (OCR_INPUT_SIZE, OCR_CONF_THRESHOLD, OCR_VOTING, PREPROCESS_ENGINE,
+                    INFERENCE_BACKEND, DETECTOR_INPUT_SIZE, PLATE_DETECTOR_PATH, OCR_MODEL_PATH)
+
+from model.charset import ARABIC_MAPPING
+from model.preprocessing import preprocess_batch
+from model.registry import registry
+from telemetry.metrics import metrics
+
+# Hot-path timings, see telemetry/metrics.py
+PLATE_FORWARD_TIME = metrics.histogram("lpr_plate_forward_seconds", "Plate detector forward pass per frame")
+PREPROCESS_TIME = metrics.histogram("lpr_preprocess_seconds", "OCR preprocessing per batch of plate crops")
+OCR_FORWARD_TIME = metrics.histogram("lpr_ocr_forward_seconds", "OCR forward pass per batch of plate crops")
+DECODE_TIME = metrics.histogram("lpr_decode_seconds", "Decoding OCR output to text per batch")
+PLATES_DETECTED = metrics.counter("lpr_plates_detected_total", "Plates found by the detector")
+OCR_READS = metrics.counter("lpr_ocr_reads_total", "Plate crops read by the OCR model")
 
 class PlateDetector:
-    def __init__(self):
-        """Initialize the license plate detector with pre-trained models."""
-        # Define paths to models
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.plate_model_path = os.path.join(current_dir, r"D:\car-plate-detector\runs\detect\yolo_car_plate\weights\best.pt")
-        self.ocr_model_path = os.path.join(current_dir, r"D:\car-plate-detector\runs\detect\yolo11m_car_plate\weights\best.pt")
-        
+    def __init__(self, preprocess_engine=PREPROCESS_ENGINE, backend=INFERENCE_BACKEND["name"],
+                 precision=INFERENCE_BACKEND["precision"], plate_model_path=PLATE_DETECTOR_PATH,
+                 ocr_model_path=OCR_MODEL_PATH):
+        """
+        Initialize the license plate detector.
+        Both models come from the process-wide registry, so detectors share
+        them, and are loaded on first use or by warm_up().
+        """
+        # OCR preprocessing engine, see model/preprocessing.py
+        self.preprocess_engine = preprocess_engine
+        # Inference backend of both models, see model/backends.py
+        self.backend = backend
+        self.precision = precision
+
+        self.plate_model_path = plate_model_path
+        self.ocr_model_path = ocr_model_path
+
         # Arabic character mapping
-        self.arabic_mapping = {
-            # Arabic Letters (used in Egyptian license plates)
-            "alif": "أ",     # أ
-            "baa": "ب",      # ب
-            "taa": "ت",      # ت
-            "tha": "ث",      # ث
-            "jeem": "ج",     # ج
-            "geem": "ج",     # ج (added as alias)
-            "haa": "ح",      # ح
-            "khaa": "خ",     # خ
-            "daal": "د",     # د
-            "dal": "ذ",      # ذ
-            "thal": "ذ",     # ذ (optional alias)
-            "raa": "ر",      # ر
-            "zay": "ز",      # ز
-            "seen": "س",     # س
-            "sheen": "ش",    # ش
-            "sad": "ص",      # ص
-            "dad": "ض",      # ض
-            "taa": "ط",       # ط
-            "zaa": "ظ",      # ظ
-            "ain": "ع",      # ع
-            "aain": "ع",     # ع (added as alias)
-            "ghain": "غ",    # غ
-            "faa": "ف",      # ف
-            "qaf": "ق",      # ق
-            "kaf": "ك",      # ك
-            "kaaf": "ك",     # ك (added as alias)
-            "laam": "ل",     # ل
-            "meem": "م",     # م
-            "noon": "ن",     # ن
-            "ha": "ه",       # ه
-            "waw": "و",      # و
-            "waaw": "و",     # و (added as alias)
-            "yaa": "ي",      # ي
-            "lamalef": "لا", # لا
-            "hamza": "ء",    # ء
-
-            # Arabic Numbers
-            "0": "٠",  # ٠ - Zero
-            "1": "١",  # ١ - One
-            "2": "٢",  # ٢ - Two
-            "3": "٣",  # ٣ - Three
-            "4": "٤",  # ٤ - Four
-            "5": "٥",  # ٥ - Five
-            "6": "٦",  # ٦ - Six
-            "7": "٧",  # ٧ - Seven
-            "8": "٨",  # ٨ - Eight
-            "9": "٩",  # ٩ - Nine
-        }
-        
-        # Load YOLO model for plate detection
-        try:
-            self.plate_model = YOLO(self.plate_model_path)
-            print("License plate detector model loaded successfully.")
-        except Exception as e:
-            print(f"Error: Could not load license plate detector model: {e}")
-            raise
-
-        # Load OCR model (also a YOLO model)
-        try:
-            self.ocr_model = YOLO(self.ocr_model_path)
-            print("OCR model loaded successfully.")
-        except Exception as e:
-            print(f"Error: Could not load OCR model: {e}")
-            raise
-
-    def preprocess_plate(self, plate_img):
-        """
-        Preprocess the cropped plate image for OCR.
-        Returns preprocessed image ready for OCR model.
-        """
-        # Convert to grayscale for processing
-        gray = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY)
-        
-        # Apply adaptive thresholding
-        thresh = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY_INV, 11, 2
-        )
-        
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(thresh)
-        
-        # Convert back to 3 channels (RGB) for YOLO model
-        rgb_denoised = cv2.cvtColor(denoised, cv2.COLOR_GRAY2RGB)
-        
-        return rgb_denoised
-
-    def detect_plate(self, frame):
+        self.arabic_mapping = dict(ARABIC_MAPPING)
+
+        self.plate_model = registry.get(plate_model_path, DETECTOR_INPUT_SIZE, backend, precision,
+                                        label="License plate detector model")
+        self.ocr_model = registry.get(ocr_model_path, OCR_INPUT_SIZE, backend, precision,
+                                      label="OCR model")
+
+    @property
+    def loaded(self):
+        """True once both models are loaded."""
+        return self.plate_model.loaded and self.ocr_model.loaded
+
+    def warm_up(self, background=True, on_done=None):
+        """
+        Load both models and run each once.
+        With background=False errors are raised; otherwise this runs on a
+        daemon thread, which is returned, and on_done(error) is called
+        afterwards with None or the exception that stopped the warm-up.
+        """
+        if not background:
+            self.plate_model.warm_up()
+            self.ocr_model.warm_up()
+            return None
+
+        def run():
+            error = None
+            try:
+                self.warm_up(background=False)
+            except Exception as e:
+                print(f"Error: Model warm-up failed: {e}")
+                error = e
+            if on_done is not None:
+                on_done(error)
+
+        thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def detect_plate(self, frame, roi=None):
         """
         Detect license plates in the given frame.
+        With a RegionOfInterest (see model/roi.py) only that part of the
+        frame is searched; boxes are always in full-frame coordinates.
         Returns list of detected bounding boxes and confidence scores.
         """
-        results = self.plate_model(frame)
+        offset = np.zeros(4, dtype=np.float32)
+        if roi is not None:
+            frame, (x_offset, y_offset) = roi.crop(frame)
+            offset[:] = (x_offset, y_offset, x_offset, y_offset)
+
+        with PLATE_FORWARD_TIME.time():
+            results = self.plate_model.predict([frame])
         plates = []
 
         for result in results:
-            boxes = result.boxes.xyxy.cpu().numpy()     # Bounding box coordinates
-            scores = result.boxes.conf.cpu().numpy()    # Confidence scores
-            classes = result.boxes.cls.cpu().numpy()    # Class IDs
-
-            for box, score, cls in zip(boxes, scores, classes):
+            for box, score, cls in zip(result.xyxy, result.conf, result.cls):
                 if int(cls) == 0:  # Assuming class 0 is "license plate"
-                    plates.append((box, score))
+                    plates.append((box + offset, score))
 
+        PLATES_DETECTED.inc(len(plates))
         return plates
 
     def recognize_text(self, plate_img):
@@ -132,44 +114,91 @@ class PlateDetector:
         Extract text from the cropped plate image using OCR model.
         Returns the recognized text.
         """
-        # Preprocess the plate image
-        processed_img = self.preprocess_plate(plate_img)
-        
-        # Get prediction from OCR model
-        results = self.ocr_model(processed_img)
-        
-        # Process results to get text
-        text = self.decode_output(results)
-        
-        return text
+        return self.recognize_texts([plate_img])[0]
+
+    def recognize_texts(self, plate_imgs):
+        """
+        Extract text from several cropped plate images with a single OCR pass.
+        Crops are preprocessed, letterboxed to a common size and sent to the
+        OCR model as one batch. Returns one recognized text per crop.
+        """
+        results = self.run_ocr(plate_imgs)
+        # Split the batched results back into one text per plate
+        with DECODE_TIME.time():
+            return self.decode_batch_output(results)
+
+    def recognize_chars(self, plate_imgs, min_conf=OCR_VOTING["min_char_conf"]):
+        """
+        Like recognize_texts but returns, for every crop, the left-to-right
+        list of (char, confidence) pairs above min_conf, for OCR voting.
+        """
+        results = self.run_ocr(plate_imgs)
+        with DECODE_TIME.time():
+            return [self.decode_result_chars(result, min_conf) for result in results]
+
+    def run_ocr(self, plate_imgs):
+        """
+        Run the OCR model once over a batch of cropped plate images.
+        Returns one Detections (see model/backends.py) per crop.
+        """
+        if not plate_imgs:
+            return []
+
+        # Preprocess and letterbox every crop to the same shape
+        with PREPROCESS_TIME.time():
+            batch = preprocess_batch(plate_imgs, OCR_INPUT_SIZE, self.preprocess_engine)
+
+        # Get predictions for the whole batch from the OCR model
+        OCR_READS.inc(len(plate_imgs))
+        with OCR_FORWARD_TIME.time():
+            return self.ocr_model.predict(batch)
 
     def decode_output(self, results):
         """
         Decode the OCR model output to text.
         """
-        text = ""
-        for result in results:
-            boxes = result.boxes.xyxy.cpu().numpy()
-            classes = result.boxes.cls.cpu().numpy()
-            confs = result.boxes.conf.cpu().numpy()
-            names = result.names  # Get class names from the model
-            
-            # Sort boxes from left to right
-            sorted_indices = np.argsort(boxes[:, 0])
-            boxes = boxes[sorted_indices]
-            classes = classes[sorted_indices]
-            confs = confs[sorted_indices]
-            
-            # Convert class indices to characters
-            for cls, conf in zip(classes, confs):
-                if conf > 0.5:  # Confidence threshold
-                    # Get class name from model's class mapping
-                    class_name = names[int(cls)]
-                    # Convert to Arabic character
-                    char = self.class_to_char(class_name)
-                    text += char
-        
-        return text
+        return "".join(self.decode_result(result) for result in results)
+
+    def decode_batch_output(self, results):
+        """
+        Decode batched OCR model output.
+        Returns a list with the text of each image in the batch.
+        """
+        return [self.decode_result(result) for result in results]
+
+    def decode_result(self, result):
+        """
+        Decode the OCR output of a single image to text.
+        """
+        return "".join(char for char, _ in self.decode_result_chars(result, OCR_CONF_THRESHOLD))
+
+    def decode_result_chars(self, result, min_conf):
+        """
+        Decode the OCR output of a single image to a left-to-right list of
+        (char, confidence) pairs with confidence above min_conf.
+        """
+        chars = []
+        boxes = result.xyxy
+        classes = result.cls
+        confs = result.conf
+        names = result.names  # Get class names from the model
+
+        # Sort boxes from left to right
+        sorted_indices = np.argsort(boxes[:, 0])
+        classes = classes[sorted_indices]
+        confs = confs[sorted_indices]
+
+        # Convert class indices to characters
+        for cls, conf in zip(classes, confs):
+            if conf > min_conf:  # Confidence threshold
+                # Get class name from model's class mapping
+                class_name = names[int(cls)]
+                # Convert to Arabic character
+                char = self.class_to_char(class_name)
+                if char:
+                    chars.append((char, float(conf)))
+
+        return chars
 
     def class_to_char(self, class_name):
         """
@@ -177,21 +206,42 @@ class PlateDetector:
         """
         return self.arabic_mapping.get(class_name.lower(), '')
 
-    def detect_and_recognize(self, frame):
+    def clip_plates(self, frame, plates):
         """
-        Detect license plates and extract their text.
-        Returns list of dictionaries containing plate information.
+        Convert detections to integer boxes clipped to the frame.
+        Boxes that end up empty are dropped.
+        Returns list of ((x1, y1, x2, y2), score) tuples.
         """
-        plates = self.detect_plate(frame)
-
-        detected_plates = []
+        frame_h, frame_w = frame.shape[:2]
+        clipped = []
         for box, score in plates:
             x1, y1, x2, y2 = map(int, box)
-            plate_img = frame[y1:y2, x1:x2]
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(frame_w, x2), min(frame_h, y2)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            clipped.append(((x1, y1, x2, y2), score))
+        return clipped
+
+    def draw_plate(self, frame, box, plate_text):
+        """Draw a rectangle and the recognized text around a plate."""
+        x1, y1, x2, y2 = box
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(frame, plate_text, (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+
+    def detect_and_recognize(self, frame, roi=None):
+        """
+        Detect license plates and extract their text.
+        Returns list of dictionaries containing plate information.
+        """
+        plates = self.clip_plates(frame, self.detect_plate(frame, roi))
 
-            # Extract text using OCR
-            plate_text = self.recognize_text(plate_img)
+        # Extract text of all plates using one batched OCR pass
+        texts = self.recognize_texts([frame[y1:y2, x1:x2] for (x1, y1, x2, y2), _ in plates])
 
+        detected_plates = []
+        for ((x1, y1, x2, y2), score), plate_text in zip(plates, texts):
             detected_plates.append({
                 "text": plate_text,
                 "bbox": [x1, y1, x2 - x1, y2 - y1],  # x, y, w, h format
@@ -199,8 +249,40 @@ class PlateDetector:
             })
 
             # Draw rectangle around plate
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(frame, plate_text, (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+            self.draw_plate(frame, (x1, y1, x2, y2), plate_text)
+
+        return detected_plates
+
+    def detect_and_track(self, frame, tracker, roi=None):
+        """
+        Detect license plates and follow them with a PlateTracker.
+        OCR reads of a track are combined by character voting; once a
+        track has settled its plate is not read again.
+        Returns (detected_plates, plate_events) where plate_events holds one
+        summary per track that left the scene.
+        """
+        plates = self.clip_plates(frame, self.detect_plate(frame, roi))
+        tracks, plate_events = tracker.update(plates)
+
+        # Read only the plates whose track needs a (better) OCR result
+        pending = [i for i, track in enumerate(tracks) if tracker.needs_ocr(track)]
+        crops = []
+        for i in pending:
+            x1, y1, x2, y2 = plates[i][0]
+            crops.append(frame[y1:y2, x1:x2])
+        for i, chars in zip(pending, self.recognize_chars(crops)):
+            tracks[i].add_read(chars)
+
+        detected_plates = []
+        for ((x1, y1, x2, y2), score), track in zip(plates, tracks):
+            detected_plates.append({
+                "text": track.text,
+                "bbox": [x1, y1, x2 - x1, y2 - y1],  # x, y, w, h format
+                "confidence": float(score),
+                "track_id": track.track_id
+            })
+
+            # Draw rectangle around plate
+            self.draw_plate(frame, (x1, y1, x2, y2), track.text)
 
-        return detected_plates
\ No newline at end of file
+        return detected_plates, plate_events
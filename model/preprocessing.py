@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import cv2
+import numpy as np
+
+# OCR preprocessing engines.
+# "nlmeans" and "bilateral" process one crop at a time with OpenCV.
+# "median", "open" and "none" stack all crops at their own resolution and
+# process the batch in one pass per filter before letterboxing.
+# "nlmeans" stays the default until bench_preprocess.py --ocr shows that
+# another engine reads labelled plates as well.
+PREPROCESSING_ENGINES = ("nlmeans", "bilateral", "median", "open", "none")
+
+# Adaptive threshold parameters shared by all engines
+THRESHOLD_BLOCK_SIZE = 11
+THRESHOLD_C = 2
+
+# 3x3 structuring element for the "open" engine
+OPEN_KERNEL = np.ones((3, 3), dtype=np.uint8)
+
+# Crops filtered per OpenCV call in the vectorized engines
+MAX_STACK_CHANNELS = 512
+
+
+def letterbox_box(h, w, size):
+    """Position (top, left, height, width) of an h x w image letterboxed to size x size."""
+    scale = min(size / w, size / h)
+    new_w = max(1, int(round(w * scale)))
+    new_h = max(1, int(round(h * scale)))
+    return (size - new_h) // 2, (size - new_w) // 2, new_h, new_w
+
+
+def letterbox(img, size, pad_value=0):
+    """
+    Resize an image to fit a size x size square keeping its aspect ratio,
+    padding the remainder so every crop in a batch has the same shape.
+    """
+    top, left, new_h, new_w = letterbox_box(img.shape[0], img.shape[1], size)
+    resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((size, size) + img.shape[2:], pad_value, dtype=img.dtype)
+    canvas[top:top + new_h, left:left + new_w] = resized
+
+    return canvas
+
+
+def threshold_crop(gray):
+    """Adaptive Gaussian threshold of one grayscale crop, text in white."""
+    return cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY_INV, THRESHOLD_BLOCK_SIZE, THRESHOLD_C
+    )
+
+
+def preprocess_nlmeans(plate_img):
+    """Grayscale, adaptive threshold and non-local means denoising of one crop."""
+    gray = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY)
+    denoised = cv2.fastNlMeansDenoising(threshold_crop(gray))
+    return cv2.cvtColor(denoised, cv2.COLOR_GRAY2RGB)
+
+
+def preprocess_bilateral(plate_img):
+    """Edge-preserving bilateral smoothing of one crop before thresholding."""
+    gray = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY)
+    smoothed = cv2.bilateralFilter(gray, 5, 50, 50)
+    return cv2.cvtColor(threshold_crop(smoothed), cv2.COLOR_GRAY2RGB)
+
+
+def _stack_to_channels(stack):
+    # OpenCV filters run over every channel of an image, so an (N, H, W)
+    # stack laid out as (H, W, N) is filtered in one call
+    return np.ascontiguousarray(stack.transpose(1, 2, 0))
+
+
+def _channels_to_stack(channels, count):
+    return channels.reshape(channels.shape[:2] + (count,)).transpose(2, 0, 1)
+
+
+def _threshold_channels(stack):
+    n, h, w = stack.shape[:3]
+    gray = cv2.cvtColor(stack.reshape(n * h, w, 3), cv2.COLOR_BGR2GRAY).reshape(n, h, w)
+    channels = _stack_to_channels(gray)
+    mean = cv2.GaussianBlur(channels, (THRESHOLD_BLOCK_SIZE, THRESHOLD_BLOCK_SIZE), 0,
+                            borderType=cv2.BORDER_REPLICATE)
+    mask = channels.astype(np.int16) <= mean.reshape(channels.shape).astype(np.int16) - THRESHOLD_C
+    return mask.astype(np.uint8)
+
+
+def threshold_stack(stack):
+    """
+    Grayscale conversion and adaptive Gaussian threshold of an (N, H, W, 3)
+    BGR stack in one pass. Returns an (N, H, W) uint8 text mask (1 = text),
+    nearly identical to threshold_crop applied to each crop but not equal:
+    the Gaussian mean is rounded differently, and crops padded to the stack
+    size also differ near the padding (together well under 0.1% of pixels).
+    """
+    return _channels_to_stack(_threshold_channels(stack), len(stack))
+
+
+def preprocess_stack(stack, engine):
+    """
+    Preprocess an (N, H, W, 3) BGR stack of equally sized crops with one of
+    the vectorized engines. Returns an (N, H, W, 3) uint8 RGB stack.
+    """
+    if engine not in ("median", "open", "none"):
+        raise ValueError(f"Unknown vectorized preprocessing engine: {engine}")
+
+    outputs = []
+    # OpenCV images have at most CV_CN_MAX channels
+    for start in range(0, len(stack), MAX_STACK_CHANNELS):
+        chunk = stack[start:start + MAX_STACK_CHANNELS]
+        mask = _threshold_channels(chunk)
+        if engine == "median":
+            # On a binary image the 3x3 median is a majority vote
+            count = cv2.boxFilter(mask, cv2.CV_8U, (3, 3), normalize=False,
+                                  borderType=cv2.BORDER_REPLICATE)
+            mask = (count >= 5).astype(np.uint8)
+        elif engine == "open":
+            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, OPEN_KERNEL,
+                                    borderType=cv2.BORDER_REPLICATE)
+        outputs.append(_channels_to_stack(mask, len(chunk)))
+
+    binary = np.concatenate(outputs) * np.uint8(255)
+    return np.repeat(binary[..., None], 3, axis=-1)
+
+
+def preprocess_batch(plate_imgs, size, engine):
+    """
+    Preprocess cropped plates for OCR and letterbox them to size x size.
+    Returns a list of RGB images, one per crop.
+    """
+    if engine == "nlmeans":
+        return [letterbox(preprocess_nlmeans(img), size) for img in plate_imgs]
+    if engine == "bilateral":
+        return [letterbox(preprocess_bilateral(img), size) for img in plate_imgs]
+    if engine not in PREPROCESSING_ENGINES:
+        raise ValueError(f"Unknown preprocessing engine: {engine}")
+    if not plate_imgs:
+        return []
+
+    # Crops are filtered at their own resolution, far smaller than the OCR
+    # input: each is padded to the largest crop of the batch by repeating
+    # its edges, which thresholds nearly like the crop border, and cut out again
+    height = max(img.shape[0] for img in plate_imgs)
+    width = max(img.shape[1] for img in plate_imgs)
+    stack = np.stack([cv2.copyMakeBorder(img, 0, height - img.shape[0], 0, width - img.shape[1],
+                                         cv2.BORDER_REPLICATE) for img in plate_imgs])
+    outputs = preprocess_stack(stack, engine)
+    return [letterbox(output[:img.shape[0], :img.shape[1]], size)
+            for output, img in zip(outputs, plate_imgs)]
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+INT8 quantization of the plate detector and OCR models for ONNX Runtime,
+and the accuracy regression gate a quantized model must pass before
+INFERENCE_BACKEND["precision"] = "int8" will load it.
+
+1. Quantize the FP32 ONNX exports (model/export_models.py creates them)
+   with static calibration on a small set of camera frames. OCR calibration
+   crops are cut from those frames by the FP32 plate detector:
+
+       python model/quantize.py quantize --calibration path/to/frames
+
+2. Compare the INT8 pipeline with the FP32 PlateDetector on labelled frames
+   (labels.csv: file name, plate text; without it the FP32 reads are the
+   reference). The result is written next to each INT8 model as
+   best_int8.approval.json, approved only within QUANTIZATION_GATE:
+
+       python model/quantize.py evaluate --images path/to/labelled/frames
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+
+import cv2
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (DETECTOR_INPUT_SIZE, OCR_INPUT_SIZE, PREPROCESS_ENGINE, QUANTIZATION_GATE,
+                    RUNS_DIR, PLATE_DETECTOR_PATH, OCR_MODEL_PATH)
+
+from model.backends import OnnxRuntimeBackend, exported_model_path, images_to_blob
+from model.preprocessing import preprocess_batch
+
+IMAGE_EXTENSIONS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+
+
+def find_weights(runs_dir=RUNS_DIR):
+    """All trained weights under runs_dir (runs/detect/*/weights/best.pt)."""
+    return sorted(glob.glob(os.path.join(runs_dir, "*", "weights", "best.pt")))
+
+
+def load_images(image_dir):
+    paths = sorted(path for pattern in IMAGE_EXTENSIONS
+                   for path in glob.glob(os.path.join(image_dir, pattern)))
+    images = [(os.path.basename(path), cv2.imread(path)) for path in paths]
+    return [(name, img) for name, img in images if img is not None]
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def approval_path(model_path):
+    return os.path.splitext(model_path)[0] + ".approval.json"
+
+
+def check_approval(model_path):
+    """
+    Raise ValueError unless model_path passed the regression gate and has
+    not changed since.
+    """
+    path = approval_path(model_path)
+    if not os.path.exists(path):
+        raise ValueError(f"{model_path} has not been evaluated; run model/quantize.py evaluate")
+    with open(path, encoding="utf-8") as f:
+        approval = json.load(f)
+    if not approval.get("approved"):
+        raise ValueError(f"{model_path} failed the accuracy regression gate, see {path}")
+    if approval.get("sha256") != file_sha256(model_path):
+        raise ValueError(f"{model_path} changed after it was evaluated; run model/quantize.py evaluate")
+
+
+class ImageCalibrationReader:
+    """Feeds calibration images to onnxruntime.quantization one at a time."""
+    def __init__(self, input_name, images, input_size):
+        self.input_name = input_name
+        self.images = images
+        self.input_size = input_size
+        self._index = 0
+
+    def get_next(self):
+        if self._index >= len(self.images):
+            return None
+        blob, _ = images_to_blob([self.images[self._index]], self.input_size)
+        self._index += 1
+        return {self.input_name: blob}
+
+    def rewind(self):
+        self._index = 0
+
+
+def quantize_model(fp32_path, int8_path, calibration_images, input_size):
+    """Statically quantize an ONNX model to INT8 (QDQ, per-channel weights)."""
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepared_path = os.path.splitext(int8_path)[0] + "_prepared.onnx"
+    quant_pre_process(fp32_path, prepared_path)
+    try:
+        input_name = onnx.load(prepared_path, load_external_data=False).graph.input[0].name
+        quantize_static(
+            prepared_path, int8_path,
+            ImageCalibrationReader(input_name, calibration_images, input_size),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=CalibrationMethod.MinMax
+        )
+    finally:
+        if os.path.exists(prepared_path):
+            os.remove(prepared_path)
+
+    # Keep the class names and other export metadata the backends read
+    fp32_model = onnx.load(fp32_path, load_external_data=False)
+    int8_model = onnx.load(int8_path)
+    onnx.helper.set_model_props(int8_model, {prop.key: prop.value for prop in fp32_model.metadata_props})
+    onnx.save(int8_model, int8_path)
+
+    # A new model has to pass the regression gate again
+    if os.path.exists(approval_path(int8_path)):
+        os.remove(approval_path(int8_path))
+
+
+def calibration_crops(plate_model_path, frames):
+    """Plate crops found by the FP32 plate detector, preprocessed like OCR input."""
+    detector = OnnxRuntimeBackend(plate_model_path, DETECTOR_INPUT_SIZE)
+    crops = []
+    for frame, detections in zip(frames, detector.predict(frames)):
+        for x1, y1, x2, y2 in detections.xyxy.astype(int):
+            if x2 > x1 and y2 > y1:
+                crops.append(frame[y1:y2, x1:x2])
+    return preprocess_batch(crops, OCR_INPUT_SIZE, PREPROCESS_ENGINE)
+
+
+def load_labels(image_dir):
+    labels_path = os.path.join(image_dir, "labels.csv")
+    if not os.path.exists(labels_path):
+        return None
+    with open(labels_path, newline="", encoding="utf-8") as f:
+        return {row[0]: "".join(row[1].split()) for row in csv.reader(f) if len(row) >= 2}
+
+
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def read_plate(detector, frame):
+    """Text of the most confident plate in a frame, or an empty string."""
+    plates = detector.detect_and_recognize(frame.copy())
+    if not plates:
+        return ""
+    return max(plates, key=lambda plate: plate["confidence"])["text"]
+
+
+def accuracy(reads, labels):
+    """Plate exact-match rate and mean character accuracy of reads against labels."""
+    exact = chars = 0.0
+    for name, label in labels.items():
+        text = reads.get(name, "")
+        exact += text == label
+        chars += max(0.0, 1.0 - edit_distance(text, label) / max(len(label), 1))
+    count = max(len(labels), 1)
+    return {"exact_match": exact / count, "char_accuracy": chars / count}
+
+
+def evaluate(images, labels, reference_backend, gate=QUANTIZATION_GATE):
+    """
+    Run the FP32 PlateDetector and the INT8 pipeline over labelled frames and
+    write an approval file next to both INT8 models. Returns the report.
+    """
+    from model.plate_detector import PlateDetector
+
+    reference = PlateDetector(backend=reference_backend, precision="fp32")
+    reference_reads = {name: read_plate(reference, frame) for name, frame in images}
+    if labels is None:
+        labels = reference_reads
+
+    # The INT8 models are loaded directly, the approval check is what is being decided
+    quantized = PlateDetector(backend="onnxruntime", precision="fp32")
+    int8_paths = [exported_model_path(quantized.plate_model_path, "onnxruntime", "int8"),
+                  exported_model_path(quantized.ocr_model_path, "onnxruntime", "int8")]
+    quantized.plate_model = OnnxRuntimeBackend(int8_paths[0], DETECTOR_INPUT_SIZE)
+    quantized.ocr_model = OnnxRuntimeBackend(int8_paths[1], OCR_INPUT_SIZE)
+    quantized.precision = "int8"
+    int8_reads = {name: read_plate(quantized, frame) for name, frame in images}
+
+    fp32_metrics = accuracy(reference_reads, labels)
+    int8_metrics = accuracy(int8_reads, labels)
+    approved = (fp32_metrics["exact_match"] - int8_metrics["exact_match"] <= gate["max_exact_match_drop"]
+                and fp32_metrics["char_accuracy"] - int8_metrics["char_accuracy"] <= gate["max_char_accuracy_drop"])
+
+    report = {
+        "approved": approved,
+        "evaluated_at": int(time.time()),
+        "images": len(images),
+        "labelled": labels is not reference_reads,
+        "reference_backend": reference_backend,
+        "fp32": fp32_metrics,
+        "int8": int8_metrics,
+        "gate": dict(gate),
+        "models": {path: file_sha256(path) for path in int8_paths}
+    }
+    for path in int8_paths:
+        with open(approval_path(path), "w", encoding="utf-8") as f:
+            json.dump(dict(report, sha256=report["models"][path]), f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 quantization and accuracy regression gate.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    quantize_parser = subparsers.add_parser("quantize", help="Create calibrated INT8 models")
+    quantize_parser.add_argument("--calibration", required=True, help="Directory of camera frames with plates")
+    quantize_parser.add_argument("--plate", default=PLATE_DETECTOR_PATH, help="Plate detector weights (.pt)")
+    quantize_parser.add_argument("--ocr", default=OCR_MODEL_PATH, help="OCR weights (.pt)")
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Compare the INT8 models with FP32")
+    evaluate_parser.add_argument("--images", required=True, help="Directory of frames, optionally with labels.csv")
+    evaluate_parser.add_argument("--reference", default="ultralytics", help="Backend of the FP32 reference")
+
+    subparsers.add_parser("list", help=f"List the trained weights under {RUNS_DIR}")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for path in find_weights():
+            print(path)
+        return
+
+    if args.command == "quantize":
+        frames = [img for _, img in load_images(args.calibration)]
+        if not frames:
+            print(f"Error: No calibration images found in {args.calibration}")
+            sys.exit(1)
+        plate_fp32 = exported_model_path(args.plate, "onnxruntime")
+        ocr_fp32 = exported_model_path(args.ocr, "onnxruntime")
+        for path in (plate_fp32, ocr_fp32):
+            if not os.path.exists(path):
+                print(f"Error: {path} not found; export it first with model/export_models.py")
+                sys.exit(1)
+
+        crops = calibration_crops(plate_fp32, frames)
+        print(f"Calibrating with {len(frames)} frames and {len(crops)} plate crops.")
+        for fp32_path, weights, images, size in ((plate_fp32, args.plate, frames, DETECTOR_INPUT_SIZE),
+                                                 (ocr_fp32, args.ocr, crops, OCR_INPUT_SIZE)):
+            int8_path = exported_model_path(weights, "onnxruntime", "int8")
+            quantize_model(fp32_path, int8_path, images, size)
+            print(f"Quantized {fp32_path} -> {int8_path}")
+        print("Run model/quantize.py evaluate before selecting the INT8 models.")
+        return
+
+    images = load_images(args.images)
+    if not images:
+        print(f"Error: No images found in {args.images}")
+        sys.exit(1)
+    report = evaluate(images, load_labels(args.images), args.reference)
+    print(f"FP32 exact match {report['fp32']['exact_match']:.1%}, "
+          f"character accuracy {report['fp32']['char_accuracy']:.1%}")
+    print(f"INT8 exact match {report['int8']['exact_match']:.1%}, "
+          f"character accuracy {report['int8']['char_accuracy']:.1%}")
+    if report["approved"]:
+        print("INT8 models approved; set INFERENCE_BACKEND['precision'] = 'int8' to use them.")
+    else:
+        print("INT8 models rejected by the regression gate.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
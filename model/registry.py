@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Process-wide registry of loaded models.
+
+PlateDetector instances ask the registry for their models instead of
+loading them, so every detector and camera in the process shares one
+copy of each model. Models are loaded on first use, or earlier by a
+warm-up, and never when a detector is only constructed.
+"""
+
+import threading
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INFERENCE_BACKEND
+
+from model.backends import load_backend
+
+
+class LazyModel:
+    """A model that is loaded the first time it is used."""
+    def __init__(self, weights_path, input_size, backend, precision, label="model"):
+        self.weights_path = weights_path
+        self.input_size = input_size
+        self.backend = backend
+        self.precision = precision
+        self.label = label
+        self._model = None
+        self._load_lock = threading.Lock()
+        # Backends are not guaranteed to be thread safe; callers share one model
+        self._predict_lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def load(self):
+        """Load the model if needed. Concurrent callers wait for one load."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    try:
+                        self._model = load_backend(self.weights_path, self.input_size,
+                                                   self.backend, self.precision)
+                        print(f"{self.label} loaded successfully.")
+                    except Exception as e:
+                        print(f"Error: Could not load {self.label}: {e}")
+                        raise
+        return self._model
+
+    def predict(self, images):
+        model = self.load()
+        with self._predict_lock:
+            return model.predict(images)
+
+    def warm_up(self):
+        """Load the model and run it once so the first real frame is not slow."""
+        self.predict([np.zeros((self.input_size, self.input_size, 3), dtype=np.uint8)])
+
+
+class ModelRegistry:
+    """Shared LazyModel per (weights, input size, backend, precision)."""
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, weights_path, input_size, backend=INFERENCE_BACKEND["name"],
+            precision=INFERENCE_BACKEND["precision"], label="model"):
+        key = (os.path.abspath(weights_path), input_size, backend, precision)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = LazyModel(weights_path, input_size, backend, precision, label)
+                self._models[key] = model
+            return model
+
+    def models(self):
+        with self._lock:
+            return list(self._models.values())
+
+    def clear(self):
+        """Forget every model; detectors holding one keep their reference."""
+        with self._lock:
+            self._models.clear()
+
+
+# Registry shared by the whole process
+registry = ModelRegistry()
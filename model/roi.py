@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import CAMERA_ROIS
+
+
+class RegionOfInterest:
+    """
+    Part of a camera frame where plates can appear, as one or more polygons
+    with (x, y) points given as fractions of the frame width and height.
+
+    The detector only sees the bounding rectangle of the polygons, with the
+    pixels outside them blanked, so its input and compute shrink with the
+    excluded area. Boxes found in the crop are shifted back to full-frame
+    coordinates.
+    """
+    def __init__(self, polygons):
+        self.polygons = [np.asarray(polygon, dtype=np.float32).reshape(-1, 2) for polygon in polygons]
+        self._frame_shape = None
+        self._rect = None
+        self._mask = None
+
+    def _prepare(self, frame_shape):
+        # The crop rectangle and mask only change with the frame size
+        h, w = frame_shape[:2]
+        points = [np.round(polygon * (w, h)).astype(np.int32) for polygon in self.polygons]
+        x, y, rect_w, rect_h = cv2.boundingRect(np.concatenate(points))
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(w, x + rect_w), min(h, y + rect_h)
+
+        mask = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+        cv2.fillPoly(mask, [polygon - (x1, y1) for polygon in points], 255)
+        # A rectangular region needs no masking
+        self._mask = None if mask.all() else mask
+        self._rect = (x1, y1, x2, y2)
+        self._frame_shape = frame_shape[:2]
+
+    def rect(self, frame_shape):
+        """Bounding rectangle (x1, y1, x2, y2) of the region in a frame of this shape."""
+        if self._frame_shape != frame_shape[:2]:
+            self._prepare(frame_shape)
+        return self._rect
+
+    def crop(self, frame):
+        """
+        Cut the region out of a frame, blanking pixels outside the polygons.
+        Returns (crop, (x_offset, y_offset)).
+        """
+        x1, y1, x2, y2 = self.rect(frame.shape)
+        crop = frame[y1:y2, x1:x2]
+        if self._mask is not None:
+            crop = cv2.bitwise_and(crop, crop, mask=self._mask)
+        return crop, (x1, y1)
+
+    def area_fraction(self, frame_shape):
+        """Share of the frame the detector still looks at."""
+        x1, y1, x2, y2 = self.rect(frame_shape)
+        return (x2 - x1) * (y2 - y1) / float(frame_shape[0] * frame_shape[1])
+
+    def draw(self, frame, color=(255, 200, 0)):
+        """Outline the region on a frame."""
+        h, w = frame.shape[:2]
+        points = [np.round(polygon * (w, h)).astype(np.int32) for polygon in self.polygons]
+        cv2.polylines(frame, points, True, color, 1)
+
+
+def roi_for_source(source_id, rois=CAMERA_ROIS):
+    """
+    RegionOfInterest configured for a capture source (camera index, file or
+    URL as a string), falling back to the "default" entry. None means the
+    whole frame.
+    """
+    polygons = rois.get(str(source_id), rois.get("default"))
+    return RegionOfInterest(polygons) if polygons else None
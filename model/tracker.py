@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+from itertools import count
+
+import numpy as np
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TRACKER_SETTINGS
+
+from model.ocr_voting import PlateVote
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Compute the IoU matrix between two arrays of x1, y1, x2, y2 boxes.
+    Returns an array of shape (len(boxes_a), len(boxes_b)).
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return np.where(union > 0, intersection / np.maximum(union, 1e-6), 0.0)
+
+
+class PlateTrack:
+    """A single license plate followed across consecutive frames."""
+    def __init__(self, track_id, bbox, confidence):
+        now = time.time()
+        self.track_id = track_id
+        self.bbox = bbox
+        self.confidence = confidence
+        self.best_confidence = confidence
+        self.votes = PlateVote()
+        self.ocr_quality = 0.0
+        self.ocr_runs = 0
+        self.hits = 1
+        self.missed = 0
+        self.first_seen = now
+        self.last_seen = now
+
+    @property
+    def text(self):
+        """Consensus text of all OCR reads so far."""
+        return self.votes.text
+
+    @property
+    def settled(self):
+        """True once the OCR reads agree and the plate needs no more reads."""
+        return self.votes.settled
+
+    @property
+    def quality(self):
+        """Crop quality used to decide whether OCR is worth re-running."""
+        x1, y1, x2, y2 = self.bbox
+        return max(0.0, x2 - x1) * max(0.0, y2 - y1) * self.confidence
+
+    @property
+    def centroid(self):
+        x1, y1, x2, y2 = self.bbox
+        return (x1 + x2) / 2.0, (y1 + y2) / 2.0
+
+    def update(self, bbox, confidence):
+        """Move the track to a new detection."""
+        self.bbox = bbox
+        self.confidence = confidence
+        self.best_confidence = max(self.best_confidence, confidence)
+        self.hits += 1
+        self.missed = 0
+        self.last_seen = time.time()
+
+    def add_read(self, chars):
+        """Add the (char, confidence) pairs read from the current crop."""
+        self.ocr_runs += 1
+        self.ocr_quality = max(self.ocr_quality, self.quality)
+        self.votes.add(chars)
+
+    def to_event(self):
+        """Summarize the track as a single plate event."""
+        return {
+            "track_id": self.track_id,
+            "text": self.text,
+            "confidence": float(self.best_confidence),
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "frames": self.hits,
+            "ocr_runs": self.ocr_runs,
+            "settled": self.settled,
+        }
+
+
+class PlateTracker:
+    """
+    IoU tracker with a centroid-distance fallback for plate detections.
+    Assigns track IDs, decides which tracks need OCR and emits one plate
+    event per track when it leaves the scene.
+    """
+    def __init__(self, iou_threshold=TRACKER_SETTINGS["iou_threshold"],
+                 max_missed=TRACKER_SETTINGS["max_missed"],
+                 min_hits=TRACKER_SETTINGS["min_hits"],
+                 ocr_improvement=TRACKER_SETTINGS["ocr_improvement"],
+                 max_centroid_distance=TRACKER_SETTINGS["max_centroid_distance"]):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.min_hits = min_hits
+        self.ocr_improvement = ocr_improvement
+        self.max_centroid_distance = max_centroid_distance
+        self.tracks = []
+        self._ids = count(1)
+
+    def update(self, plates):
+        """
+        Match detections from PlateDetector.detect_plate to existing tracks.
+        plates is a list of (box, score) tuples.
+        Returns (matched, events): the track of every detection, in the same
+        order as plates, and the plate events of tracks that just ended.
+        """
+        boxes = [tuple(float(v) for v in box) for box, _ in plates]
+        scores = [float(score) for _, score in plates]
+        matched = [None] * len(plates)
+
+        unmatched_tracks = set(range(len(self.tracks)))
+        unmatched_plates = set(range(len(plates)))
+
+        # Greedy matching on IoU, best overlaps first
+        if self.tracks and plates:
+            ious = box_iou([track.bbox for track in self.tracks], boxes)
+            for flat_index in np.argsort(-ious, axis=None):
+                t, p = np.unravel_index(flat_index, ious.shape)
+                if ious[t, p] < self.iou_threshold:
+                    break
+                if t in unmatched_tracks and p in unmatched_plates:
+                    self.tracks[t].update(boxes[p], scores[p])
+                    matched[p] = self.tracks[t]
+                    unmatched_tracks.discard(t)
+                    unmatched_plates.discard(p)
+
+        # Fall back to centroid distance for fast-moving plates
+        for p in sorted(unmatched_plates):
+            track = self._nearest_track(boxes[p], unmatched_tracks)
+            if track is not None:
+                self.tracks[track].update(boxes[p], scores[p])
+                matched[p] = self.tracks[track]
+                unmatched_tracks.discard(track)
+            else:
+                new_track = PlateTrack(next(self._ids), boxes[p], scores[p])
+                self.tracks.append(new_track)
+                matched[p] = new_track
+
+        # Age tracks that were not seen in this frame
+        for t in unmatched_tracks:
+            self.tracks[t].missed += 1
+
+        finished = [track for track in self.tracks if track.missed > self.max_missed]
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+
+        return matched, self._events(finished)
+
+    def needs_ocr(self, track):
+        """
+        Return True while a track's reads have not settled. Tracks that used
+        up their reads without consensus are only read again when their crop
+        clearly improved.
+        """
+        if track.settled:
+            return False
+        if track.votes.exhausted:
+            return track.quality > track.ocr_quality * self.ocr_improvement
+        return True
+
+    def flush(self):
+        """End every active track, e.g. when the source stops. Returns their events."""
+        finished, self.tracks = self.tracks, []
+        return self._events(finished)
+
+    def _nearest_track(self, box, candidates):
+        x1, y1, x2, y2 = box
+        cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+        best, best_distance = None, None
+        for t in candidates:
+            track = self.tracks[t]
+            tx1, ty1, tx2, ty2 = track.bbox
+            diagonal = np.hypot(tx2 - tx1, ty2 - ty1)
+            tcx, tcy = track.centroid
+            distance = np.hypot(cx - tcx, cy - tcy)
+            if distance <= diagonal * self.max_centroid_distance:
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = t, distance
+        return best
+
+    def _events(self, tracks):
+        # Tracks seen only briefly or never read are treated as noise
+        return [track.to_event() for track in tracks
+                if track.hits >= self.min_hits and track.text]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Exports of the process metrics (telemetry/metrics.py): a Prometheus text
+endpoint served by a local HTTP thread and a periodic JSON log.
+"""
+
+import json
+import threading
+from datetime import datetime
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import METRICS_SETTINGS
+
+from telemetry.metrics import metrics as default_registry
+
+
+class MetricsServer:
+    """Serves GET /metrics in the Prometheus text format on a daemon thread."""
+    def __init__(self, port, host=METRICS_SETTINGS["http_host"], registry=default_registry):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self._server = None
+
+    def start(self):
+        # Imported here so the HTTP server does not slow down startup when unused
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes are not worth a line on the console
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        # Port 0 picks a free port
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class MetricsLogger(threading.Thread):
+    """Appends a JSON snapshot of the metrics to a file every interval seconds."""
+    def __init__(self, path, interval=METRICS_SETTINGS["json_log_interval"], registry=default_registry):
+        super().__init__(name="metrics-log", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop_event = threading.Event()
+
+    def write(self):
+        entry = {"timestamp": datetime.now().isoformat(timespec="seconds")}
+        entry.update(self.registry.snapshot())
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Error: Could not write metrics to {self.path}: {e}")
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        """Stop logging and write a last snapshot."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        self.write()
+
+
+def start_exporters(port=METRICS_SETTINGS["http_port"], json_log=METRICS_SETTINGS["json_log"],
+                    interval=METRICS_SETTINGS["json_log_interval"]):
+    """
+    Start the HTTP endpoint when port is set and the JSON log when json_log
+    is set. Returns the started exporters; call stop() on each when done.
+    """
+    exporters = []
+    if not METRICS_SETTINGS["enabled"]:
+        return exporters
+    if port is not None:
+        try:
+            exporters.append(MetricsServer(port).start())
+        except OSError as e:
+            print(f"Error: Could not serve metrics on port {port}: {e}")
+    if json_log:
+        logger = MetricsLogger(json_log, interval)
+        logger.start()
+        exporters.append(logger)
+    return exporters
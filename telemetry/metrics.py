@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lightweight process-wide metrics for the hot path.
+
+Modules create their counters and histograms once, at import or
+construction time, and only increment or time them per frame:
+
+    PLATE_FORWARD = metrics.histogram("lpr_plate_forward_seconds", "Plate detector forward pass")
+    with PLATE_FORWARD.time():
+        results = model.predict(frames)
+
+A timed block costs two perf_counter calls and a bisect, and nothing when
+METRICS_SETTINGS["enabled"] is off. Values that are already counted
+elsewhere (queue drops, scheduler state) are read at export time through
+collectors instead of being counted twice. See telemetry/exporters.py for
+the Prometheus text endpoint and the JSON log.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import METRICS_SETTINGS
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Counter:
+    """Monotonically increasing count."""
+    def __init__(self, name, labels=()):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Histogram:
+    """Durations in seconds counted into fixed buckets, Prometheus style."""
+    def __init__(self, name, labels=(), buckets_ms=METRICS_SETTINGS["buckets_ms"], enabled=True):
+        self.name = name
+        self.labels = labels
+        self.enabled = enabled
+        self.buckets = [bound / 1000.0 for bound in buckets_ms]
+        # One count per bucket plus the +Inf bucket; counts are not cumulative
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def time(self):
+        """Context manager that observes the duration of its block."""
+        return _Timer(self) if self.enabled else _NULL_TIMER
+
+    def percentile(self, q):
+        """
+        Estimate the q-th percentile in seconds by interpolating inside its
+        bucket. None without observations.
+        """
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return None
+        rank = q / 100.0 * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                # The +Inf bucket is reported at its lower bound
+                upper = self.buckets[index] if index < len(self.buckets) else lower
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms with optional labels, plus collectors
+    called at export time. A collector returns (name, type, labels, value)
+    tuples, type being "counter" or "gauge" and labels a dict.
+    """
+    def __init__(self, settings=METRICS_SETTINGS):
+        self.enabled = settings["enabled"]
+        self.buckets_ms = settings["buckets_ms"]
+        self._metrics = {}
+        self._help = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        labels = tuple(sorted((key, str(value)) for key, value in labels.items()))
+        with self._lock:
+            metric = self._metrics.get((name, labels))
+            if metric is None:
+                metric = cls(name, labels, **kwargs)
+                self._metrics[(name, labels)] = metric
+            if help_text:
+                self._help[name] = help_text
+            return metric
+
+    def counter(self, name, help_text="", **labels):
+        """Counter called name with these labels, created on first use."""
+        return self._get(Counter, name, help_text, labels)
+
+    def histogram(self, name, help_text="", **labels):
+        """Timing histogram called name with these labels, created on first use."""
+        return self._get(Histogram, name, help_text, labels,
+                         buckets_ms=self.buckets_ms, enabled=self.enabled)
+
+    def add_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collectors(self):
+        with self._lock:
+            return list(self._collectors)
+
+    def remove_collector(self, collector):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def _collect(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: (metric.name, metric.labels))
+            collectors = list(self._collectors)
+        collected = []
+        for collector in collectors:
+            try:
+                for name, metric_type, labels, value in collector():
+                    if value is not None:
+                        collected.append((name, metric_type,
+                                          tuple(sorted((k, str(v)) for k, v in labels.items())), value))
+            except Exception as e:
+                print(f"Error: Metrics collector failed: {e}")
+        # Series of one metric must be listed together
+        collected.sort(key=lambda item: item[0])
+        return metrics, collected
+
+    def render_text(self):
+        """All metrics in the Prometheus text exposition format."""
+        metrics, collected = self._collect()
+        lines = []
+        described = set()
+
+        def describe(name, metric_type):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {metric_type}")
+
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                describe(metric.name, "counter")
+                lines.append(f"{metric.name}{_label_text(metric.labels)} {metric.value}")
+                continue
+            describe(metric.name, "histogram")
+            with metric._lock:
+                counts, count, total = list(metric.counts), metric.count, metric.sum
+            cumulative = 0
+            for bound, bucket_count in zip(metric.buckets + ["+Inf"], counts):
+                cumulative += bucket_count
+                le = bound if bound == "+Inf" else repr(bound)
+                lines.append(f"{metric.name}_bucket{_label_text(metric.labels + (('le', le),))} {cumulative}")
+            lines.append(f"{metric.name}_sum{_label_text(metric.labels)} {total}")
+            lines.append(f"{metric.name}_count{_label_text(metric.labels)} {count}")
+
+        for name, metric_type, labels, value in collected:
+            describe(name, metric_type)
+            lines.append(f"{name}{_label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """
+        Counters and gauges by name, and count, mean and p50/p95/p99 in
+        milliseconds per histogram. Labelled series are keyed name{labels}.
+        """
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 2)
+
+        metrics, collected = self._collect()
+        snapshot = {"counters": {}, "histograms": {}, "gauges": {}}
+        for metric in metrics:
+            key = metric.name + _label_text(metric.labels)
+            if isinstance(metric, Counter):
+                snapshot["counters"][key] = metric.value
+                continue
+            snapshot["histograms"][key] = {
+                "count": metric.count,
+                "mean_ms": ms(metric.sum / metric.count) if metric.count else None,
+                "p50_ms": ms(metric.percentile(50)),
+                "p95_ms": ms(metric.percentile(95)),
+                "p99_ms": ms(metric.percentile(99)),
+            }
+        for name, metric_type, labels, value in collected:
+            kind = "counters" if metric_type == "counter" else "gauges"
+            snapshot[kind][name + _label_text(labels)] = value
+        return snapshot
+
+
+# Registry shared by the whole process
+metrics = MetricsRegistry()
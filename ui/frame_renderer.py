@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import cv2
+import numpy as np
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap
+
+# Qt 5.14+ reads BGR directly; older versions need an in-place BGR to RGB swap
+BGR_FORMAT = getattr(QImage, "Format_BGR888", None)
+
+
+class FrameRenderer:
+    """
+    Turns BGR frames into pixmaps for one QLabel with one resize and no
+    color conversion.
+
+    The frame is resized straight to its on-screen size into a preallocated
+    buffer; that resize is the one copy that remains. It replaces the
+    full-size RGB conversion, the full-size pixmap and its scaled copy of
+    the old path. The QImage wraps the buffer without copying. On raster
+    platforms QPixmap.fromImage with NoFormatConversion keeps pointing at
+    the buffer, so two buffers alternate: the one shown by the label is
+    never written while it is on screen. Platforms that convert pixmaps to
+    a native format copy the display-sized image once more.
+    Live video is scaled bilinearly; still images use area interpolation,
+    which looks better when shrinking.
+    """
+    def __init__(self):
+        self._buffers = [None, None]
+        self._current = 0
+
+    def target_size(self, frame_shape, label_size):
+        """(width, height) of the frame scaled to fit label_size keeping its aspect ratio."""
+        h, w = frame_shape[:2]
+        scale = min(label_size.width() / float(w), label_size.height() / float(h))
+        return max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+
+    def render(self, frame, label_size, live=True):
+        """Return a QPixmap of a BGR frame scaled to fit label_size."""
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        width, height = self.target_size(frame.shape, label_size)
+
+        self._current = 1 - self._current
+        buffer = self._buffers[self._current]
+        if buffer is None or buffer.shape[:2] != (height, width):
+            buffer = self._buffers[self._current] = np.empty((height, width, 3), dtype=np.uint8)
+
+        if (width, height) == (frame.shape[1], frame.shape[0]):
+            np.copyto(buffer, frame)
+        else:
+            interpolation = cv2.INTER_LINEAR if live else cv2.INTER_AREA
+            cv2.resize(frame, (width, height), dst=buffer, interpolation=interpolation)
+
+        if BGR_FORMAT is not None:
+            image = QImage(buffer.data, width, height, buffer.strides[0], BGR_FORMAT)
+        else:
+            cv2.cvtColor(buffer, cv2.COLOR_BGR2RGB, dst=buffer)
+            image = QImage(buffer.data, width, height, buffer.strides[0], QImage.Format_RGB888)
+        return QPixmap.fromImage(image, Qt.NoFormatConversion)
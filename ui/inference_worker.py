@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import sqlite3
+import time
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INFERENCE_QUEUE_SIZE, SCHEDULER_SETTINGS
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from engine.frame_queue import DropOldestQueue
+from engine.recognizer import TrackedRecognizer
+from engine.scheduler import AdaptiveScheduler
+from telemetry.metrics import metrics
+
+
+class InferenceWorker(QThread):
+    """
+    Runs plate detection, OCR and database work off the GUI thread.
+    Frame IDs of a FrameRingBuffer (engine/frame_buffer.py) are submitted
+    through a bounded drop-oldest queue; the worker reads the raw frames from
+    the buffer and posts the results, tagged with the frame ID, back to the
+    GUI through Qt signals. Plates are tracked across
+    frames so each car is read and logged once rather than on every frame.
+    """
+    # Frame ID and list of plate dictionaries with car_info / driver_info added
+    detections_ready = pyqtSignal(int, list)
+    # Database errors are reported separately so the UI can warn the user
+    database_error = pyqtSignal(str)
+    detection_error = pyqtSignal(str)
+
+    def __init__(self, plate_detector, db_handler, frame_buffer, queue_size=INFERENCE_QUEUE_SIZE, parent=None):
+        super().__init__(parent)
+        self.plate_detector = plate_detector
+        self.db_handler = db_handler
+        self.frame_buffer = frame_buffer
+        self.queue = DropOldestQueue(queue_size)
+        self.recognizer = TrackedRecognizer(plate_detector, db_handler)
+        # Picks every Nth frame for detection based on measured latency
+        self.scheduler = AdaptiveScheduler() if SCHEDULER_SETTINGS["enabled"] else None
+        self.processed_frames = 0
+        # Frames that left the ring buffer before the worker got to them
+        self.evicted_frames = 0
+        self._running = False
+        self._reset_tracks = False
+
+    @property
+    def dropped_frames(self):
+        """Number of frames discarded because detection could not keep up."""
+        return self.queue.dropped + self.evicted_frames
+
+    def wants_frame(self):
+        """Return True if the next frame should be submitted for detection."""
+        return self.scheduler is None or self.scheduler.should_process()
+
+    def submit(self, frame_id):
+        """Queue a frame of the frame buffer for detection by its ID."""
+        self.queue.put(frame_id)
+
+    @property
+    def skipped_frames(self):
+        """Number of frames skipped by the motion gate because nothing moved."""
+        return self.recognizer.frames_skipped
+
+    @property
+    def plate_events(self):
+        """Number of plate events (one per tracked car) logged so far."""
+        return self.recognizer.events_logged
+
+    def set_roi(self, roi):
+        """Search only this region of interest (model/roi.py) of the next frames."""
+        self.recognizer.roi = roi
+
+    def clear(self):
+        """Discard frames that have not been processed yet and end all tracks."""
+        self.queue.clear()
+        self._reset_tracks = True
+
+    def stop(self):
+        """Stop the worker thread and wait for it to finish."""
+        self._running = False
+        self.queue.close()
+        self.wait()
+
+    def collect_metrics(self):
+        """Frame counters and scheduler state as metrics, see telemetry/metrics.py."""
+        labels = {"source": "ui"}
+        collected = [
+            ("lpr_frames_processed_total", "counter", labels, self.processed_frames),
+            ("lpr_frames_skipped_total", "counter", labels, self.skipped_frames),
+            ("lpr_frames_dropped_total", "counter", labels, self.dropped_frames),
+            ("lpr_plate_events_total", "counter", labels, self.plate_events),
+        ]
+        if self.scheduler is not None:
+            for key, value in self.scheduler.stats().items():
+                collected.append((f"lpr_scheduler_{key}", "gauge", labels, value))
+        return collected
+
+    def run(self):
+        self._running = True
+        if self.collect_metrics not in metrics.collectors():
+            metrics.add_collector(self.collect_metrics)
+        while self._running:
+            if self._reset_tracks:
+                self._reset_tracks = False
+                self.flush_tracks()
+
+            frame_id = self.queue.get(timeout=0.1)
+            if frame_id is None:
+                continue
+
+            buffered = self.frame_buffer.get(frame_id)
+            if buffered is None:
+                self.evicted_frames += 1
+                continue
+
+            started = time.monotonic()
+            # The detector draws on the frame it is given; buffered frames stay untouched
+            frame = buffered.image.copy()
+            try:
+                detected_plates, _ = self.recognizer.process(frame)
+            except sqlite3.Error as e:
+                self.database_error.emit(str(e))
+                continue
+            except Exception as e:
+                self.detection_error.emit(str(e))
+                continue
+            if detected_plates is None:
+                # Skipped by the motion gate; the last detections stay on screen
+                continue
+
+            if self.scheduler is not None:
+                finished = time.monotonic()
+                self.scheduler.record(finished - started, finished - buffered.timestamp,
+                                      self.recognizer.has_unsettled_tracks)
+
+            self.processed_frames += 1
+            self.detections_ready.emit(frame_id, detected_plates)
+
+        # Log the cars that were still in view
+        self.flush_tracks()
+
+    def flush_tracks(self):
+        """End all tracks and log their plate events."""
+        try:
+            self.recognizer.flush()
+        except sqlite3.Error as e:
+            self.database_error.emit(str(e))
@@ -2,27 +2,37 @@
 # -*- coding: utf-8 -*-
 
 import cv2
-import numpy as np
 import os
 import sys
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import UI_SETTINGS, CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS
+from config import UI_SETTINGS, CAMERA_INDEX, MODEL_WARM_UP
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QPushButton, QTableWidget, QTableWidgetItem,
                             QHeaderView, QMessageBox, QGroupBox, QSplitter,
                             QFrame, QFileDialog)
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QImage, QPixmap, QFont, QColor
-import sqlite3
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QColor
 
 from model.plate_detector import PlateDetector
+from model.roi import roi_for_source
+from engine.frame_buffer import FrameRingBuffer
+from engine.capture import BufferedCapture
 from database.init_db import DatabaseHandler
 from ui.plate_manager import PlateManagerDialog
+from ui.inference_worker import InferenceWorker
+from ui.frame_renderer import FrameRenderer
+from telemetry.exporters import start_exporters
+from telemetry.metrics import metrics
+
+RENDER_TIME = metrics.histogram("lpr_render_seconds", "Converting and showing one frame in the window")
 
 class MainWindow(QMainWindow):
+    # Emitted from the warm-up thread: empty string on success, else the error
+    models_loaded = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         
@@ -92,7 +102,8 @@ class MainWindow(QMainWindow):
         
         # Initialize camera
         self.camera_index = CAMERA_INDEX
-        self.cap = None
+        # Camera or video reader thread that decodes ahead (engine/capture.py)
+        self.capture = None
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
         
@@ -100,6 +111,38 @@ class MainWindow(QMainWindow):
         self.video_file = None
         self.is_video = False
         
+        # Reuses its buffers between frames of the same size
+        self.frame_renderer = FrameRenderer()
+
+        # Region of interest of the current source (model/roi.py), None for the whole frame
+        self.roi = None
+
+        # Raw frames shared by the display, the worker and manual detection
+        self.frame_buffer = FrameRingBuffer()
+
+        # Run detection on a background thread so the preview never blocks
+        self.last_detections = []
+        # Frame the last detections were computed on
+        self.last_detections_frame_id = None
+        self.inference_worker = InferenceWorker(self.plate_detector, self.db_handler,
+                                                self.frame_buffer, parent=self)
+        self.inference_worker.detections_ready.connect(self.on_detections_ready)
+        self.inference_worker.database_error.connect(self.on_database_error)
+        self.inference_worker.detection_error.connect(self.on_detection_error)
+        self.inference_worker.start()
+
+        # Metrics endpoint and JSON log, when configured in METRICS_SETTINGS
+        self.metrics_exporters = start_exporters()
+
+        # Load the models in the background instead of on the first frame,
+        # so the window is usable while torch and the weights load
+        self.models_loaded.connect(self.on_models_loaded)
+        self.models_loading = MODEL_WARM_UP
+        if MODEL_WARM_UP:
+            self.statusBar().showMessage("Loading models...")
+            self.plate_detector.warm_up(
+                on_done=lambda error: self.models_loaded.emit("" if error is None else str(error)))
+        
     def setup_ui(self):
         # Create central widget
         central_widget = QWidget()
@@ -141,11 +184,9 @@ class MainWindow(QMainWindow):
         # Camera controls
         self.start_button = QPushButton("Start Camera")
         self.start_button.setIcon(self.style().standardIcon(self.style().SP_MediaPlay))
-        self.start_button.clicked.connect(self.toggle_camera)
+        self.start_button.clicked.connect(self.start_camera)
         control_layout.addWidget(self.start_button)
         
-<<<<<<< Updated upstream
-=======
         self.stop_button = QPushButton("Stop Camera")
         self.stop_button.setIcon(self.style().standardIcon(self.style().SP_MediaStop))
         self.stop_button.clicked.connect(self.stop_camera)
@@ -170,7 +211,6 @@ class MainWindow(QMainWindow):
         self.detect_button.setEnabled(False)
         control_layout.addWidget(self.detect_button)
         
->>>>>>> Stashed changes
         self.manage_button = QPushButton("Manage Plates")
         self.manage_button.setIcon(self.style().standardIcon(self.style().SP_FileDialogDetailedView))
         self.manage_button.clicked.connect(self.show_plate_manager)
@@ -262,12 +302,14 @@ class MainWindow(QMainWindow):
         
         if file_name:
             # Stop camera if running
-            if self.cap is not None:
+            if self.capture is not None:
                 self.stop_camera()
             
             # Read and display image
             frame = cv2.imread(file_name)
             if frame is not None:
+                self.set_source(file_name)
+                self.frame_buffer.put(frame)
                 self.display_frame(frame)
                 self.detect_button.setEnabled(True)
                 self.is_video = False
@@ -285,12 +327,12 @@ class MainWindow(QMainWindow):
         
         if file_name:
             # Stop camera if running
-            if self.cap is not None:
+            if self.capture is not None:
                 self.stop_camera()
             
-            # Open video file
-            self.cap = cv2.VideoCapture(file_name)
-            if self.cap.isOpened():
+            # Open video file; it is decoded on its own thread at its native FPS and looped there
+            if self.open_capture(file_name, loop=True):
+                self.set_source(file_name)
                 self.video_file = file_name
                 self.is_video = True
                 self.timer.start(UI_SETTINGS["refresh_rate"])
@@ -300,117 +342,37 @@ class MainWindow(QMainWindow):
             else:
                 QMessageBox.warning(self, "Error", "Failed to load video file.")
 
+    def set_source(self, source_id):
+        """Start showing a new source: forget the old frames and use its region of interest."""
+        self.frame_buffer.clear()
+        self.last_detections = []
+        self.last_detections_frame_id = None
+        self.roi = roi_for_source(source_id)
+        self.inference_worker.set_roi(self.roi)
+
     def display_frame(self, frame):
         """Display frame in the UI."""
-        # Convert frame to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Convert to QImage
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        
-        # Scale image to fit label while maintaining aspect ratio
-        scaled_pixmap = QPixmap.fromImage(qt_image).scaled(
-            self.camera_label.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-        
-        # Display image
-        self.camera_label.setPixmap(scaled_pixmap)
+        with RENDER_TIME.time():
+            # Scaled to fit the label in one resize; live video uses the faster interpolation
+            pixmap = self.frame_renderer.render(frame, self.camera_label.size(), live=self.capture is not None)
+            self.camera_label.setPixmap(pixmap)
     
-<<<<<<< Updated upstream
-    def toggle_camera(self):
-        """Toggle the camera on/off."""
-        if self.cap is None or not self.cap.isOpened():
-            try:
-                self.cap = cv2.VideoCapture(self.camera_index)
-                if self.cap.isOpened():
-                    # Set camera properties
-                    self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-                    self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
-                    self.cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
-                    
-                    self.timer.start(UI_SETTINGS["refresh_rate"])
-                    self.start_button.setText("Stop Camera")
-                    self.start_button.setIcon(self.style().standardIcon(self.style().SP_MediaStop))
-                else:
-                    QMessageBox.warning(self, "Camera Error", "Failed to open camera. Please check if it's in use by another application.")
-            except Exception as e:
-                QMessageBox.critical(self, "Camera Error", f"Error starting camera: {str(e)}")
-        else:
-            self.timer.stop()
-            self.cap.release()
-            self.cap = None
-            self.start_button.setText("Start Camera")
-            self.start_button.setIcon(self.style().standardIcon(self.style().SP_MediaPlay))
-            # Clear the camera view
-            self.camera_label.clear()
-            # Reset plate detection display
-            self.plate_label.setText("Plate Number: None")
-            self.car_table.setRowCount(0)
-            self.driver_table.setRowCount(0)
-    
-    def update_frame(self):
-        """Update the camera frame in the UI and perform automatic plate detection."""
-        if self.cap is not None and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if ret and frame is not None and frame.size > 0:
-                try:
-                    # Convert to RGB for display (OpenCV uses BGR)
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    
-                    # Perform automatic plate detection
-                    try:
-                        # Use the plate detector model
-                        plate_text = self.plate_detector.detect_and_recognize(frame)
-                        self.plate_label.setText(f"Plate Number: {plate_text}")
-                        
-                        # Query the database for the plate
-                        if plate_text != "None":
-                            try:
-                                # Add detected car to history
-                                self.db_handler.add_detected_car(plate_text)
-                                
-                                # Get car and driver info
-                                car_info, driver_info = self.db_handler.get_info_by_plate(plate_text)
-                                if car_info and driver_info:
-                                    self.update_car_info(car_info)
-                                    self.update_driver_info(driver_info)
-                                else:
-                                    self.plate_label.setText(f"Plate {plate_text} not found in database")
-                                    # Clear tables if no data found
-                                    self.car_table.setRowCount(0)
-                                    self.driver_table.setRowCount(0)
-                            except sqlite3.Error as e:
-                                QMessageBox.warning(self, "Database Error", f"Error accessing database: {str(e)}")
-                                self.plate_label.setText("Database Error")
-                                self.car_table.setRowCount(0)
-                                self.driver_table.setRowCount(0)
-                    except Exception as e:
-                        print(f"Error detecting plate: {str(e)}")
-                    
-                    # Convert to QImage and display
-                    h, w, ch = rgb_frame.shape
-                    bytes_per_line = ch * w
-                    q_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                    self.camera_label.setPixmap(QPixmap.fromImage(q_image).scaled(
-                        self.camera_label.width(), self.camera_label.height(), 
-                        Qt.KeepAspectRatio))
-                except Exception as e:
-                    print(f"Error updating frame: {str(e)}")
-    
-=======
+    def open_capture(self, source, loop=False):
+        """Open a camera index or video file and start its reader thread. Returns False if it cannot be opened."""
+        capture = BufferedCapture(source, loop=loop)
+        try:
+            capture.open()
+        except IOError:
+            return False
+        self.capture = capture
+        capture.start()
+        return True
+
     def start_camera(self):
         """Start the camera capture and timer."""
         try:
-            self.cap = cv2.VideoCapture(self.camera_index)
-            if self.cap.isOpened():
-                # Set camera properties
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
-                self.cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
+            if self.open_capture(self.camera_index):
+                self.set_source(self.camera_index)
                 
                 self.timer.start(UI_SETTINGS["refresh_rate"])
                 self.start_button.setEnabled(False)
@@ -424,52 +386,67 @@ class MainWindow(QMainWindow):
 
     def stop_camera(self):
         """Stop the camera capture and timer."""
-        if self.cap is not None:
+        if self.capture is not None:
             self.timer.stop()
-            self.cap.release()
-            self.cap = None
+            self.capture.stop()
+            # The reader thread holds the device until it exits
+            self.capture.join()
+            self.capture = None
+            self.inference_worker.clear()
+            self.frame_buffer.clear()
+            self.last_detections = []
             self.start_button.setEnabled(True)
             self.stop_button.setEnabled(False)
             self.detect_button.setEnabled(False)
             self.camera_label.clear()
             self.video_file = None
             self.is_video = False
+            # Reset plate detection display
+            self.plate_label.setText("Plate Number: None")
+            self.car_table.setRowCount(0)
+            self.driver_table.setRowCount(0)
 
     def update_frame(self):
-        """Update the camera feed."""
-        if self.cap is not None and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if ret:
+        """Update the camera feed and queue the frame for automatic plate detection."""
+        if self.capture is not None:
+            # Newest decoded frame; older ones are skipped if the display fell behind
+            frame = self.capture.read_latest()
+            if frame is not None and frame.size > 0:
+                buffered = self.frame_buffer.put(frame)
+                # Detection runs on the worker thread, which reads the frame
+                # from the buffer. The scheduler decides which frames are
+                # worth detecting.
+                if self.inference_worker.wants_frame():
+                    self.inference_worker.submit(buffered.frame_id)
+
+                # Overlays go on a copy so the buffered frame stays raw
+                if self.last_detections or self.roi is not None:
+                    frame = frame.copy()
+                    self.draw_detections(frame, self.last_detections)
+                    if self.roi is not None:
+                        self.roi.draw(frame)
                 self.display_frame(frame)
-            else:
-                if self.is_video:
-                    # Video ended, restart from beginning
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                else:
-                    self.stop_camera()
+            elif self.capture.finished:
+                # Camera disconnected (videos are looped by the reader thread)
+                self.stop_camera()
 
     def detect_plate(self):
         """Detect license plates in the current frame."""
-        if self.camera_label.pixmap() is not None:
-            # Get current frame from camera or video
-            if self.cap is not None and self.cap.isOpened():
-                ret, frame = self.cap.read()
-                if not ret:
-                    return
-            else:
-                # Get frame from displayed image
-                pixmap = self.camera_label.pixmap()
-                image = pixmap.toImage()
-                width = image.width()
-                height = image.height()
-                ptr = image.bits()
-                ptr.setsize(height * width * 4)
-                arr = np.frombuffer(ptr, np.uint8).reshape((height, width, 4))
-                frame = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
-            
+        if self.models_loading:
+            # Waiting for the warm-up here would freeze the window
+            self.statusBar().showMessage("Models are still loading, try again in a moment.")
+            return
+
+        # The frame on screen, at full resolution
+        buffered = self.frame_buffer.latest()
+        if buffered is not None:
+            # The detector draws on the frame it is given
+            frame = buffered.image.copy()
+
             try:
                 # Detect plates
-                detected_plates = self.plate_detector.detect_and_recognize(frame)
+                detected_plates = self.plate_detector.detect_and_recognize(frame, self.roi)
+                self.last_detections_frame_id = buffered.frame_id
                 
                 if detected_plates:
                     # Update display with detection results
@@ -482,6 +459,7 @@ class MainWindow(QMainWindow):
                     # Look up vehicle information
                     car_info, driver_info = self.db_handler.get_info_by_plate(plate['text'])
                     if car_info and driver_info:
+                        self.plate_label.setText(self.plate_label_text(plate['text'], car_info))
                         self.update_car_info(car_info)
                         self.update_driver_info(driver_info)
                     else:
@@ -495,7 +473,82 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 QMessageBox.warning(self, "Detection Error", f"Error detecting plate: {str(e)}")
 
->>>>>>> Stashed changes
+    def draw_detections(self, frame, detections):
+        """Draw the most recent detection results on a live frame."""
+        for plate in detections:
+            x, y, w, h = plate["bbox"]
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            cv2.putText(frame, plate["text"], (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+
+    def on_detections_ready(self, frame_id, detected_plates):
+        """Show results the inference worker computed on the frame with this ID."""
+        if not self.frame_buffer.is_current(frame_id):
+            # Computed on a frame of the previous source
+            return
+        self.last_detections = detected_plates
+        self.last_detections_frame_id = frame_id
+        status = (
+            f"Processed frames: {self.inference_worker.processed_frames} | "
+            f"Skipped (no motion): {self.inference_worker.skipped_frames} | "
+            f"Dropped frames: {self.inference_worker.dropped_frames} | "
+            f"Plate events: {self.inference_worker.plate_events}"
+        )
+        if self.capture is not None:
+            status += f" | Decode FPS: {self.capture.decode_fps:.0f}"
+        if self.inference_worker.scheduler is not None:
+            scheduler_stats = self.inference_worker.scheduler.stats()
+            status += (f" | Detecting 1/{scheduler_stats['stride']} frames | "
+                       f"Latency p95: {scheduler_stats['latency_p95_ms']} ms")
+        writer_stats = self.db_handler.detection_writer.stats()
+        if writer_stats["throttled"] or writer_stats["dropped"]:
+            # The database cannot keep up; dropped detections are lost
+            status += (f" | DB writes throttled: {writer_stats['throttled']}, "
+                       f"dropped: {writer_stats['dropped']}")
+        self.statusBar().showMessage(status)
+
+        plates = [plate for plate in detected_plates if plate["text"]]
+        if not plates:
+            return
+
+        # Show the first detected plate
+        plate = plates[0]
+        if plate["car_info"] and plate["driver_info"]:
+            self.plate_label.setText(self.plate_label_text(plate["text"], plate["car_info"]))
+            self.update_car_info(plate["car_info"])
+            self.update_driver_info(plate["driver_info"])
+        else:
+            self.plate_label.setText(f"Plate {plate['text']} not found in database")
+            # Clear tables if no data found
+            self.car_table.setRowCount(0)
+            self.driver_table.setRowCount(0)
+
+    def on_models_loaded(self, error):
+        """Leave the model loading state once the warm-up has finished."""
+        self.models_loading = False
+        if error:
+            self.statusBar().showMessage("Models could not be loaded")
+            QMessageBox.warning(self, "Model Error", f"Error loading models: {error}")
+        else:
+            self.statusBar().showMessage("Models loaded", 3000)
+
+    def on_database_error(self, message):
+        """Report database errors raised on the inference worker."""
+        QMessageBox.warning(self, "Database Error", f"Error accessing database: {message}")
+        self.plate_label.setText("Database Error")
+        self.car_table.setRowCount(0)
+        self.driver_table.setRowCount(0)
+
+    def on_detection_error(self, message):
+        """Report detection errors raised on the inference worker."""
+        print(f"Error detecting plate: {message}")
+
+    def plate_label_text(self, plate_text, car_info):
+        """Label of an allowed plate; fuzzy matches name the allowed plate they resolved to."""
+        if car_info.get("Fuzzy Match"):
+            return f"Plate Number: {plate_text} (closest match: {car_info['Matched Plate']}, not exact)"
+        return f"Plate Number: {plate_text}"
+
     def update_car_info(self, car_info):
         """Update car information table."""
         self.car_table.setRowCount(0)
@@ -525,16 +578,30 @@ class MainWindow(QMainWindow):
         dialog = PlateManagerDialog(self.db_handler, self)
         dialog.exec_()
 
-    def __del__(self):
-<<<<<<< Updated upstream
-        """Clean up resources when the window is closed."""
+    def closeEvent(self, event):
+        """Stop background work before the window closes."""
+        self.release_resources()
+        super().closeEvent(event)
+
+    def release_resources(self):
+        """Stop the timer, inference worker and camera and close the database."""
         self.timer.stop()
-        self.cap.release()
-        self.cap = None
-        if hasattr(self, 'db_handler'):
-            del self.db_handler 
-=======
+        if self.inference_worker.isRunning():
+            self.inference_worker.stop()
+        if self.capture is not None:
+            self.capture.stop()
+            self.capture.join()
+            self.capture = None
+        for exporter in self.metrics_exporters:
+            exporter.stop()
+        self.metrics_exporters = []
+        self.db_handler.close()
+
+    def __del__(self):
         """Clean up resources."""
-        if self.cap is not None:
-            self.cap.release() 
->>>>>>> Stashed changes
+        try:
+            if hasattr(self, 'inference_worker'):
+                self.release_resources()
+        except RuntimeError:
+            # Qt objects were already destroyed
+            pass